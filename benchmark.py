@@ -0,0 +1,165 @@
+from argparse import ArgumentParser
+import logging
+from pathlib import Path
+from tempfile import TemporaryDirectory
+import time
+from timeit import repeat
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
+from capture.CaptureReader import CaptureReader
+from filters.ReplayFilter import ReplayFilter
+from parsers.FileParser import FileParser
+from replay.compression import COMPRESSION_SUFFIXES
+from replay.formats import (
+    FORMAT_SUFFIXES, load_replay, ReplayFormat, SAVE_FUNCTIONS)
+from replay.PacketRecorder import (
+    _get_quantized_expression, _quantize, TIME_SCALE)
+from replay.SessionWriter import SessionWriter
+from utilities.parse import parse_packet
+
+"""Command-line tool for comparing the ways replay files can be written.
+
+The sessions of a capture file are recorded by a ReplayFilter, reporting
+the time spent per packet, then written in every format, with every codec
+(and without compression), reporting the size, write time and load time of
+each output. The capture's timestamps are also quantized the way the
+recorder does it and with the '%.3f' string round trip it replaced.
+"""
+
+
+class BenchmarkResult(NamedTuple):
+    """Describes how a session was written."""
+
+    name: str
+    """The output's format and codec, e.g. 'binary+gzip'."""
+
+    size: int
+    """The output's size, in bytes."""
+
+    write_time: float
+    """How long writing the output took, in seconds."""
+
+    load_time: float
+    """How long loading the output took, in seconds."""
+
+
+def record_sessions(path: Path) -> List[Any]:
+    """Records the sessions of a capture file with a ReplayFilter.
+
+    Args:
+        path: The capture file.
+
+    Returns:
+        The data of every session, as the filter would have written it.
+    """
+
+    sessions: List[Any] = []
+    filter = ReplayFilter()
+    filter.writer = SessionWriter(lambda data, _: sessions.append(data))
+    FileParser(filter, path).run()
+    filter.cleanup()
+    return sessions
+
+
+def benchmark(data: Any, directory: Path,
+              level: Optional[int] = None) -> List[BenchmarkResult]:
+    """Writes and loads a session in every supported way.
+
+    Args:
+        data: The session's data.
+        directory: The directory the outputs are written to.
+        level: The compression level. Defaults to each codec's default.
+
+    Returns:
+        The result of every output, uncompressed JSON first.
+    """
+
+    results: List[BenchmarkResult] = []
+    for format in ReplayFormat:
+        outputs = [(format.value, '')] + [
+            (f'{format.value}+{compression.value}', suffix)
+            for compression, suffix in COMPRESSION_SUFFIXES.items()]
+        for name, suffix in outputs:
+            path = directory / f'session{FORMAT_SUFFIXES[format]}{suffix}'
+            start_time = time.perf_counter()
+            SAVE_FUNCTIONS[format](data, path, level)
+            write_time = time.perf_counter() - start_time
+            start_time = time.perf_counter()
+            load_replay(path)
+            load_time = time.perf_counter() - start_time
+            results.append(BenchmarkResult(
+                name, path.stat().st_size, write_time, load_time))
+    return results
+
+
+def compare_quantizers(values: List[float]) -> Tuple[float, float]:
+    """Times quantizing timestamps like PacketRecorder, and with the
+    '%.3f' string round trip it replaced.
+
+    Both expressions are compiled inline into a loop, as the recorder
+    compiles them into its record functions.
+
+    Args:
+        values: The timestamps.
+
+    Returns:
+        The best time per value (in seconds) of the recorder's quantizer
+        and of the string round trip.
+    """
+
+    expressions = [_get_quantized_expression('value', TIME_SCALE),
+                   'float("%.3f" % value)']
+    times: List[float] = []
+    for expression in expressions:
+        namespace: Dict[str, Any] = {'quantize': _quantize}
+        exec('def run(values):\n'
+             '    for value in values:\n'
+             f'        q = {expression}\n', namespace)
+        run: Callable[[List[float]], None] = namespace['run']
+        times.append(min(repeat(lambda: run(values), number=1, repeat=5))
+                     / max(len(values), 1))
+    return times[0], times[1]
+
+
+def get_args():
+    arg_parser = ArgumentParser(
+        description='Compares the size, write time and load time of replay \
+files in every format and with every compression codec.')
+    arg_parser.add_argument(
+        'path', type=Path, help='A capture file (see the capture filter).')
+    arg_parser.add_argument(
+        '-l', '--level', type=int,
+        help='The compression level. Defaults to each codec\'s default.')
+    return vars(arg_parser.parse_args())
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+    args = get_args()
+    start_time = time.perf_counter()
+    sessions = record_sessions(args['path'])
+    elapsed_time = time.perf_counter() - start_time
+    with CaptureReader(args['path']) as reader:
+        packet_count = len(reader)
+        session_times = [parse_packet(record.data).sessionTime
+                         for record in reader.records()]
+    logging.info(
+        f'Recorded {len(sessions)} sessions from {packet_count} packets in '
+        f'{elapsed_time:.2f} s '
+        f'({elapsed_time / max(packet_count, 1) * 1e6:.1f} us/packet).')
+    round_time, string_time = compare_quantizers(session_times)
+    logging.info(
+        f'Quantized {packet_count} timestamps: round() '
+        f'{round_time * 1e9:.0f} ns/value, \'%.3f\' round trip '
+        f'{string_time * 1e9:.0f} ns/value '
+        f'({string_time / max(round_time, 1e-12):.2f}x).')
+    for index, data in enumerate(sessions):
+        with TemporaryDirectory() as directory:
+            results = benchmark(data, Path(directory), args['level'])
+        logging.info(f'Session {index + 1}:')
+        json_size = results[0].size
+        for result in results:
+            logging.info(
+                f'  {result.name:<12} {result.size / 1e6:9.2f} MB '
+                f'({result.size / json_size:6.1%}) '
+                f'write {result.write_time:6.2f} s, '
+                f'load {result.load_time:6.2f} s')
@@ -0,0 +1,174 @@
+from argparse import ArgumentParser
+import logging
+from pathlib import Path
+from timeit import repeat
+from typing import Any, Dict, Optional
+from capture.CaptureReader import CaptureReader
+from constants.constants import EventStringCode, PacketId
+from filters.Filter import Filter
+import tests.packet_utilities as pu
+from utilities.parse import parse_packet
+
+"""Command-line tool for measuring the cost of Filter.filter's dispatch.
+
+One packet of each type (the first in a capture file, or a synthetic one
+if no capture is given) is dispatched repeatedly, through Filter.filter's
+dispatch table and through the if/elif chain it replaced, reporting the
+time per packet of both.
+"""
+
+DEFAULT_ITERATIONS = 100000
+"""Default number of times each packet is dispatched per measurement."""
+
+
+class CountingFilter(Filter):
+    """Counts the packets of every type."""
+
+    def __init__(self):
+        self.count = 0
+
+    def filter_motion(self, packet: Any):
+        self.count += 1
+
+    def filter_session(self, packet: Any):
+        self.count += 1
+
+    def filter_lap_data(self, packet: Any):
+        self.count += 1
+
+    def filter_event(self, packet: Any):
+        self.count += 1
+
+    def filter_participants(self, packet: Any):
+        self.count += 1
+
+    def filter_car_setups(self, packet: Any):
+        self.count += 1
+
+    def filter_car_telemetry(self, packet: Any):
+        self.count += 1
+
+    def filter_car_status(self, packet: Any):
+        self.count += 1
+
+    def filter_final_classification(self, packet: Any):
+        self.count += 1
+
+    def filter_lobby_info(self, packet: Any):
+        self.count += 1
+
+    def filter_car_damage(self, packet: Any):
+        self.count += 1
+
+    def filter_session_history(self, packet: Any):
+        self.count += 1
+
+
+class ChainDispatchFilter(CountingFilter):
+    """Dispatches packets with the if/elif chain Filter.filter used before
+    its dispatch table."""
+
+    def filter(self, packet: Any):
+        packet_id = packet.packetId
+        if packet_id == PacketId.MOTION.value:
+            self.filter_motion(packet)
+        elif packet_id == PacketId.SESSION.value:
+            self.filter_session(packet)
+        elif packet_id == PacketId.LAP_DATA.value:
+            self.filter_lap_data(packet)
+        elif packet_id == PacketId.EVENT.value:
+            self.filter_event(packet)
+        elif packet_id == PacketId.PARTICIPANTS.value:
+            self.filter_participants(packet)
+        elif packet_id == PacketId.CAR_SETUPS.value:
+            self.filter_car_setups(packet)
+        elif packet_id == PacketId.CAR_TELEMETRY.value:
+            self.filter_car_telemetry(packet)
+        elif packet_id == PacketId.CAR_STATUS.value:
+            self.filter_car_status(packet)
+        elif packet_id == PacketId.FINAL_CLASSIFICATION.value:
+            self.filter_final_classification(packet)
+        elif packet_id == PacketId.LOBBY_INFO.value:
+            self.filter_lobby_info(packet)
+        elif packet_id == PacketId.CAR_DAMAGE.value:
+            self.filter_car_damage(packet)
+        elif packet_id == PacketId.SESSION_HISTORY.value:
+            self.filter_session_history(packet)
+        else:
+            raise ValueError(
+                f'Invalid packet id in Filter.filter: {packet_id}')
+
+
+def read_packets(path: Optional[Path]) -> Dict[int, Any]:
+    """Reads one packet of each type.
+
+    Args:
+        path: A capture file to read the first packet of each type from, or
+            None to use synthetic packets.
+
+    Returns:
+        The parsed packets, by packet id.
+    """
+
+    if path is None:
+        return {id: parse_packet(data) for id, data in {
+            PacketId.MOTION.value: pu.create_motion_data(),
+            PacketId.SESSION.value: pu.create_session_data(),
+            PacketId.LAP_DATA.value: pu.create_lap_data(),
+            PacketId.EVENT.value: pu.create_generic_event_data(
+                EventStringCode.SESSION_START.value),
+            PacketId.PARTICIPANTS.value: pu.create_participants_data(),
+            PacketId.CAR_SETUPS.value: pu.create_car_setups_data(),
+            PacketId.CAR_TELEMETRY.value: pu.create_car_telemetry_data(),
+            PacketId.CAR_STATUS.value: pu.create_car_status_data(),
+            PacketId.FINAL_CLASSIFICATION.value:
+                pu.create_final_classification_data(),
+            PacketId.LOBBY_INFO.value: pu.create_lobby_info_data(),
+            PacketId.CAR_DAMAGE.value: pu.create_car_damage_data(),
+            PacketId.SESSION_HISTORY.value:
+                pu.create_session_history_data(),
+        }.items()}
+    packets: Dict[int, Any] = {}
+    with CaptureReader(path) as reader:
+        for record in reader.records():
+            if record.packet_id not in packets:
+                packets[record.packet_id] = parse_packet(record.data)
+                if len(packets) == len(PacketId):
+                    break
+    return packets
+
+
+def get_args():
+    arg_parser = ArgumentParser(
+        description='Compares the cost of Filter.filter\'s dispatch table \
+with the if/elif chain it replaced, for each packet type.')
+    arg_parser.add_argument(
+        'path', type=Path, nargs='?',
+        help='''A capture file (see the capture filter). Defaults to
+synthetic packets.''')
+    arg_parser.add_argument(
+        '-n', '--iterations', type=int, default=DEFAULT_ITERATIONS,
+        help=f'''The number of times each packet is dispatched per
+measurement. Defaults to {DEFAULT_ITERATIONS}.''')
+    return vars(arg_parser.parse_args())
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+    args = get_args()
+    iterations = args['iterations']
+    packets = read_packets(args['path'])
+    table_filter = CountingFilter()
+    chain_filter = ChainDispatchFilter()
+    logging.info('Filter.filter dispatch cost (ns/packet):')
+    logging.info(f'{"packet":<22}{"table":>8}{"if/elif":>9}')
+    for id in sorted(packets):
+        packet = packets[id]
+        table_ns = min(repeat(
+            lambda: table_filter.filter(packet), number=iterations,
+            repeat=3)) / iterations * 1e9
+        chain_ns = min(repeat(
+            lambda: chain_filter.filter(packet), number=iterations,
+            repeat=3)) / iterations * 1e9
+        logging.info(
+            f'{PacketId(id).name:<22}{table_ns:>8.0f}{chain_ns:>9.0f}')
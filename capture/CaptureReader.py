@@ -0,0 +1,238 @@
+import mmap
+from pathlib import Path
+from typing import Any, Iterator, List, Optional, Tuple
+from capture.format import (
+    CAPTURE_MAGIC, CaptureRecord, check_file_header, FILE_HEADER,
+    get_index_path, INDEX_ENTRY, INDEX_MAGIC, IndexEntry, RECORD_HEADER)
+from constants.constants import PACKET_HEADER_LENGTH
+from utilities.packet import get_frame_identifier, get_session_uid
+
+
+class CaptureReader:
+    """Reads a capture file (see capture.format), using its index to locate
+    records without scanning the file.
+
+    The file is memory-mapped, so records can be viewed without copying
+    them (see views) and only the pages that are accessed are read. The
+    mapping is copy-on-write: views are writable, as ctypes' from_buffer
+    requires, but changes are never written back to the file.
+
+    The index file is memory-mapped too, so opening a capture doesn't read
+    its whole index. Records that aren't in the index file (e.g., if
+    capturing was interrupted) are indexed when the file is opened. A
+    truncated final record is ignored.
+    """
+
+    def __init__(self, path: Path):
+        """Initializes the CaptureReader instance.
+
+        Args:
+            path: The capture file's path.
+
+        Raises:
+            ValueError: If the file isn't a supported capture file.
+        """
+
+        self.path = path
+        with path.open('rb') as file:
+            header = file.read(FILE_HEADER.size)
+            check_file_header(header, CAPTURE_MAGIC, path)
+            self._map: Optional[mmap.mmap] = mmap.mmap(
+                file.fileno(), 0, access=mmap.ACCESS_COPY)
+        self._view = memoryview(self._map)
+        self._index_map: Optional[mmap.mmap] = None
+        self._index = memoryview(b'')
+        self._unindexed = bytearray()
+        try:
+            self._map_index_file()
+            self._index_remaining_records()
+        except BaseException:
+            self.close()
+            raise
+
+    def __enter__(self) -> 'CaptureReader':
+        return self
+
+    def __exit__(self, *exc_info: Any):
+        self.close()
+
+    def __len__(self) -> int:
+        """Returns the number of records."""
+
+        return (len(self._index) + len(self._unindexed)) // INDEX_ENTRY.size
+
+    def close(self):
+        """Unmaps the capture file and its index file.
+
+        If views of the file are still referenced, the file is unmapped
+        once they're released (or garbage collected) instead.
+        """
+
+        self._view.release()
+        self._index.release()
+        for mapped in (self._map, self._index_map):
+            if mapped is None:
+                continue
+            try:
+                mapped.close()
+            except BufferError:
+                # The views are left holding the only references to the
+                # mapping, which is closed when the last one is released.
+                pass
+        self._map = None
+        self._index_map = None
+
+    def entry(self, number: int) -> IndexEntry:
+        """Returns the index entry of a record.
+
+        Args:
+            number: The record's number (its position in the file).
+        """
+
+        if not 0 <= number < len(self):
+            raise IndexError(f'Invalid record number: {number}')
+        offset = number * INDEX_ENTRY.size
+        if offset < len(self._index):
+            return IndexEntry._make(
+                INDEX_ENTRY.unpack_from(self._index, offset))
+        return IndexEntry._make(INDEX_ENTRY.unpack_from(
+            self._unindexed, offset - len(self._index)))
+
+    def entries(self) -> Iterator[IndexEntry]:
+        """Iterates over the index entries of every record, in order."""
+
+        return map(IndexEntry._make, self._iter_index())
+
+    def session_uids(self) -> List[int]:
+        """Returns the sessionUIDs in the file, in order of appearance."""
+
+        return list(dict.fromkeys(entry.session_uid
+                                  for entry in self.entries()))
+
+    def find(self, session_uid: int, frame_identifier: int = 0,
+             packet_id: Optional[int] = None) -> Optional[int]:
+        """Finds the first record of a session at or after a frame.
+
+        Args:
+            session_uid: The session's sessionUID.
+            frame_identifier: The earliest frameIdentifier to match.
+            packet_id: The packet id to match, or None to match any.
+
+        Returns:
+            The number of the first matching record, or None if no record
+            matches.
+        """
+
+        for number, (_, uid, frame, id) in enumerate(self._iter_index()):
+            if (uid == session_uid and frame >= frame_identifier
+                    and (packet_id is None or id == packet_id)):
+                return number
+        return None
+
+    def read(self, number: int) -> CaptureRecord:
+        """Reads a single record, copying its data.
+
+        Args:
+            number: The record's number.
+        """
+
+        receive_time, packet_id, data = self.view(number)
+        return CaptureRecord(receive_time, packet_id, data.tobytes())
+
+    def view(self, number: int) -> CaptureRecord:
+        """Views a single record without copying its data.
+
+        Args:
+            number: The record's number.
+
+        Returns:
+            The record, with a memoryview of its data that's only valid
+            until the reader is closed.
+        """
+
+        offset = self.entry(number).offset
+        receive_time, length, packet_id = RECORD_HEADER.unpack_from(
+            self._view, offset)
+        offset += RECORD_HEADER.size
+        return CaptureRecord(
+            receive_time, packet_id, self._view[offset:offset + length])
+
+    def records(self, start: int = 0) -> Iterator[CaptureRecord]:
+        """Reads the records in order, copying their data.
+
+        Args:
+            start: The number of the first record to read.
+        """
+
+        for number in range(start, len(self)):
+            yield self.read(number)
+
+    def views(self, start: int = 0,
+              session_uid: Optional[int] = None) -> Iterator[CaptureRecord]:
+        """Views the records in order without copying their data.
+
+        The views can be parsed in place (e.g., with parse_packet_in_place
+        or the NumPy views), but are only valid until the reader is closed.
+
+        Args:
+            start: The number of the first record to view.
+            session_uid: Only views the records of this session, if given.
+                The other records are skipped using the index, without
+                being accessed.
+        """
+
+        view = self._view
+        header_size = RECORD_HEADER.size
+        unpack_header = RECORD_HEADER.unpack_from
+        for offset, uid, _, _ in self._iter_index(start):
+            if session_uid is not None and uid != session_uid:
+                continue
+            receive_time, length, packet_id = unpack_header(view, offset)
+            offset += header_size
+            yield CaptureRecord(
+                receive_time, packet_id, view[offset:offset + length])
+
+    def _iter_index(self, start: int = 0
+                    ) -> Iterator[Tuple[int, int, int, int]]:
+        # Unpacks the entries from the start-th, without copying the index.
+        offset = start * INDEX_ENTRY.size
+        if offset < len(self._index):
+            with self._index[offset:] as entries:
+                yield from INDEX_ENTRY.iter_unpack(entries)
+        offset = max(offset - len(self._index), 0)
+        if offset < len(self._unindexed):
+            with memoryview(self._unindexed)[offset:] as entries:
+                yield from INDEX_ENTRY.iter_unpack(entries)
+
+    def _map_index_file(self):
+        index_path = get_index_path(self.path)
+        if not index_path.exists():
+            return
+        with index_path.open('rb') as index_file:
+            check_file_header(
+                index_file.read(FILE_HEADER.size), INDEX_MAGIC, index_path)
+            self._index_map = mmap.mmap(index_file.fileno(), 0,
+                                        access=mmap.ACCESS_READ)
+        # Skips the header and a partially written entry.
+        count = (len(self._index_map) - FILE_HEADER.size) // INDEX_ENTRY.size
+        self._index = memoryview(self._index_map)[
+            FILE_HEADER.size:FILE_HEADER.size + count * INDEX_ENTRY.size]
+
+    def _index_remaining_records(self):
+        view = self._view
+        offset = FILE_HEADER.size
+        if len(self):
+            last = self.entry(len(self) - 1)
+            _, length, _ = RECORD_HEADER.unpack_from(view, last.offset)
+            offset = last.offset + RECORD_HEADER.size + length
+        while offset + RECORD_HEADER.size <= len(view):
+            _, length, packet_id = RECORD_HEADER.unpack_from(view, offset)
+            data_offset = offset + RECORD_HEADER.size
+            if (data_offset + length > len(view)
+                    or length < PACKET_HEADER_LENGTH):
+                break
+            data = view[data_offset:data_offset + length]
+            self._unindexed += INDEX_ENTRY.pack(
+                offset, get_session_uid(data), get_frame_identifier(data),
+                packet_id)
+            offset = data_offset + length
@@ -0,0 +1,96 @@
+from pathlib import Path
+import time
+from typing import Any, Final, Optional
+from capture.format import (
+    CAPTURE_MAGIC, FILE_HEADER, FORMAT_VERSION, get_index_path, INDEX_ENTRY,
+    INDEX_MAGIC, RECORD_HEADER)
+from constants.constants import PACKET_HEADER_LENGTH, PACKET_HEADER_ID_INDEX
+from utilities.packet import get_frame_identifier, get_session_uid
+
+
+DEFAULT_INDEX_INTERVAL: Final[int] = 1024
+"""Default number of records between writes of the index."""
+
+
+class CaptureWriter:
+    """Appends datagrams to a capture file (see capture.format).
+
+    Index entries are buffered and written every index_interval records,
+    after the records they refer to have been flushed. If capturing is
+    interrupted, the index therefore only lags the capture file; the reader
+    indexes any records that follow the last indexed one.
+    """
+
+    def __init__(self, path: Path,
+                 index_interval: int = DEFAULT_INDEX_INTERVAL):
+        """Initializes the CaptureWriter instance.
+
+        Creates (or truncates) the capture file and its index file.
+
+        Args:
+            path: The capture file's path.
+            index_interval: The number of records between writes of the
+                index.
+        """
+
+        if index_interval < 1:
+            raise ValueError(
+                f'Invalid index interval in CaptureWriter: {index_interval}')
+        self.path = path
+        self.index_interval = index_interval
+        self.record_count = 0
+        self._file = path.open('wb')
+        self._index_file = get_index_path(path).open('wb')
+        self._file.write(FILE_HEADER.pack(CAPTURE_MAGIC, FORMAT_VERSION))
+        self._index_file.write(FILE_HEADER.pack(INDEX_MAGIC, FORMAT_VERSION))
+        self._offset = FILE_HEADER.size
+        self._pending_index = bytearray()
+
+    def __enter__(self) -> 'CaptureWriter':
+        return self
+
+    def __exit__(self, *exc_info: Any):
+        self.close()
+
+    def write(self, data: bytes, receive_time: Optional[float] = None):
+        """Appends a datagram to the capture file.
+
+        Args:
+            data: The datagram's raw bytes (or any buffer that contains
+                them). Must contain at least a packet header.
+            receive_time: When the datagram was received, in seconds since
+                the epoch. Defaults to now.
+        """
+
+        length = len(data)
+        if length < PACKET_HEADER_LENGTH:
+            raise ValueError(
+                f'Invalid datagram length in CaptureWriter.write: {length}')
+        packet_id = data[PACKET_HEADER_ID_INDEX]
+        self._file.write(RECORD_HEADER.pack(
+            time.time() if receive_time is None else receive_time, length,
+            packet_id))
+        self._file.write(data)
+        self._pending_index += INDEX_ENTRY.pack(
+            self._offset, get_session_uid(data), get_frame_identifier(data),
+            packet_id)
+        self._offset += RECORD_HEADER.size + length
+        self.record_count += 1
+        if self.record_count % self.index_interval == 0:
+            self.flush()
+
+    def flush(self):
+        """Flushes the captured records, then their index entries."""
+
+        self._file.flush()
+        self._index_file.write(self._pending_index)
+        self._index_file.flush()
+        self._pending_index.clear()
+
+    def close(self):
+        """Flushes and closes the capture and index files."""
+
+        if not self._file.closed:
+            self.flush()
+            self._file.close()
+            self._index_file.close()
@@ -0,0 +1,100 @@
+from pathlib import Path
+from struct import Struct
+from typing import Final, NamedTuple, Union
+
+"""This module defines the binary format of telemetry capture files.
+
+A capture file starts with a file header, followed by a record for every
+captured datagram: a record header (receive time, length and packet id)
+and the datagram's raw bytes.
+
+Every capture file has a sidecar index file (see get_index_path) with an
+entry for every record, holding the record's offset and the sessionUID,
+frameIdentifier and packet id of its datagram. The index is appended to in
+blocks while capturing, so records can be located without scanning the
+capture file.
+"""
+
+CAPTURE_MAGIC: Final[bytes] = b'F122CAP\0'
+"""Identifies capture files."""
+
+INDEX_MAGIC: Final[bytes] = b'F122IDX\0'
+"""Identifies capture index files."""
+
+FORMAT_VERSION: Final[int] = 1
+"""The version of the capture and index file formats."""
+
+FILE_HEADER: Final[Struct] = Struct('<8sI')
+"""The header of capture and index files: magic and format version."""
+
+RECORD_HEADER: Final[Struct] = Struct('<dHB')
+"""The header of a record: receive time (seconds since the epoch), datagram
+length and packet id."""
+
+INDEX_ENTRY: Final[Struct] = Struct('<QQIB')
+"""An index entry: record offset, sessionUID, frameIdentifier and packet
+id."""
+
+INDEX_SUFFIX: Final[str] = '.idx'
+"""Appended to a capture file's path to get its index file's path."""
+
+
+class CaptureRecord(NamedTuple):
+    """A captured datagram."""
+
+    receive_time: float
+    """When the datagram was received, in seconds since the epoch."""
+
+    packet_id: int
+    """The datagram's packet id."""
+
+    data: Union[bytes, memoryview]
+    """The datagram's raw bytes, or a view of them in the capture file."""
+
+
+class IndexEntry(NamedTuple):
+    """Locates a captured datagram."""
+
+    offset: int
+    """The offset of the datagram's record in the capture file."""
+
+    session_uid: int
+    """The datagram's sessionUID."""
+
+    frame_identifier: int
+    """The datagram's frameIdentifier."""
+
+    packet_id: int
+    """The datagram's packet id."""
+
+
+def get_index_path(path: Path) -> Path:
+    """Returns the path of a capture file's index file.
+
+    Args:
+        path: The capture file's path.
+    """
+
+    return path.with_name(path.name + INDEX_SUFFIX)
+
+
+def check_file_header(header: bytes, magic: bytes, path: Path):
+    """Checks the header of a capture or index file.
+
+    Args:
+        header: The file's first FILE_HEADER.size bytes.
+        magic: The expected magic.
+        path: The file's path, for error messages.
+
+    Raises:
+        ValueError: If the header is invalid or of an unsupported version.
+    """
+
+    if len(header) != FILE_HEADER.size:
+        raise ValueError(f'Truncated capture file header: {path}')
+    file_magic, version = FILE_HEADER.unpack(header)
+    if file_magic != magic:
+        raise ValueError(f'Not a capture file: {path}')
+    if version != FORMAT_VERSION:
+        raise ValueError(
+            f'Unsupported capture format version in {path}: {version}')
@@ -15,6 +15,12 @@ event data union.
 PACKET_HEADER_ID_INDEX: Final[int] = 5
 """The byte index of the packet id."""
 
+PACKET_HEADER_SESSION_UID_INDEX: Final[int] = 6
+"""The byte index of the session UID (a uint64)."""
+
+PACKET_HEADER_FRAME_IDENTIFIER_INDEX: Final[int] = 18
+"""The byte index of the frame identifier (a uint32)."""
+
 GRID_SIZE: Final[int] = 22
 """The number of grid positions."""
 
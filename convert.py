@@ -0,0 +1,187 @@
+from argparse import ArgumentParser
+from concurrent.futures import as_completed, ProcessPoolExecutor
+from functools import partial
+import logging
+from pathlib import Path
+import sys
+import time
+from typing import Callable, Iterable, List, NamedTuple, Optional, Tuple
+from capture.CaptureReader import CaptureReader
+from filters.Filter import Filter
+from filters.ReplayFilter import DEFAULT_OUTPUT_DIRECTORY, ReplayFilter
+from replay.compression import check_compression_level, Compression
+from replay.formats import ReplayFormat
+from utilities.packet import create_packet_id_mask
+from utilities.parse import parse_packet_in_place
+
+"""Command-line tool for converting capture files into replay files.
+
+Every session in the given capture files is replayed through its own
+ReplayFilter, with the sessions spread over a pool of worker processes.
+"""
+
+CAPTURE_FILE_PATTERN = '*.f1cap'
+"""Matches the capture files in a directory."""
+
+
+class SessionResult(NamedTuple):
+    """Describes the conversion of a single session."""
+
+    path: Path
+    """The capture file the session was read from."""
+
+    session_uid: int
+    """The session's sessionUID."""
+
+    packet_count: int
+    """The number of packets filtered."""
+
+    elapsed_time: float
+    """How long the conversion took, in seconds."""
+
+    saved_files: List[Path]
+    """The files written by the filter."""
+
+
+def find_sessions(paths: Iterable[Path]) -> List[Tuple[Path, int]]:
+    """Finds the sessions in capture files.
+
+    Args:
+        paths: Capture files, or directories of capture files.
+
+    Returns:
+        The capture file and sessionUID of every session.
+    """
+
+    sessions: List[Tuple[Path, int]] = []
+    for path in paths:
+        files = (sorted(path.glob(CAPTURE_FILE_PATTERN)) if path.is_dir()
+                 else [path])
+        for file in files:
+            with CaptureReader(file) as reader:
+                sessions.extend(
+                    (file, uid) for uid in reader.session_uids())
+    return sessions
+
+
+def convert_session(path: Path, session_uid: int,
+                    filter_factory: Callable[[], Filter]) -> SessionResult:
+    """Replays a single session of a capture file through a new filter.
+
+    Args:
+        path: The capture file.
+        session_uid: The session's sessionUID.
+        filter_factory: Creates the filter. It's called in the worker
+            process, so it must be picklable.
+
+    Returns:
+        The conversion's result.
+    """
+
+    start_time = time.perf_counter()
+    filter = filter_factory()
+    subscribed = create_packet_id_mask(filter.subscribed_packet_ids())
+    count = 0
+    with CaptureReader(path) as reader:
+        for _, packet_id, data in reader.views(session_uid=session_uid):
+            if subscribed[packet_id]:
+                filter.filter(parse_packet_in_place(data))
+                count += 1
+    filter.cleanup()
+    return SessionResult(
+        path, session_uid, count, time.perf_counter() - start_time,
+        list(getattr(filter, 'saved_files', [])))
+
+
+def convert(paths: Iterable[Path], output_directory: Path,
+            worker_count: Optional[int] = None,
+            compression: Optional[Compression] = None,
+            compression_level: Optional[int] = None,
+            format: ReplayFormat = ReplayFormat.JSON) -> List[SessionResult]:
+    """Converts every session of the given capture files into replay files.
+
+    Args:
+        paths: Capture files, or directories of capture files.
+        output_directory: The directory the replay files are written to.
+        worker_count: The number of worker processes. Defaults to the
+            number of CPUs.
+        compression: The codec the replay files are compressed with.
+            Defaults to no compression.
+        compression_level: The compression level. Defaults to the codec's
+            default.
+        format: The format the replay files are written in.
+
+    Returns:
+        The result of every session, in order of completion.
+
+    Raises:
+        ValueError: If the compression level is invalid.
+    """
+
+    check_compression_level(compression, compression_level)
+    sessions = find_sessions(paths)
+    logging.info(f'Converting {len(sessions)} sessions.')
+    filter_factory = partial(
+        ReplayFilter, output_directory, compression=compression,
+        compression_level=compression_level, format=format)
+    results: List[SessionResult] = []
+    with ProcessPoolExecutor(worker_count) as executor:
+        futures = [executor.submit(convert_session, path, uid, filter_factory)
+                   for path, uid in sessions]
+        for future in as_completed(futures):
+            result = future.result()
+            saved = ', '.join(str(x) for x in result.saved_files) or 'none'
+            logging.info(
+                f'{result.path.name} session {result.session_uid}: '
+                f'{result.packet_count} packets in '
+                f'{result.elapsed_time:.2f} s (saved: {saved})')
+            results.append(result)
+    return results
+
+
+def get_args():
+    arg_parser = ArgumentParser(
+        description='Converts capture files into replay files, with each \
+session converted by a worker process.')
+    arg_parser.add_argument(
+        'paths', type=Path, nargs='+',
+        help='Capture files, or directories of capture files.')
+    arg_parser.add_argument(
+        '-o', '--output', type=Path, default=DEFAULT_OUTPUT_DIRECTORY,
+        help=f'''The directory the replay files are written to. Defaults to
+{DEFAULT_OUTPUT_DIRECTORY}.''')
+    arg_parser.add_argument(
+        '-w', '--workers', type=int,
+        help='The number of worker processes. Defaults to the CPU count.')
+    arg_parser.add_argument(
+        '-c', '--compression', type=Compression,
+        choices=list(Compression),
+        metavar='{' + ','.join(x.value for x in Compression) + '}',
+        help='The codec the replay files are compressed with.')
+    arg_parser.add_argument(
+        '--compression-level', type=int,
+        help='''The compression level (gzip and bz2: 1-9, lzma: 0-9), which
+requires --compression. Defaults to the codec's default.''')
+    arg_parser.add_argument(
+        '--format', type=ReplayFormat, default=ReplayFormat.JSON,
+        choices=list(ReplayFormat),
+        metavar='{' + ','.join(x.value for x in ReplayFormat) + '}',
+        help='The format the replay files are written in. Defaults to json.')
+    return vars(arg_parser.parse_args())
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+    args = get_args()
+    try:
+        check_compression_level(args['compression'],
+                                args['compression_level'])
+    except ValueError as error:
+        logging.info(error)
+        sys.exit(1)
+    start_time = time.perf_counter()
+    results = convert(args['paths'], args['output'], args['workers'],
+                      args['compression'], args['compression_level'],
+                      args['format'])
+    logging.info(f'Converted {len(results)} sessions in '
+                 f'{time.perf_counter() - start_time:.2f} s.')
@@ -1,4 +1,5 @@
-from ctypes import c_char, c_uint8, LittleEndianStructure
+from ctypes import c_char, c_uint8, LittleEndianStructure, sizeof
+from typing import Any, Dict, Final, List, Tuple
 from constants.constants import NAME_SIZE
 
 
@@ -13,3 +14,47 @@ EventCode = c_uint8 * 4
 
 Name = c_char * NAME_SIZE
 """Defines a type for names contained in the packets (UTF-8)."""
+
+
+def get_fields(ctype: Any) -> List[Tuple[str, Any]]:
+    """Returns the fields of a ctypes structure, including inherited ones.
+
+    Args:
+        ctype: The structure (or union) type.
+
+    Returns:
+        The (name, type) pairs of the fields, in memory order.
+    """
+
+    fields: List[Tuple[str, Any]] = []
+    for cls in reversed(ctype.__mro__):
+        fields.extend(cls.__dict__.get('_fields_', []))
+    return fields
+
+
+_INTEGER_FORMATS: Final[Dict[Tuple[bool, int], str]] = {
+    (True, 1): 'b', (False, 1): 'B',
+    (True, 2): 'h', (False, 2): 'H',
+    (True, 4): 'i', (False, 4): 'I',
+    (True, 8): 'q', (False, 8): 'Q',
+}
+"""Standard size struct formats, by signedness and size in bytes."""
+
+
+def get_struct_format(ctype: Any) -> str:
+    """Returns the struct module format of a simple ctypes type.
+
+    Integer types are mapped by size (e.g., c_uint64 is 'Q'), since the
+    ctypes type codes describe native sizes.
+
+    Args:
+        ctype: The simple type (e.g., c_uint16 or c_float).
+
+    Returns:
+        The format character, for use with standard sizes.
+    """
+
+    type_code = ctype._type_
+    if type_code in 'fd?c':
+        return type_code
+    return _INTEGER_FORMATS[(type_code.islower(), sizeof(ctype))]
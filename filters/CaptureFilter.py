@@ -0,0 +1,55 @@
+import datetime
+import logging
+from pathlib import Path
+import time
+from typing import Optional
+from capture.CaptureWriter import CaptureWriter
+from filters.Filter import Filter
+from packets.packets import Packet
+from utilities.parse import get_parse_backend, ParseBackend
+
+
+class CaptureFilter(Filter):
+    """Defines a Filter that records the raw packets to a capture file.
+
+    The capture can be read with capture.CaptureReader, e.g., to replay a
+    session offline. Each packet's receive time is the time it's filtered
+    at, which trails the actual receive time by the parser's queueing delay.
+    Packets must be decoded by the ctypes backend, since their bytes are
+    captured from the ctypes structures.
+    """
+
+    def __init__(self, path: Optional[Path] = None):
+        """Initializes the CaptureFilter instance.
+
+        Args:
+            path: The capture file's path. Defaults to a file in the
+                captures directory, named after the first packet's
+                sessionUID and the time it was received.
+        """
+
+        if get_parse_backend() != ParseBackend.CTYPES:
+            raise ValueError('CaptureFilter requires the ctypes decoder')
+        self.path = path
+        self.writer: Optional[CaptureWriter] = None
+
+    def filter(self, packet: Packet):
+        if self.writer is None:
+            self.writer = self._create_writer(packet)
+        self.writer.write(bytes(packet), time.time())
+
+    def cleanup(self):
+        if self.writer is not None:
+            self.writer.close()
+            logging.info(f'Captured {self.writer.record_count} packets to '
+                         f'{self.writer.path}')
+            self.writer = None
+
+    def _create_writer(self, packet: Packet) -> CaptureWriter:
+        if self.path is None:
+            directory = Path('captures')
+            directory.mkdir(exist_ok=True)
+            timestamp = datetime.datetime.now().strftime('%Y%m%d_%H%M%S')
+            self.path = (directory
+                         / f'{packet.sessionUID}_{timestamp}.f1cap')
+        return CaptureWriter(self.path)
@@ -1,5 +1,6 @@
 from abc import ABC
-from typing import cast
+from typing import (
+    Any, Callable, Dict, FrozenSet, Final, List, Optional, Tuple)
 from constants.constants import PacketId
 from packets.packets import (
     CarDamagePacket, CarSetupsPacket, CarStatusPacket, CarTelemetryPacket,
@@ -8,14 +9,86 @@ from packets.packets import (
     SessionPacket)
 
 
+FILTER_METHOD_NAMES: Final[Dict[int, str]] = {
+    PacketId.MOTION.value: 'filter_motion',
+    PacketId.SESSION.value: 'filter_session',
+    PacketId.LAP_DATA.value: 'filter_lap_data',
+    PacketId.EVENT.value: 'filter_event',
+    PacketId.PARTICIPANTS.value: 'filter_participants',
+    PacketId.CAR_SETUPS.value: 'filter_car_setups',
+    PacketId.CAR_TELEMETRY.value: 'filter_car_telemetry',
+    PacketId.CAR_STATUS.value: 'filter_car_status',
+    PacketId.FINAL_CLASSIFICATION.value: 'filter_final_classification',
+    PacketId.LOBBY_INFO.value: 'filter_lobby_info',
+    PacketId.CAR_DAMAGE.value: 'filter_car_damage',
+    PacketId.SESSION_HISTORY.value: 'filter_session_history',
+}
+"""Associates packet ids with the Filter method that handles them."""
+
+DispatchTable = Tuple[Optional[Callable[[Any, Any], None]], ...]
+"""Filter methods indexed by packet id (None where the method is a no-op)."""
+
+
 class Filter(ABC):
     """Defines a class for managing the filtering of Packets."""
 
+    packet_ids: Optional[FrozenSet[PacketId]] = None
+    """The packet types the filter consumes, or None to infer them.
+
+    Parsers skip (without parsing) any packet that isn't consumed. See
+    subscribed_packet_ids for how the types are inferred.
+    """
+
+    _dispatch_table: DispatchTable = ()
+    """The class's filter_* methods, indexed by packet id.
+
+    Built once per class, so filter can dispatch with a single lookup.
+    Methods that aren't overridden are None, so they're never called.
+    """
+
+    def __init_subclass__(cls, **kwargs: Any):
+        super().__init_subclass__(**kwargs)
+        cls._dispatch_table = _create_dispatch_table(cls)
+
+    @classmethod
+    def subscribed_packet_ids(cls) -> FrozenSet[int]:
+        """Returns the ids of the packets the filter consumes.
+
+        If packet_ids isn't set, the ids are inferred from the filter_*
+        methods the class overrides. A class that overrides filter (or
+        filter_async) is assumed to consume every packet type.
+
+        Returns:
+            The consumed packet ids.
+        """
+
+        if cls.packet_ids is not None:
+            return frozenset(id.value for id in cls.packet_ids)
+        if (cls.filter is not Filter.filter
+                or cls.filter_async is not Filter.filter_async):
+            return frozenset(FILTER_METHOD_NAMES)
+        return frozenset(
+            id for id, handler in enumerate(cls._dispatch_table)
+            if handler is not None)
+
     def cleanup(self):
         """Alerts the Filter that it will no longer receive packets."""
 
         pass
 
+    async def filter_async(self, packet: Packet):
+        """Filters a packet on behalf of an asyncio-based parser.
+
+        By default this simply calls filter. Filters that await other work
+        (e.g., writing to a network sink) can override it so the work shares
+        the parser's event loop instead of blocking it.
+
+        Args:
+            packet: The packet to filter.
+        """
+
+        self.filter(packet)
+
     def filter(self, packet: Packet):
         """Filters a packet by delegating to the other filter methods.
 
@@ -24,50 +97,23 @@ class Filter(ABC):
         method at the end if they want the other filter methods to be
         automatically called with their respective packet type.
 
+        The packet may share memory with the parser's receive buffers, so it
+        (and any ctypes arrays or structures taken from it) is only valid
+        until this method returns. Filters that keep packet data for later
+        should copy it, e.g., with from_buffer_copy.
+
         Args:
             packet: The packet to filter.
         """
 
-        packet_id = packet.packetId
-        if packet_id == PacketId.MOTION.value:
-            packet = cast(MotionPacket, packet)
-            self.filter_motion(packet)
-        elif packet_id == PacketId.SESSION.value:
-            packet = cast(SessionPacket, packet)
-            self.filter_session(packet)
-        elif packet_id == PacketId.LAP_DATA.value:
-            packet = cast(LapDataPacket, packet)
-            self.filter_lap_data(packet)
-        elif packet_id == PacketId.EVENT.value:
-            packet = cast(EventPacket, packet)
-            self.filter_event(packet)
-        elif packet_id == PacketId.PARTICIPANTS.value:
-            packet = cast(ParticipantsPacket, packet)
-            self.filter_participants(packet)
-        elif packet_id == PacketId.CAR_SETUPS.value:
-            packet = cast(CarSetupsPacket, packet)
-            self.filter_car_setups(packet)
-        elif packet_id == PacketId.CAR_TELEMETRY.value:
-            packet = cast(CarTelemetryPacket, packet)
-            self.filter_car_telemetry(packet)
-        elif packet_id == PacketId.CAR_STATUS.value:
-            packet = cast(CarStatusPacket, packet)
-            self.filter_car_status(packet)
-        elif packet_id == PacketId.FINAL_CLASSIFICATION.value:
-            packet = cast(FinalClassificationPacket, packet)
-            self.filter_final_classification(packet)
-        elif packet_id == PacketId.LOBBY_INFO.value:
-            packet = cast(LobbyInfoPacket, packet)
-            self.filter_lobby_info(packet)
-        elif packet_id == PacketId.CAR_DAMAGE.value:
-            packet = cast(CarDamagePacket, packet)
-            self.filter_car_damage(packet)
-        elif packet_id == PacketId.SESSION_HISTORY.value:
-            packet = cast(SessionHistoryPacket, packet)
-            self.filter_session_history(packet)
-        else:
+        try:
+            handler = self._dispatch_table[packet.packetId]
+        except IndexError:
             raise ValueError(
-                f'Invalid packet id in Filter.filter: {packet_id}')
+                f'Invalid packet id in Filter.filter: {packet.packetId}'
+            ) from None
+        if handler is not None:
+            handler(self, packet)
 
     def filter_motion(self, packet: MotionPacket):
         pass
@@ -105,3 +151,25 @@ class Filter(ABC):
 
     def filter_session_history(self, packet: SessionHistoryPacket):
         pass
+
+
+def _create_dispatch_table(cls: type) -> DispatchTable:
+    """Creates the dispatch table for a Filter class.
+
+    Args:
+        cls: Filter or one of its subclasses.
+
+    Returns:
+        The class's overridden filter_* methods, indexed by packet id.
+    """
+
+    table: List[Optional[Callable[[Any, Any], None]]] = [
+        None] * (max(FILTER_METHOD_NAMES) + 1)
+    for id, name in FILTER_METHOD_NAMES.items():
+        method = getattr(cls, name)
+        if method is not getattr(Filter, name):
+            table[id] = method
+    return tuple(table)
+
+
+Filter._dispatch_table = _create_dispatch_table(Filter)
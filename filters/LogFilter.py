@@ -1,13 +1,12 @@
-from ctypes import Array
 import datetime
 import logging
-from typing import cast, Dict, Optional
+from typing import cast, Dict, List, Optional, Tuple
 from constants.constants import (
-    DRIVER_NAMES, EventStringCode, NULL_BYTE_VALUE, PenaltyId, SESSION_TEXT,
-    TRACK_NAMES, WEATHER_TEXT)
+    DRIVER_NAMES, EventStringCode, NULL_BYTE_VALUE, PenaltyId,
+    SESSION_TEXT, TRACK_NAMES, WEATHER_TEXT)
 from filters.Filter import Filter
 from packets.packet_data import (
-    DriveThroughPenaltyServed, FastestLap, ParticipantsData, Penalty,
+    DriveThroughPenaltyServed, FastestLap, Penalty,
     RaceWinner, Retirement, StartLights, StopGoPenaltyServed)
 from packets.packets import (
     EventPacket, Packet, PacketId, ParticipantsPacket, SessionPacket)
@@ -204,13 +203,13 @@ class LogFilter(Filter):
     def __init__(self):
         self.data = {}
         self.session_displayed = False
-        self.participants: Optional[Array[ParticipantsData]] = None
+        self.participants: Optional[List[Tuple[int, str]]] = None
+        """The driver id and name of each participant."""
 
     def _get_driver_name(self, vehicle_index: int):
-        participant = cast(Array[ParticipantsData],
-                           self.participants)[vehicle_index]
-        return get_driver_name(
-            participant.driverId, du.to_string(participant.name))
+        driver_id, name = cast(List[Tuple[int, str]],
+                               self.participants)[vehicle_index]
+        return get_driver_name(driver_id, name)
 
     def filter_session(self, packet: SessionPacket):
         if self.session_displayed is True:
@@ -309,7 +308,11 @@ class LogFilter(Filter):
     def filter_participants(self, packet: ParticipantsPacket):
         if self.participants is not None:
             return
-        self.participants = packet.participants
+        # The packet's memory is reused once filtering returns, so the
+        # values are copied out of it.
+        self.participants = [
+            (data.driverId, du.to_string(data.name))
+            for data in packet.participants]
 
     def _reset(self):
         self.participants = None
@@ -1,12 +1,13 @@
 from ctypes import Structure
-from enum import Enum
-import json
+from functools import partial
 import logging
 from pathlib import Path
+from threading import Lock
 import time
-from typing import Any, cast, Dict, List
+from typing import Any, cast, Dict, Final, List, Optional, Set
 from constants.constants import (
-    GRID_SIZE, EventStringCode, PacketId, TRACK_NAMES, SESSION_TEXT)
+    GRID_SIZE, EventStringCode, MAX_MARSHAL_ZONES, PacketId, TRACK_NAMES,
+    SESSION_TEXT)
 from filters.Filter import Filter
 from packets.packets import (
     CarDamagePacket, CarSetupsPacket, CarStatusPacket, CarTelemetryPacket,
@@ -16,51 +17,214 @@ from packets.packet_data import (
     DriveThroughPenaltyServed, FastestLap, FinalClassificationData, Flashback,
     Penalty, RaceWinner, Retirement, SpeedTrap, StartLights,
     StopGoPenaltyServed)
+from replay.ChunkLog import (
+    CHUNK_LOG_SUFFIX, ChunkLog, find_series, get_memory_usage)
+from replay.compression import (
+    check_compression_level, Compression, COMPRESSION_SUFFIXES)
+from replay.formats import (
+    FORMAT_SUFFIXES, FORMAT_VERSIONS, ReplayFormat, SAVE_FUNCTIONS)
+from replay.PacketRecorder import (
+    DataStorePolicy, Field, PacketRecorder, PacketSchema)
+from replay.Series import Series
+from replay.SessionWriter import DEFAULT_MAX_PENDING_SESSIONS, SessionWriter
 import utilities.data as du
 
 
-class DataStorePolicy(Enum):
-    """Defines the policy used to determine when to store data."""
+DEFAULT_OUTPUT_DIRECTORY: Final[Path] = Path('saved_data')
+"""Default directory the session files are written to."""
 
-    ALL = 0,
-    """Store all data."""
+MEMORY_CHECK_INTERVAL: Final[int] = 1024
+"""The number of packets between checks of the samples' memory usage, when
+ReplayFilter has a memory budget."""
 
-    FIRST = 1,
-    """Store the first instance of the data but ignore everything else."""
 
-    ON_CHANGE = 2,
-    """Store instances of data that are different from the data
-    immediately before it.
-    """
+MOTION_SCHEMA: Final[PacketSchema] = PacketSchema(MotionPacket, [
+    Field('worldPositionX', DataStorePolicy.ON_CHANGE, 3),
+    Field('worldPositionY', DataStorePolicy.ON_CHANGE, 3),
+    Field('yaw', DataStorePolicy.ON_CHANGE, 3),
+], 'carMotionData')
+"""Declares the recorded motion fields."""
 
+SESSION_SCHEMA: Final[PacketSchema] = PacketSchema(SessionPacket, [
+    Field('sessionUID', DataStorePolicy.FIRST),
+    Field('weather', DataStorePolicy.ON_CHANGE),
+    Field('trackTemperature', DataStorePolicy.ON_CHANGE),
+    Field('airTemperature', DataStorePolicy.ON_CHANGE),
+    Field('totalLaps', DataStorePolicy.FIRST),
+    Field('trackLength', DataStorePolicy.FIRST),
+    Field('sessionType', DataStorePolicy.FIRST),
+    Field('trackId', DataStorePolicy.FIRST),
+    Field('formula', DataStorePolicy.FIRST),
+    Field('pitSpeedLimit', DataStorePolicy.FIRST),
+    Field('gamePaused', DataStorePolicy.ON_CHANGE),
+    Field('numMarshalZones', DataStorePolicy.FIRST),
+    Field('marshalZones', DataStorePolicy.ALL,
+          expression='tuple([x.zoneFlag for x in {}.marshalZones])',
+          typecode='b', width=MAX_MARSHAL_ZONES),
+    Field('safetyCarStatus', DataStorePolicy.ON_CHANGE),
+    Field('networkGame', DataStorePolicy.FIRST),
+    Field('forecastAccuracy', DataStorePolicy.FIRST),
+    Field('aiDifficulty', DataStorePolicy.FIRST),
+    Field('seasonLinkIdentifier', DataStorePolicy.FIRST),
+    Field('weekendLinkIdentifier', DataStorePolicy.FIRST),
+    Field('sessionLinkIdentifier', DataStorePolicy.FIRST),
+    Field('steeringAssist', DataStorePolicy.ON_CHANGE),
+    Field('brakingAssist', DataStorePolicy.ON_CHANGE),
+    Field('gearboxAssist', DataStorePolicy.ON_CHANGE),
+    Field('pitAssist', DataStorePolicy.ON_CHANGE),
+    Field('pitReleaseAssist', DataStorePolicy.ON_CHANGE),
+    Field('ERSAssist', DataStorePolicy.ON_CHANGE),
+    Field('DRSAssist', DataStorePolicy.ON_CHANGE),
+    Field('dynamicRacingLine', DataStorePolicy.ON_CHANGE),
+    Field('dynamicRacingLineType', DataStorePolicy.ON_CHANGE),
+    Field('gameMode', DataStorePolicy.FIRST),
+    Field('ruleSet', DataStorePolicy.FIRST),
+    Field('timeOfDay', DataStorePolicy.ON_CHANGE),
+    Field('sessionLength', DataStorePolicy.FIRST),
+])
+"""Declares the recorded session fields."""
 
-def set(data: List[Any], timestamp: float, value: Any,
-        policy: DataStorePolicy):
-    """Adds timestamped data to a list according to the given policy.
+LAP_DATA_SCHEMA: Final[PacketSchema] = PacketSchema(LapDataPacket, [
+    Field('lastLapTimeInMS', DataStorePolicy.ON_CHANGE),
+    Field('currentLapTimeInMS', DataStorePolicy.ON_CHANGE),
+    Field('sector1TimeInMS', DataStorePolicy.ON_CHANGE),
+    Field('sector2TimeInMS', DataStorePolicy.ON_CHANGE),
+    Field('carPosition', DataStorePolicy.ON_CHANGE),
+    Field('currentLapNum', DataStorePolicy.ON_CHANGE),
+    Field('pitStatus', DataStorePolicy.ON_CHANGE),
+    Field('numPitStops', DataStorePolicy.ON_CHANGE),
+    Field('sector', DataStorePolicy.ON_CHANGE),
+    Field('currentLapInvalid', DataStorePolicy.ON_CHANGE),
+    Field('penalties', DataStorePolicy.ON_CHANGE),
+    Field('warnings', DataStorePolicy.ON_CHANGE),
+    Field('numUnservedDriveThroughPens', DataStorePolicy.ON_CHANGE),
+    Field('numUnservedStopGoPens', DataStorePolicy.ON_CHANGE),
+    Field('gridPosition', DataStorePolicy.ON_CHANGE),
+    Field('driverStatus', DataStorePolicy.ON_CHANGE),
+    Field('resultStatus', DataStorePolicy.ON_CHANGE),
+    Field('pitLaneTimerActive', DataStorePolicy.ON_CHANGE),
+    Field('pitLaneTimeInLaneInMS', DataStorePolicy.ON_CHANGE),
+    Field('pitStopTimerInMS', DataStorePolicy.ON_CHANGE),
+    Field('pitStopShouldServePen', DataStorePolicy.ON_CHANGE),
+], 'lapData')
+"""Declares the recorded lap data fields."""
 
-    Args:
-        data: The list of data to add to.
-        timestamp: The timestamp of the data.
-        value: The value to consider for addition to the data.
-        policy: The data storing policy.
-    """
+CAR_SETUPS_SCHEMA: Final[PacketSchema] = PacketSchema(CarSetupsPacket, [
+    Field('frontWing', DataStorePolicy.ON_CHANGE),
+    Field('rearWing', DataStorePolicy.ON_CHANGE),
+    Field('onThrottle', DataStorePolicy.ON_CHANGE),
+    Field('offThrottle', DataStorePolicy.ON_CHANGE),
+    Field('frontCamber', DataStorePolicy.ON_CHANGE),
+    Field('rearCamber', DataStorePolicy.ON_CHANGE),
+    Field('frontToe', DataStorePolicy.ON_CHANGE),
+    Field('rearToe', DataStorePolicy.ON_CHANGE),
+    Field('frontSuspension', DataStorePolicy.ON_CHANGE),
+    Field('rearSuspension', DataStorePolicy.ON_CHANGE),
+    Field('frontAntiRollBar', DataStorePolicy.ON_CHANGE),
+    Field('rearAntiRollBar', DataStorePolicy.ON_CHANGE),
+    Field('frontSuspensionHeight', DataStorePolicy.ON_CHANGE),
+    Field('rearSuspensionHeight', DataStorePolicy.ON_CHANGE),
+    Field('brakePressure', DataStorePolicy.ON_CHANGE),
+    Field('brakeBias', DataStorePolicy.ON_CHANGE),
+    Field('rearLeftTyrePressure', DataStorePolicy.ON_CHANGE),
+    Field('rearRightTyrePressure', DataStorePolicy.ON_CHANGE),
+    Field('frontLeftTyrePressure', DataStorePolicy.ON_CHANGE),
+    Field('frontRightTyrePressure', DataStorePolicy.ON_CHANGE),
+    Field('ballast', DataStorePolicy.ON_CHANGE),
+    Field('fuelLoad', DataStorePolicy.ON_CHANGE),
+], 'carSetups')
+"""Declares the recorded car setups fields."""
+
+CAR_TELEMETRY_SCHEMA: Final[PacketSchema] = PacketSchema(CarTelemetryPacket, [
+    Field('speed', DataStorePolicy.ON_CHANGE),
+    Field('throttle', DataStorePolicy.ON_CHANGE, 3),
+    Field('steer', DataStorePolicy.ON_CHANGE, 3),
+    Field('brake', DataStorePolicy.ON_CHANGE, 3),
+    Field('clutch', DataStorePolicy.ON_CHANGE),
+    Field('gear', DataStorePolicy.ON_CHANGE),
+    Field('engineRPM', DataStorePolicy.ON_CHANGE),
+    Field('drs', DataStorePolicy.ON_CHANGE),
+    Field('revLightsPercent', DataStorePolicy.ON_CHANGE),
+    Field('revLightsBitValue', DataStorePolicy.ON_CHANGE),
+    Field('brakesTemperature', DataStorePolicy.ON_CHANGE),
+    Field('tiresSurfaceTemperature', DataStorePolicy.ON_CHANGE),
+    Field('tiresInnerTemperature', DataStorePolicy.ON_CHANGE),
+    Field('engineTemperature', DataStorePolicy.ON_CHANGE),
+    Field('tiresPressure', DataStorePolicy.ON_CHANGE),
+    Field('surfaceType', DataStorePolicy.ON_CHANGE),
+], 'carTelemetryData')
+"""Declares the recorded car telemetry fields."""
 
-    # Storing timestamps with ms precision cuts down the file size by ~50%.
-    timestamp = float('%.3f' % (timestamp))
-    if policy == DataStorePolicy.ALL:
-        data.append((timestamp, value))
-    elif policy == DataStorePolicy.FIRST:
-        if not data:
-            data.append((timestamp, value))
-    elif policy == DataStorePolicy.ON_CHANGE:
-        if not data:
-            data.append((timestamp, value))
-        else:
-            previous = data[-1][1]
-            if previous != value:
-                data.append((timestamp, value))
-    else:
-        raise ValueError('No matching UpdatePolicy.')
+CAR_STATUS_SCHEMA: Final[PacketSchema] = PacketSchema(CarStatusPacket, [
+    Field('tractionControl', DataStorePolicy.ON_CHANGE),
+    Field('antiLockBrakes', DataStorePolicy.ON_CHANGE),
+    Field('fuelMix', DataStorePolicy.ON_CHANGE),
+    Field('frontBrakeBias', DataStorePolicy.ON_CHANGE),
+    Field('pitLimiterStatus', DataStorePolicy.ON_CHANGE),
+    Field('fuelInTank', DataStorePolicy.ON_CHANGE),
+    Field('fuelCapacity', DataStorePolicy.ON_CHANGE),
+    Field('fuelRemainingLaps', DataStorePolicy.ON_CHANGE),
+    Field('maxRPM', DataStorePolicy.ON_CHANGE),
+    Field('idleRPM', DataStorePolicy.ON_CHANGE),
+    Field('maxGears', DataStorePolicy.ON_CHANGE),
+    Field('drsAllowed', DataStorePolicy.ON_CHANGE),
+    Field('drsActivationDistance', DataStorePolicy.ON_CHANGE),
+    Field('actualTypeCompound', DataStorePolicy.ON_CHANGE),
+    Field('visualTyreCompound', DataStorePolicy.ON_CHANGE),
+    Field('tyresAgeLaps', DataStorePolicy.ON_CHANGE),
+    Field('vehicleFiaFlags', DataStorePolicy.ON_CHANGE),
+    Field('ersStoreEnergy', DataStorePolicy.ON_CHANGE),
+    Field('ersDeployMode', DataStorePolicy.ON_CHANGE),
+    Field('ersHarvestedThisLapMGUK', DataStorePolicy.ON_CHANGE),
+    Field('ersHarvestedThisLapMGUH', DataStorePolicy.ON_CHANGE),
+    Field('ersDeployedThisLap', DataStorePolicy.ON_CHANGE),
+    Field('networkPaused', DataStorePolicy.ON_CHANGE),
+], 'carStatusData')
+"""Declares the recorded car status fields."""
+
+CAR_DAMAGE_SCHEMA: Final[PacketSchema] = PacketSchema(CarDamagePacket, [
+    Field('tyresWear', DataStorePolicy.ON_CHANGE),
+    Field('tyresDamage', DataStorePolicy.ON_CHANGE),
+    Field('brakesDamage', DataStorePolicy.ON_CHANGE),
+    Field('frontLeftWingDamage', DataStorePolicy.ON_CHANGE),
+    Field('frontRightWingDamage', DataStorePolicy.ON_CHANGE),
+    Field('rearWingDamage', DataStorePolicy.ON_CHANGE),
+    Field('floorDamage', DataStorePolicy.ON_CHANGE),
+    Field('diffuserDamage', DataStorePolicy.ON_CHANGE),
+    Field('sidepodDamage', DataStorePolicy.ON_CHANGE),
+    Field('drsFault', DataStorePolicy.ON_CHANGE),
+    Field('ersFault', DataStorePolicy.ON_CHANGE),
+    Field('gearBoxDamage', DataStorePolicy.ON_CHANGE),
+    Field('engineDamage', DataStorePolicy.ON_CHANGE),
+    Field('engineMGUHWear', DataStorePolicy.ON_CHANGE),
+    Field('engineESWear', DataStorePolicy.ON_CHANGE),
+    Field('engineCEWear', DataStorePolicy.ON_CHANGE),
+    Field('engineICEWear', DataStorePolicy.ON_CHANGE),
+    Field('engineMGUKWear', DataStorePolicy.ON_CHANGE),
+    Field('engineTCWear', DataStorePolicy.ON_CHANGE),
+    Field('engineBlown', DataStorePolicy.ON_CHANGE),
+    Field('engineSeized', DataStorePolicy.ON_CHANGE),
+], 'carDamageData')
+"""Declares the recorded car damage fields."""
+
+FINAL_CLASSIFICATION_SCHEMA: Final[PacketSchema] = PacketSchema(
+    FinalClassificationPacket, [
+        Field('position', DataStorePolicy.FIRST),
+        Field('numLaps', DataStorePolicy.FIRST),
+        Field('gridPosition', DataStorePolicy.FIRST),
+        Field('points', DataStorePolicy.FIRST),
+        Field('numPitStops', DataStorePolicy.FIRST),
+        Field('resultStatus', DataStorePolicy.FIRST),
+        Field('bestLapTimeInMS', DataStorePolicy.FIRST),
+        Field('totalRaceTime', DataStorePolicy.FIRST),
+        Field('penaltiesTime', DataStorePolicy.FIRST),
+        Field('numPenalties', DataStorePolicy.FIRST),
+        Field('numTyreStints', DataStorePolicy.FIRST),
+        Field('tyreStintsActual', DataStorePolicy.FIRST),
+        Field('tyreStintsVisual', DataStorePolicy.FIRST),
+        Field('tyreStintEndLaps', DataStorePolicy.FIRST),
+    ], 'classificationData')
+"""Declares the recorded final classification fields."""
 
 
 class ReplayFilter(Filter):
@@ -70,19 +234,106 @@ class ReplayFilter(Filter):
     it should not be relied on.
     """
 
-    def __init__(self):
-        self.format_version = 1
+    packet_ids = frozenset((
+        PacketId.MOTION, PacketId.SESSION, PacketId.LAP_DATA, PacketId.EVENT,
+        PacketId.PARTICIPANTS, PacketId.CAR_SETUPS, PacketId.CAR_TELEMETRY,
+        PacketId.CAR_STATUS, PacketId.FINAL_CLASSIFICATION,
+        PacketId.CAR_DAMAGE))
+
+    def __init__(self, output_directory: Path = DEFAULT_OUTPUT_DIRECTORY,
+                 max_pending_writes: int = DEFAULT_MAX_PENDING_SESSIONS,
+                 compression: Optional[Compression] = None,
+                 compression_level: Optional[int] = None,
+                 format: ReplayFormat = ReplayFormat.JSON,
+                 memory_budget: Optional[int] = None,
+                 checkpoint_interval: Optional[float] = None):
+        """Initializes the ReplayFilter instance.
+
+        Args:
+            output_directory: The directory the session files are written
+                to.
+            max_pending_writes: The maximum number of finished sessions
+                waiting to be written. Once it's reached, filtering blocks
+                until a session has been written.
+            compression: The codec the session files are compressed with,
+                on the writer thread. Defaults to no compression.
+            compression_level: The compression level (gzip and bz2: 1-9,
+                lzma: 0-9), which requires a codec. Defaults to the codec's
+                default.
+            format: The format the session files are written in.
+            memory_budget: The number of bytes the session's samples can
+                use. Once it's exceeded, they're spilled to a chunk log in
+                the output directory, and read back a series at a time
+                when the session is written. Defaults to no limit.
+            checkpoint_interval: The session time, in seconds, between
+                checkpoints of the session to its chunk log, which is kept
+                until the session has been written. A session with a
+                checkpoint in the output directory is resumed from it when
+                its packets arrive (e.g., after a crash). Defaults to no
+                checkpoints.
+
+        Raises:
+            ValueError: If the compression level is invalid.
+        """
+
+        check_compression_level(compression, compression_level)
+        self.output_directory = output_directory
+        self._saved_files: List[Path] = []
+        self._saved_files_lock = Lock()
+        self.compression = compression
+        self.format = format
+        self.writer = SessionWriter(
+            partial(SAVE_FUNCTIONS[format], level=compression_level),
+            max_pending_writes)
+        self.format_version = FORMAT_VERSIONS[format]
+        self.memory_budget = memory_budget
+        self.checkpoint_interval = checkpoint_interval
+        self.chunk_log: Optional[ChunkLog] = None
+        self.session_uid = 0
         self.is_session_started = False
         self.session_start_time: float = 0
         self.session_end_time: float = 0
-        self.file_start_write_time: float = 0
-        self.file_end_write_time: float = 0
         self.data: Dict[str, Any] = {}
+        self._series: List[Series] = []
+        self._packets_since_memory_check = 0
+        self._checkpoint_time: float = 0
+        self._recoverable_sessions: Set[int] = set()
+        if checkpoint_interval is not None:
+            self._recoverable_sessions = {
+                int(x.stem) for x in output_directory.glob(
+                    f'*{CHUNK_LOG_SUFFIX}') if x.stem.isdigit()}
+        self.motion_recorder = PacketRecorder(MOTION_SCHEMA)
+        self.session_recorder = PacketRecorder(SESSION_SCHEMA)
+        self.lap_data_recorder = PacketRecorder(LAP_DATA_SCHEMA)
+        self.car_setups_recorder = PacketRecorder(CAR_SETUPS_SCHEMA)
+        self.car_telemetry_recorder = PacketRecorder(CAR_TELEMETRY_SCHEMA)
+        self.car_status_recorder = PacketRecorder(CAR_STATUS_SCHEMA)
+        self.car_damage_recorder = PacketRecorder(CAR_DAMAGE_SCHEMA)
+        self.final_classification_recorder = PacketRecorder(
+            FINAL_CLASSIFICATION_SCHEMA)
+        self._recorders = {
+            'motion': self.motion_recorder,
+            'session': self.session_recorder,
+            'lap_data': self.lap_data_recorder,
+            'car_setups': self.car_setups_recorder,
+            'car_telemetry': self.car_telemetry_recorder,
+            'car_status': self.car_status_recorder,
+            'car_damage': self.car_damage_recorder,
+            'final_classification': self.final_classification_recorder,
+        }
         self._reset()
 
+    @property
+    def saved_files(self) -> List[Path]:
+        """The files sessions have been written to successfully so far."""
+
+        with self._saved_files_lock:
+            return list(self._saved_files)
+
     def filter(self, packet: Packet):
         packet_id = packet.packetId
-        if not self.is_session_started:
+        if not self.is_session_started and not self._recover(
+                packet.sessionUID):
             if packet_id != PacketId.EVENT.value:
                 return
             p = cast(EventPacket, packet)
@@ -90,204 +341,39 @@ class ReplayFilter(Filter):
             if event_code != EventStringCode.SESSION_START.value:
                 return
         super().filter(packet)
+        if not self.is_session_started:
+            return
+        if self.checkpoint_interval is not None and not (
+                0 <= packet.sessionTime - self._checkpoint_time
+                < self.checkpoint_interval):
+            self._checkpoint(packet.sessionTime)
+        if self.memory_budget is not None:
+            self._packets_since_memory_check += 1
+            if self._packets_since_memory_check >= MEMORY_CHECK_INTERVAL:
+                self._check_memory_usage()
+
+    def cleanup(self):
+        logging.info('Waiting for pending session writes...')
+        self.writer.close()
+        if self.is_session_started and self.checkpoint_interval is not None:
+            # Kept, so the session can be resumed.
+            self._checkpoint(self._checkpoint_time)
+            self._get_chunk_log().close()
+        elif self.chunk_log is not None:
+            self.chunk_log.delete()
+        self.chunk_log = None
 
     def filter_car_damage(self, packet: CarDamagePacket):
-        timestamp = packet.sessionTime
-        for index, data in enumerate(packet.carDamageData):
-            damage_data = self.data['car_damage'][index]
-            set(damage_data['tyresWear'], timestamp,
-                tuple(x for x in data.tyresWear),
-                DataStorePolicy.ON_CHANGE)
-            set(damage_data['tyresDamage'], timestamp,
-                tuple(x for x in data.tyresDamage),
-                DataStorePolicy.ON_CHANGE)
-            set(damage_data['brakesDamage'], timestamp,
-                tuple(x for x in data.brakesDamage),
-                DataStorePolicy.ON_CHANGE)
-            set(damage_data['frontLeftWingDamage'], timestamp,
-                data.frontLeftWingDamage, DataStorePolicy.ON_CHANGE)
-            set(damage_data['frontRightWingDamage'], timestamp,
-                data.frontRightWingDamage, DataStorePolicy.ON_CHANGE)
-            set(damage_data['rearWingDamage'], timestamp,
-                data.rearWingDamage, DataStorePolicy.ON_CHANGE)
-            set(damage_data['floorDamage'], timestamp, data.floorDamage,
-                DataStorePolicy.ON_CHANGE)
-            set(damage_data['diffuserDamage'], timestamp,
-                data.diffuserDamage, DataStorePolicy.ON_CHANGE)
-            set(damage_data['sidepodDamage'], timestamp,
-                data.sidepodDamage, DataStorePolicy.ON_CHANGE)
-            set(damage_data['drsFault'], timestamp, data.drsFault,
-                DataStorePolicy.ON_CHANGE)
-            set(damage_data['ersFault'], timestamp, data.ersFault,
-                DataStorePolicy.ON_CHANGE)
-            set(damage_data['gearBoxDamage'], timestamp,
-                data.gearBoxDamage, DataStorePolicy.ON_CHANGE)
-            set(damage_data['engineDamage'], timestamp,
-                data.engineDamage, DataStorePolicy.ON_CHANGE)
-            set(damage_data['engineMGUHWear'], timestamp,
-                data.engineMGUHWear, DataStorePolicy.ON_CHANGE)
-            set(damage_data['engineESWear'], timestamp,
-                data.engineESWear, DataStorePolicy.ON_CHANGE)
-            set(damage_data['engineCEWear'], timestamp,
-                data.engineCEWear, DataStorePolicy.ON_CHANGE)
-            set(damage_data['engineICEWear'], timestamp,
-                data.engineICEWear, DataStorePolicy.ON_CHANGE)
-            set(damage_data['engineMGUKWear'], timestamp,
-                data.engineMGUKWear, DataStorePolicy.ON_CHANGE)
-            set(damage_data['engineTCWear'], timestamp,
-                data.engineTCWear, DataStorePolicy.ON_CHANGE)
-            set(damage_data['engineBlown'], timestamp,
-                data.engineBlown, DataStorePolicy.ON_CHANGE)
-            set(damage_data['engineSeized'], timestamp,
-                data.engineSeized, DataStorePolicy.ON_CHANGE)
+        self.car_damage_recorder.record(packet)
 
     def filter_car_setups(self, packet: CarSetupsPacket):
-        timestamp = packet.sessionTime
-        for index, data in enumerate(packet.carSetups):
-            setup_data = self.data['car_setups'][index]
-            set(setup_data['frontWing'], timestamp, data.frontWing,
-                DataStorePolicy.ON_CHANGE)
-            set(setup_data['rearWing'], timestamp, data.rearWing,
-                DataStorePolicy.ON_CHANGE)
-            set(setup_data['onThrottle'], timestamp, data.onThrottle,
-                DataStorePolicy.ON_CHANGE)
-            set(setup_data['offThrottle'], timestamp, data.offThrottle,
-                DataStorePolicy.ON_CHANGE)
-            set(setup_data['frontCamber'], timestamp, data.frontCamber,
-                DataStorePolicy.ON_CHANGE)
-            set(setup_data['rearCamber'], timestamp, data.rearCamber,
-                DataStorePolicy.ON_CHANGE)
-            set(setup_data['frontToe'], timestamp, data.frontToe,
-                DataStorePolicy.ON_CHANGE)
-            set(setup_data['rearToe'], timestamp, data.rearToe,
-                DataStorePolicy.ON_CHANGE)
-            set(setup_data['frontSuspension'], timestamp,
-                data.frontSuspension, DataStorePolicy.ON_CHANGE)
-            set(setup_data['rearSuspension'], timestamp,
-                data.rearSuspension, DataStorePolicy.ON_CHANGE)
-            set(setup_data['frontAntiRollBar'], timestamp,
-                data.frontAntiRollBar, DataStorePolicy.ON_CHANGE)
-            set(setup_data['rearAntiRollBar'], timestamp,
-                data.rearAntiRollBar, DataStorePolicy.ON_CHANGE)
-            set(setup_data['frontSuspensionHeight'], timestamp,
-                data.frontSuspensionHeight, DataStorePolicy.ON_CHANGE)
-            set(setup_data['rearSuspensionHeight'], timestamp,
-                data.rearSuspensionHeight, DataStorePolicy.ON_CHANGE)
-            set(setup_data['brakePressure'], timestamp,
-                data.brakePressure, DataStorePolicy.ON_CHANGE)
-            set(setup_data['brakeBias'], timestamp, data.brakeBias,
-                DataStorePolicy.ON_CHANGE)
-            set(setup_data['rearLeftTyrePressure'], timestamp,
-                data.rearLeftTyrePressure, DataStorePolicy.ON_CHANGE)
-            set(setup_data['rearRightTyrePressure'], timestamp,
-                data.rearRightTyrePressure, DataStorePolicy.ON_CHANGE)
-            set(setup_data['frontLeftTyrePressure'], timestamp,
-                data.frontLeftTyrePressure, DataStorePolicy.ON_CHANGE)
-            set(setup_data['frontRightTyrePressure'], timestamp,
-                data.frontRightTyrePressure, DataStorePolicy.ON_CHANGE)
-            set(setup_data['ballast'], timestamp, data.ballast,
-                DataStorePolicy.ON_CHANGE)
-            set(setup_data['fuelLoad'], timestamp, data.fuelLoad,
-                DataStorePolicy.ON_CHANGE)
+        self.car_setups_recorder.record(packet)
 
     def filter_car_status(self, packet: CarStatusPacket):
-        timestamp = packet.sessionTime
-        for index, data in enumerate(packet.carStatusData):
-            status_data = self.data['car_status'][index]
-            set(status_data['tractionControl'], timestamp,
-                data.tractionControl, DataStorePolicy.ON_CHANGE)
-            set(status_data['antiLockBrakes'], timestamp,
-                data.antiLockBrakes, DataStorePolicy.ON_CHANGE)
-            set(status_data['fuelMix'], timestamp, data.fuelMix,
-                DataStorePolicy.ON_CHANGE)
-            set(status_data['frontBrakeBias'], timestamp,
-                data.frontBrakeBias, DataStorePolicy.ON_CHANGE)
-            set(status_data['pitLimiterStatus'], timestamp,
-                data.pitLimiterStatus, DataStorePolicy.ON_CHANGE)
-            set(status_data['fuelInTank'], timestamp, data.fuelInTank,
-                DataStorePolicy.ON_CHANGE)
-            set(status_data['fuelCapacity'], timestamp,
-                data.fuelCapacity, DataStorePolicy.ON_CHANGE)
-            set(status_data['fuelRemainingLaps'], timestamp,
-                data.fuelRemainingLaps, DataStorePolicy.ON_CHANGE)
-            set(status_data['maxRPM'], timestamp, data.maxRPM,
-                DataStorePolicy.ON_CHANGE)
-            set(status_data['idleRPM'], timestamp, data.idleRPM,
-                DataStorePolicy.ON_CHANGE)
-            set(status_data['maxGears'], timestamp, data.maxGears,
-                DataStorePolicy.ON_CHANGE)
-            set(status_data['drsAllowed'], timestamp, data.drsAllowed,
-                DataStorePolicy.ON_CHANGE)
-            set(status_data['drsActivationDistance'], timestamp,
-                data.drsActivationDistance, DataStorePolicy.ON_CHANGE)
-            set(status_data['actualTypeCompound'], timestamp,
-                data.actualTypeCompound, DataStorePolicy.ON_CHANGE)
-            set(status_data['visualTyreCompound'], timestamp,
-                data.visualTyreCompound, DataStorePolicy.ON_CHANGE)
-            set(status_data['tyresAgeLaps'], timestamp,
-                data.tyresAgeLaps, DataStorePolicy.ON_CHANGE)
-            set(status_data['vehicleFiaFlags'], timestamp,
-                data.vehicleFiaFlags, DataStorePolicy.ON_CHANGE)
-            set(status_data['ersStoreEnergy'], timestamp,
-                data.ersStoreEnergy, DataStorePolicy.ON_CHANGE)
-            set(status_data['ersDeployMode'], timestamp,
-                data.ersDeployMode, DataStorePolicy.ON_CHANGE)
-            set(status_data['ersHarvestedThisLapMGUK'], timestamp,
-                data.ersHarvestedThisLapMGUK, DataStorePolicy.ON_CHANGE)
-            set(status_data['ersHarvestedThisLapMGUH'], timestamp,
-                data.ersHarvestedThisLapMGUH, DataStorePolicy.ON_CHANGE)
-            set(status_data['ersDeployedThisLap'], timestamp,
-                data.ersDeployedThisLap, DataStorePolicy.ON_CHANGE)
-            set(status_data['networkPaused'], timestamp,
-                data.networkPaused, DataStorePolicy.ON_CHANGE)
+        self.car_status_recorder.record(packet)
 
     def filter_car_telemetry(self, packet: CarTelemetryPacket):
-        timestamp = packet.sessionTime
-        for index, data in enumerate(packet.carTelemetryData):
-            telem_data = self.data['car_telemetry'][index]
-            set(telem_data['speed'], timestamp, data.speed,
-                DataStorePolicy.ON_CHANGE)
-            # Storing this telemetry and motion data (below) with 3 decimal
-            # precision shrinks the data file by ~30%.
-            set(telem_data['throttle'], timestamp,
-                float('%.3f' % (data.throttle)),
-                DataStorePolicy.ON_CHANGE)
-            set(telem_data['steer'], timestamp,
-                float('%.3f' % (data.steer)),
-                DataStorePolicy.ON_CHANGE)
-            set(telem_data['brake'], timestamp,
-                float('%.3f' % (data.brake)),
-                DataStorePolicy.ON_CHANGE)
-            set(telem_data['clutch'], timestamp, data.clutch,
-                DataStorePolicy.ON_CHANGE)
-            set(telem_data['gear'], timestamp, data.gear,
-                DataStorePolicy.ON_CHANGE)
-            set(telem_data['engineRPM'], timestamp, data.engineRPM,
-                DataStorePolicy.ON_CHANGE)
-            set(telem_data['drs'], timestamp, data.drs,
-                DataStorePolicy.ON_CHANGE)
-            set(telem_data['revLightsPercent'], timestamp,
-                data.revLightsPercent, DataStorePolicy.ON_CHANGE)
-            set(telem_data['revLightsBitValue'], timestamp,
-                data.revLightsBitValue, DataStorePolicy.ON_CHANGE)
-            set(telem_data['brakesTemperature'], timestamp,
-                tuple(x for x in data.brakesTemperature),
-                DataStorePolicy.ON_CHANGE)
-            set(telem_data['tiresSurfaceTemperature'], timestamp,
-                tuple(x for x in data.tiresSurfaceTemperature),
-                DataStorePolicy.ON_CHANGE)
-            set(telem_data['tiresInnerTemperature'], timestamp,
-                tuple(x for x in data.tiresInnerTemperature),
-                DataStorePolicy.ON_CHANGE)
-            set(telem_data['engineTemperature'], timestamp,
-                data.engineTemperature,
-                DataStorePolicy.ON_CHANGE)
-            set(telem_data['tiresPressure'], timestamp,
-                tuple(x for x in data.tiresPressure),
-                DataStorePolicy.ON_CHANGE)
-            set(telem_data['surfaceType'], timestamp,
-                tuple(x for x in data.surfaceType),
-                DataStorePolicy.ON_CHANGE)
+        self.car_telemetry_recorder.record(packet)
 
     def filter_event(self, packet: EventPacket):
         event_code = du.to_string(packet.eventStringCode)
@@ -302,6 +388,7 @@ class ReplayFilter(Filter):
             else:
                 logging.info('Session start detected.')
                 self.is_session_started = True
+                self.session_uid = packet.sessionUID
                 self.session_start_time = time.time()
                 self.data['event'][event_code] = (
                     packet.sessionTime, event_code)
@@ -378,101 +465,16 @@ class ReplayFilter(Filter):
                  data.flashbackSessionTime))
 
     def filter_final_classification(self, packet: FinalClassificationPacket):
-        timestamp = packet.sessionTime
         self.data['final_classification']['numCars'] = packet.numCars
-        for index, data in enumerate(packet.classificationData):
-            data_list = self.data['final_classification']['data'][index]
-            set(data_list['position'], timestamp, data.position,
-                DataStorePolicy.FIRST)
-            set(data_list['numLaps'], timestamp, data.numLaps,
-                DataStorePolicy.FIRST)
-            set(data_list['gridPosition'], timestamp, data.gridPosition,
-                DataStorePolicy.FIRST)
-            set(data_list['points'], timestamp, data.points,
-                DataStorePolicy.FIRST)
-            set(data_list['numPitStops'], timestamp, data.numPitStops,
-                DataStorePolicy.FIRST)
-            set(data_list['resultStatus'], timestamp, data.resultStatus,
-                DataStorePolicy.FIRST)
-            set(data_list['bestLapTimeInMS'], timestamp, data.bestLapTimeInMS,
-                DataStorePolicy.FIRST)
-            set(data_list['totalRaceTime'], timestamp, data.totalRaceTime,
-                DataStorePolicy.FIRST)
-            set(data_list['penaltiesTime'], timestamp, data.penaltiesTime,
-                DataStorePolicy.FIRST)
-            set(data_list['numPenalties'], timestamp, data.numPenalties,
-                DataStorePolicy.FIRST)
-            set(data_list['numTyreStints'], timestamp, data.numTyreStints,
-                DataStorePolicy.FIRST)
-            set(data_list['tyreStintsActual'], timestamp,
-                tuple(x for x in data.tyreStintsActual), DataStorePolicy.FIRST)
-            set(data_list['tyreStintsVisual'], timestamp,
-                tuple(x for x in data.tyreStintsVisual), DataStorePolicy.FIRST)
-            set(data_list['tyreStintEndLaps'], timestamp,
-                tuple(x for x in data.tyreStintEndLaps), DataStorePolicy.FIRST)
+        self.final_classification_recorder.record(packet)
         logging.info('Final classification received.')
         self._save_data()
 
     def filter_lap_data(self, packet: LapDataPacket):
-        timestamp = packet.sessionTime
-        for index, data in enumerate(packet.lapData):
-            lap_data = self.data['lap_data'][index]
-            set(lap_data['lastLapTimeInMS'], timestamp,
-                data.lastLapTimeInMS, DataStorePolicy.ON_CHANGE)
-            set(lap_data['currentLapTimeInMS'], timestamp,
-                data.currentLapTimeInMS, DataStorePolicy.ON_CHANGE)
-            set(lap_data['sector1TimeInMS'], timestamp,
-                data.sector1TimeInMS, DataStorePolicy.ON_CHANGE)
-            set(lap_data['sector2TimeInMS'], timestamp,
-                data.sector2TimeInMS, DataStorePolicy.ON_CHANGE)
-            set(lap_data['carPosition'], timestamp, data.carPosition,
-                DataStorePolicy.ON_CHANGE)
-            set(lap_data['currentLapNum'], timestamp, data.currentLapNum,
-                DataStorePolicy.ON_CHANGE)
-            set(lap_data['pitStatus'], timestamp, data.pitStatus,
-                DataStorePolicy.ON_CHANGE)
-            set(lap_data['numPitStops'], timestamp, data.numPitStops,
-                DataStorePolicy.ON_CHANGE)
-            set(lap_data['sector'], timestamp, data.sector,
-                DataStorePolicy.ON_CHANGE)
-            set(lap_data['currentLapInvalid'], timestamp,
-                data.currentLapInvalid, DataStorePolicy.ON_CHANGE)
-            set(lap_data['penalties'], timestamp, data.penalties,
-                DataStorePolicy.ON_CHANGE)
-            set(lap_data['warnings'], timestamp, data.warnings,
-                DataStorePolicy.ON_CHANGE)
-            set(lap_data['numUnservedDriveThroughPens'], timestamp,
-                data.numUnservedDriveThroughPens,
-                DataStorePolicy.ON_CHANGE)
-            set(lap_data['numUnservedStopGoPens'], timestamp,
-                data.numUnservedStopGoPens, DataStorePolicy.ON_CHANGE)
-            set(lap_data['gridPosition'], timestamp, data.gridPosition,
-                DataStorePolicy.ON_CHANGE)
-            set(lap_data['driverStatus'], timestamp, data.driverStatus,
-                DataStorePolicy.ON_CHANGE)
-            set(lap_data['resultStatus'], timestamp, data.resultStatus,
-                DataStorePolicy.ON_CHANGE)
-            set(lap_data['pitLaneTimerActive'], timestamp,
-                data.pitLaneTimerActive, DataStorePolicy.ON_CHANGE)
-            set(lap_data['pitLaneTimeInLaneInMS'], timestamp,
-                data.pitLaneTimeInLaneInMS, DataStorePolicy.ON_CHANGE)
-            set(lap_data['pitStopTimerInMS'], timestamp,
-                data.pitStopTimerInMS, DataStorePolicy.ON_CHANGE)
-            set(lap_data['pitStopShouldServePen'], timestamp,
-                data.pitStopShouldServePen, DataStorePolicy.ON_CHANGE)
+        self.lap_data_recorder.record(packet)
 
     def filter_motion(self, packet: MotionPacket):
-        for index, data in enumerate(packet.carMotionData):
-            data_list = self.data['motion'][index]
-            set(data_list['worldPositionX'], packet.sessionTime,
-                float('%.3f' % (data.worldPositionX)),
-                DataStorePolicy.ON_CHANGE)
-            set(data_list['worldPositionY'], packet.sessionTime,
-                float('%.3f' % (data.worldPositionY)),
-                DataStorePolicy.ON_CHANGE)
-            set(data_list['yaw'], packet.sessionTime,
-                float('%.3f' % (data.yaw)),
-                DataStorePolicy.ON_CHANGE)
+        self.motion_recorder.record(packet)
 
     def filter_participants(self, packet: ParticipantsPacket):
         p_data = self.data['participants']
@@ -491,146 +493,85 @@ class ReplayFilter(Filter):
                 participant['yourTelemetry'] = data.yourTelemetry
 
     def filter_session(self, packet: SessionPacket):
-        session_data = self.data['session']
-        set(session_data['sessionUID'], packet.sessionTime,
-            packet.sessionUID, DataStorePolicy.FIRST)
-        set(session_data['weather'], packet.sessionTime,
-            packet.weather, DataStorePolicy.ON_CHANGE)
-        set(session_data['trackTemperature'], packet.sessionTime,
-            packet.trackTemperature, DataStorePolicy.ON_CHANGE)
-        set(session_data['airTemperature'], packet.sessionTime,
-            packet.airTemperature, DataStorePolicy.ON_CHANGE)
-        set(session_data['totalLaps'], packet.sessionTime,
-            packet.totalLaps, DataStorePolicy.FIRST)
-        set(session_data['trackLength'], packet.sessionTime,
-            packet.trackLength, DataStorePolicy.FIRST)
-        set(session_data['sessionType'], packet.sessionTime,
-            packet.sessionType, DataStorePolicy.FIRST)
-        set(session_data['trackId'], packet.sessionTime,
-            packet.trackId, DataStorePolicy.FIRST)
-        set(session_data['formula'], packet.sessionTime,
-            packet.formula, DataStorePolicy.FIRST)
-        set(session_data['pitSpeedLimit'], packet.sessionTime,
-            packet.pitSpeedLimit, DataStorePolicy.FIRST)
-        set(session_data['gamePaused'], packet.sessionTime,
-            packet.gamePaused, DataStorePolicy.ON_CHANGE)
-        set(session_data['numMarshalZones'], packet.sessionTime,
-            packet.numMarshalZones, DataStorePolicy.FIRST)
-        session_data['marshalZones'].append((
-            packet.sessionTime,
-            [x.zoneFlag for x in packet.marshalZones]))
-        set(session_data['safetyCarStatus'], packet.sessionTime,
-            packet.safetyCarStatus, DataStorePolicy.ON_CHANGE)
-        set(session_data['networkGame'], packet.sessionTime,
-            packet.networkGame, DataStorePolicy.FIRST)
-        set(session_data['forecastAccuracy'], packet.sessionTime,
-            packet.forecastAccuracy, DataStorePolicy.FIRST)
-        set(session_data['aiDifficulty'], packet.sessionTime,
-            packet.aiDifficulty, DataStorePolicy.FIRST)
-        set(session_data['seasonLinkIdentifier'], packet.sessionTime,
-            packet.seasonLinkIdentifier, DataStorePolicy.FIRST)
-        set(session_data['weekendLinkIdentifier'], packet.sessionTime,
-            packet.weekendLinkIdentifier, DataStorePolicy.FIRST)
-        set(session_data['sessionLinkIdentifier'], packet.sessionTime,
-            packet.sessionLinkIdentifier, DataStorePolicy.FIRST)
-        set(session_data['steeringAssist'], packet.sessionTime,
-            packet.steeringAssist, DataStorePolicy.ON_CHANGE)
-        set(session_data['brakingAssist'], packet.sessionTime,
-            packet.brakingAssist, DataStorePolicy.ON_CHANGE)
-        set(session_data['gearboxAssist'], packet.sessionTime,
-            packet.gearboxAssist, DataStorePolicy.ON_CHANGE)
-        set(session_data['pitAssist'], packet.sessionTime,
-            packet.pitAssist, DataStorePolicy.ON_CHANGE)
-        set(session_data['pitReleaseAssist'], packet.sessionTime,
-            packet.pitReleaseAssist, DataStorePolicy.ON_CHANGE)
-        set(session_data['ERSAssist'], packet.sessionTime,
-            packet.ERSAssist, DataStorePolicy.ON_CHANGE)
-        set(session_data['DRSAssist'], packet.sessionTime,
-            packet.DRSAssist, DataStorePolicy.ON_CHANGE)
-        set(session_data['dynamicRacingLine'], packet.sessionTime,
-            packet.dynamicRacingLine, DataStorePolicy.ON_CHANGE)
-        set(session_data['dynamicRacingLineType'], packet.sessionTime,
-            packet.dynamicRacingLineType, DataStorePolicy.ON_CHANGE)
-        set(session_data['gameMode'], packet.sessionTime,
-            packet.gameMode, DataStorePolicy.FIRST)
-        set(session_data['ruleSet'], packet.sessionTime,
-            packet.ruleSet, DataStorePolicy.FIRST)
-        set(session_data['timeOfDay'], packet.sessionTime,
-            packet.timeOfDay, DataStorePolicy.ON_CHANGE)
-        set(session_data['sessionLength'], packet.sessionTime,
-            packet.sessionLength, DataStorePolicy.FIRST)
+        self.session_recorder.record(packet)
+
+    def _get_chunk_log(self) -> ChunkLog:
+        if self.chunk_log is None:
+            self.chunk_log = ChunkLog(self.output_directory /
+                                      f'{self.session_uid}{CHUNK_LOG_SUFFIX}')
+        return self.chunk_log
+
+    def _checkpoint(self, session_time: float):
+        self._checkpoint_time = session_time
+        self._get_chunk_log().checkpoint(self._series, {
+            'sessionTime': session_time,
+            'event': self.data['event'],
+            'participants': self.data['participants'],
+            'numCars': self.data['final_classification']['numCars'],
+            'recorders': {name: recorder.get_last_values()
+                          for name, recorder in self._recorders.items()},
+        })
+
+    def _recover(self, session_uid: int) -> bool:
+        # Resumes a session from the last checkpoint of its chunk log, if
+        # it has one.
+        if session_uid not in self._recoverable_sessions:
+            return False
+        self._recoverable_sessions.remove(session_uid)
+        chunk_log = ChunkLog(self.output_directory /
+                             f'{session_uid}{CHUNK_LOG_SUFFIX}')
+        try:
+            state = chunk_log.recover()
+        except (OSError, ValueError):
+            logging.exception(f'Failed to recover session: {chunk_log.path}')
+            return False
+        if state is None:
+            logging.info(f'No checkpoint to recover: {chunk_log.path}')
+            return False
+        logging.info(f'Resuming session from checkpoint: {chunk_log.path}')
+        self._reset()
+        for code, value in state['event'].items():
+            # Events were tuples, and lists of tuples.
+            if isinstance(self.data['event'][code], list):
+                value = [tuple(x) for x in value]
+            elif value is not None:
+                value = tuple(value)
+            self.data['event'][code] = value
+        self.data['participants'] = state['participants']
+        self.data['final_classification']['numCars'] = state['numCars']
+        for name, recorder in self._recorders.items():
+            recorder.set_last_values(state['recorders'][name])
+        self.chunk_log = chunk_log
+        self.session_uid = session_uid
+        self.is_session_started = True
+        self.session_start_time = time.time()
+        self._checkpoint_time = state['sessionTime']
+        return True
+
+    def _check_memory_usage(self):
+        self._packets_since_memory_check = 0
+        usage = get_memory_usage(self._series)
+        if self.memory_budget is None or usage <= self.memory_budget:
+            return
+        chunk_log = self._get_chunk_log()
+        logging.info(f'Spilling {usage} bytes of samples to: '
+                     f'{chunk_log.path}')
+        chunk_log.spill(self._series)
 
     def _reset(self):
+        if self.chunk_log is not None:
+            # The session was abandoned before it could be written.
+            self.chunk_log.delete()
+            self.chunk_log = None
+        self._packets_since_memory_check = 0
+        self._checkpoint_time = 0
         self.is_session_started = False
         self.session_start_time = 0
         self.session_end_time = 0
-        self.file_start_write_time = 0
-        self.file_end_write_time = 0
         self.data = {
-            'motion':
-                [{
-                    'worldPositionX': [],
-                    'worldPositionY': [],
-                    'yaw': []
-                } for _ in range(GRID_SIZE)],
-            'session': {
-                'sessionUID': [],
-                'weather': [],
-                'trackTemperature': [],
-                'airTemperature': [],
-                'totalLaps': [],
-                'trackLength': [],
-                'sessionType': [],
-                'trackId': [],
-                'formula': [],
-                'pitSpeedLimit': [],
-                'gamePaused': [],
-                'numMarshalZones': [],
-                'marshalZones': [],
-                'safetyCarStatus': [],
-                'networkGame': [],
-                'forecastAccuracy': [],
-                'aiDifficulty': [],
-                'seasonLinkIdentifier': [],
-                'weekendLinkIdentifier': [],
-                'sessionLinkIdentifier': [],
-                'steeringAssist': [],
-                'brakingAssist': [],
-                'gearboxAssist': [],
-                'pitAssist': [],
-                'pitReleaseAssist': [],
-                'ERSAssist': [],
-                'DRSAssist': [],
-                'dynamicRacingLine': [],
-                'dynamicRacingLineType': [],
-                'gameMode': [],
-                'ruleSet': [],
-                'timeOfDay': [],
-                'sessionLength': []},
-            'lap_data':
-                [{
-                    'lastLapTimeInMS': [],
-                    'currentLapTimeInMS': [],
-                    'sector1TimeInMS': [],
-                    'sector2TimeInMS': [],
-                    'carPosition': [],
-                    'currentLapNum': [],
-                    'pitStatus': [],
-                    'numPitStops': [],
-                    'sector': [],
-                    'currentLapInvalid': [],
-                    'penalties': [],
-                    'warnings': [],
-                    'numUnservedDriveThroughPens': [],
-                    'numUnservedStopGoPens': [],
-                    'gridPosition': [],
-                    'driverStatus': [],
-                    'resultStatus': [],
-                    'pitLaneTimerActive': [],
-                    'pitLaneTimeInLaneInMS': [],
-                    'pitStopTimerInMS': [],
-                    'pitStopShouldServePen': [],
-                } for _ in range(GRID_SIZE)],
+            'motion': self.motion_recorder.reset(),
+            'session': self.session_recorder.reset(),
+            'lap_data': self.lap_data_recorder.reset(),
             'event': {
                 EventStringCode.SESSION_START.value: None,
                 EventStringCode.SESSION_END.value: None,
@@ -662,120 +603,16 @@ class ReplayFilter(Filter):
                             'yourTelemetry': None,
                         } for _ in range(GRID_SIZE)]
                 },
-            'car_setups':
-                [{
-                    'frontWing': [],
-                    'rearWing': [],
-                    'onThrottle': [],
-                    'offThrottle': [],
-                    'frontCamber': [],
-                    'rearCamber': [],
-                    'frontToe': [],
-                    'rearToe': [],
-                    'frontSuspension': [],
-                    'rearSuspension': [],
-                    'frontAntiRollBar': [],
-                    'rearAntiRollBar': [],
-                    'frontSuspensionHeight': [],
-                    'rearSuspensionHeight': [],
-                    'brakePressure': [],
-                    'brakeBias': [],
-                    'rearLeftTyrePressure': [],
-                    'rearRightTyrePressure': [],
-                    'frontLeftTyrePressure': [],
-                    'frontRightTyrePressure': [],
-                    'ballast': [],
-                    'fuelLoad': [],
-                } for _ in range(GRID_SIZE)],
-            'car_telemetry':
-                [{
-                    'speed': [],
-                    'throttle': [],
-                    'steer': [],
-                    'brake': [],
-                    'clutch': [],
-                    'gear': [],
-                    'engineRPM': [],
-                    'drs': [],
-                    'revLightsPercent': [],
-                    'revLightsBitValue': [],
-                    'brakesTemperature': [],
-                    'tiresSurfaceTemperature': [],
-                    'tiresInnerTemperature': [],
-                    'engineTemperature': [],
-                    'tiresPressure': [],
-                    'surfaceType': [],
-                } for _ in range(GRID_SIZE)],
-            'car_status':
-                [{
-                    'tractionControl': [],
-                    'antiLockBrakes': [],
-                    'fuelMix': [],
-                    'frontBrakeBias': [],
-                    'pitLimiterStatus': [],
-                    'fuelInTank': [],
-                    'fuelCapacity': [],
-                    'fuelRemainingLaps': [],
-                    'maxRPM': [],
-                    'idleRPM': [],
-                    'maxGears': [],
-                    'drsAllowed': [],
-                    'drsActivationDistance': [],
-                    'actualTypeCompound': [],
-                    'visualTyreCompound': [],
-                    'tyresAgeLaps': [],
-                    'vehicleFiaFlags': [],
-                    'ersStoreEnergy': [],
-                    'ersDeployMode': [],
-                    'ersHarvestedThisLapMGUK': [],
-                    'ersHarvestedThisLapMGUH': [],
-                    'ersDeployedThisLap': [],
-                    'networkPaused': [],
-                } for _ in range(GRID_SIZE)],
-            'car_damage':
-                [{
-                    'tyresWear': [],
-                    'tyresDamage': [],
-                    'brakesDamage': [],
-                    'frontLeftWingDamage': [],
-                    'frontRightWingDamage': [],
-                    'rearWingDamage': [],
-                    'floorDamage': [],
-                    'diffuserDamage': [],
-                    'sidepodDamage': [],
-                    'drsFault': [],
-                    'ersFault': [],
-                    'gearBoxDamage': [],
-                    'engineDamage': [],
-                    'engineMGUHWear': [],
-                    'engineESWear': [],
-                    'engineCEWear': [],
-                    'engineICEWear': [],
-                    'engineMGUKWear': [],
-                    'engineTCWear': [],
-                    'engineBlown': [],
-                    'engineSeized': [],
-                } for _ in range(GRID_SIZE)],
+            'car_setups': self.car_setups_recorder.reset(),
+            'car_telemetry': self.car_telemetry_recorder.reset(),
+            'car_status': self.car_status_recorder.reset(),
+            'car_damage': self.car_damage_recorder.reset(),
             'final_classification': {
-                    'numCars': 0,
-                    'data': [{
-                        'position': [],
-                        'numLaps': [],
-                        'gridPosition': [],
-                        'points': [],
-                        'numPitStops': [],
-                        'resultStatus': [],
-                        'bestLapTimeInMS': [],
-                        'totalRaceTime': [],
-                        'penaltiesTime': [],
-                        'numPenalties': [],
-                        'numTyreStints': [],
-                        'tyreStintsActual': [],
-                        'tyreStintsVisual': [],
-                        'tyreStintEndLaps': [],
-                    } for _ in range(GRID_SIZE)],
-                }
+                'numCars': 0,
+                'data': self.final_classification_recorder.reset(),
+            },
         }
+        self._series = find_series(self.data)
 
     def _save_data(self):
         if self.data['participants']['numActiveCars'] is None:
@@ -785,26 +622,38 @@ class ReplayFilter(Filter):
         logging.info('Session filtering complete.')
         logging.debug(f'Session filter time: \
 {self.session_end_time - self.session_start_time}')
-        logging.info('Writing data to file...')
-        self.file_start_write_time = time.time()
-        track_name = TRACK_NAMES[
-            self.data['session']['trackId'][0][1]].replace(' ', '_')[0:12]
-        session_type = SESSION_TEXT[
-            self.data['session']['sessionType'][0][1]][0:12].replace(
-                ' ', '_').replace('-', '_')
-        session_uid = str(self.data['session']['sessionUID'][0][1])[-8:]
+        # The series' samples may have been spilled to the chunk log, but
+        # the recorder keeps the last values.
+        last_value = self.session_recorder.last_value
+        track_name = TRACK_NAMES[last_value('trackId')].replace(
+            ' ', '_')[0:12]
+        session_type = SESSION_TEXT[last_value('sessionType')][0:12].replace(
+            ' ', '_').replace('-', '_')
+        session_uid = str(last_value('sessionUID'))[-8:]
         filename = f'{track_name}_{session_type}_{session_uid}_fv\
-{self.format_version}.json'
-        filepath = Path('saved_data')
-        filepath.mkdir(exist_ok=True)
-        filepath = filepath / filename
-        with filepath.open(mode='w', encoding='utf-8') as f:
-            json.dump(self.data, f, ensure_ascii=False,
-                      separators=(',', ':'))
-        logging.info(f'Finished writing file: {filename}\n')
-        self.file_end_write_time = time.time()
-        logging.debug(f'File write time: \
-{self.file_end_write_time - self.file_start_write_time}')
-        logging.debug(f'Total time: \
-{self.file_end_write_time - self.session_start_time}')
+{self.format_version}{FORMAT_SUFFIXES[self.format]}'
+        if self.compression is not None:
+            filename += COMPRESSION_SUFFIXES[self.compression]
+        filepath = self.output_directory / filename
+        logging.info(f'Writing data to file: {filename}')
+        # The recorders start new series on reset, so the submitted data is
+        # left as is while it's written.
+        data = self.data
+        if self.chunk_log is not None:
+            # The spilled samples are read back a series at a time, as
+            # they're written.
+            data = self.chunk_log.attach(data)
+        self.writer.submit(filepath, data, partial(
+            self._on_session_written, filepath, self.chunk_log))
+        self.chunk_log = None
         self._reset()
+
+    def _on_session_written(self, path: Path, chunk_log: Optional[ChunkLog]):
+        # Called on the writer thread. The chunk log is only deleted once
+        # the session has been written, so its checkpoints outlive a failed
+        # write.
+        if chunk_log is not None:
+            chunk_log.delete()
+        with self._saved_files_lock:
+            self._saved_files.append(path)
+
@@ -1,14 +1,26 @@
 from argparse import ArgumentParser, RawTextHelpFormatter
+import asyncio
+from functools import partial
 import logging
+from pathlib import Path
 import sys
 import time
-from typing import cast, Dict, Final, Tuple, Type
+from typing import Any, Callable, cast, Dict, Final, Tuple, Type, Union
+from filters.CaptureFilter import CaptureFilter
 from filters.DebugFilter import DebugFilter
 from filters.Filter import Filter
 from filters.LogFilter import LogFilter
 from filters.NullFilter import NullFilter
 from filters.ReplayFilter import ReplayFilter
-from parsers.UDPParser import UDPParser
+from parsers.AsyncUDPParser import AsyncUDPParser
+from parsers.FileParser import FileParser
+from parsers.PacketQueue import BackpressurePolicy
+from parsers.ShardedUDPParser import ShardedUDPParser
+from parsers.UDPParser import (
+    DEFAULT_BATCH_SIZE, DEFAULT_QUEUE_SIZE, UDPParser)
+from replay.compression import check_compression_level, Compression
+from replay.formats import ReplayFormat
+from utilities.parse import ParseBackend, set_parse_backend
 
 DEFAULT_PORT: Final[int] = 20777
 
@@ -17,6 +29,8 @@ MAIN_THREAD_SLEEP_TIME_S: Final[float] = 0.016
 logging.basicConfig(level=logging.INFO, format='%(message)s')
 
 FILTERS: Dict[str, Tuple[str, Type[Filter]]] = {
+    'capture': ('Records the raw packets to a capture file.',
+                CaptureFilter),
     'debug': ('Logs packet ids to the console for debugging.', DebugFilter),
     'log': ('Logs basic session information to the console.', LogFilter),
     'null': ('Receives the parsed data but performs no action.',
@@ -37,26 +51,145 @@ UDP telemetry.')
     arg_parser.add_argument(
         '-p', '--port', type=int,
         help=f'The UDP port to listen on. Defaults to {DEFAULT_PORT}.')
+    arg_parser.add_argument(
+        '-b', '--batch-size', type=int,
+        help=f'''The maximum number of packets read from the socket per
+wakeup, up to the queue size. Defaults to {DEFAULT_BATCH_SIZE}.''')
     arg_parser.add_argument(
         '-f', '--filter', type=str, required=True,
         help=f'''The filter applied to parsed data. Available filters:
 \n\n{AVAILABLE_FILTERS_HELP_TEXT}''')
+    arg_parser.add_argument(
+        '-q', '--queue-size', type=int, default=DEFAULT_QUEUE_SIZE,
+        help=f'''The maximum number of packets waiting to be filtered.
+Defaults to {DEFAULT_QUEUE_SIZE}.''')
+    arg_parser.add_argument(
+        '--backpressure', type=BackpressurePolicy,
+        choices=list(BackpressurePolicy),
+        metavar='{' + ','.join(x.value for x in BackpressurePolicy) + '}',
+        help='''What to do with packets that arrive when the queue is full.
+Defaults to block (--async always drops the newest packets).''')
+    arg_parser.add_argument(
+        '-w', '--workers', type=int, default=0,
+        help='''The number of worker processes to parse and filter packets
+in, with each session handled by a single worker (and filter instance).
+Defaults to 0, which parses and filters in the main process.''')
+    arg_parser.add_argument(
+        '-d', '--decoder', type=ParseBackend, default=ParseBackend.CTYPES,
+        choices=list(ParseBackend),
+        metavar='{' + ','.join(x.value for x in ParseBackend) + '}',
+        help='''How packets are decoded: ctypes structures, or records
+unpacked up front with precompiled structs. Defaults to ctypes.''')
+    arg_parser.add_argument(
+        '-a', '--async', dest='use_async', action='store_true',
+        help='''Parse and filter packets on a single asyncio event loop
+instead of producer/consumer threads.''')
+    arg_parser.add_argument(
+        '-i', '--input', type=Path,
+        help='''A capture file (see the capture filter) to replay through
+the filter instead of listening for packets.''')
+    arg_parser.add_argument(
+        '-s', '--speed', type=float, default=0,
+        help='''The speed to replay the input at, relative to the time it
+was captured in (e.g., 1 for real time). Defaults to 0, which replays it as
+fast as possible.''')
+    arg_parser.add_argument(
+        '-c', '--compression', type=Compression,
+        choices=list(Compression),
+        metavar='{' + ','.join(x.value for x in Compression) + '}',
+        help='''The codec the replay filter compresses its files with.
+Defaults to no compression.''')
+    arg_parser.add_argument(
+        '--compression-level', type=int,
+        help='''The compression level (gzip and bz2: 1-9, lzma: 0-9), which
+requires --compression. Defaults to the codec's default.''')
+    arg_parser.add_argument(
+        '--format', type=ReplayFormat, choices=list(ReplayFormat),
+        metavar='{' + ','.join(x.value for x in ReplayFormat) + '}',
+        help='''The format the replay filter writes its files in.
+Defaults to json.''')
+    arg_parser.add_argument(
+        '--memory-budget', type=int,
+        help='''The memory (in MB) the replay filter's recorded samples can
+use before they're spilled to disk until the session is written. Defaults to
+no limit.''')
+    arg_parser.add_argument(
+        '--checkpoint-interval', type=float,
+        help='''The session time (in seconds) between checkpoints of the
+replay filter's session, from which it's resumed after a crash. Defaults to
+no checkpoints.''')
     return vars(arg_parser.parse_args())
 
 
 if __name__ == '__main__':
     args = get_args()
     port = cast(int, args['port']) or DEFAULT_PORT
+    set_parse_backend(args['decoder'])
     try:
-        filter: Filter = FILTERS[args['filter']][1]()
+        filter_type: Callable[[], Filter] = FILTERS[args['filter']][1]
     except KeyError:
         logging.info(f'Unexpected filter given: {args["filter"]}')
         sys.exit(1)
-    parser = UDPParser(filter, port)
     try:
-        parser.start()
-        while parser.is_running():
-            time.sleep(MAIN_THREAD_SLEEP_TIME_S)
-    except KeyboardInterrupt:
+        check_compression_level(args['compression'],
+                                args['compression_level'])
+    except ValueError as error:
+        logging.info(error)
+        sys.exit(1)
+    if args['memory_budget'] is not None:
+        args['memory_budget'] *= 1024 * 1024
+    replay_args = {key: args[key] for key in (
+        'compression', 'compression_level', 'format', 'memory_budget',
+        'checkpoint_interval')
+        if args[key] is not None}
+    if replay_args:
+        if filter_type is not ReplayFilter:
+            logging.info('Compression, formats, memory budgets and '
+                         'checkpoints are only supported by the replay '
+                         'filter.')
+            sys.exit(1)
+        filter_type = partial(ReplayFilter, **replay_args)
+    if args['input'] is not None and (args['use_async'] or args['workers']):
+        logging.info('An input file can\'t be replayed with --async or '
+                     '--workers.')
+        sys.exit(1)
+    if args['use_async'] and (
+            args['batch_size'] is not None
+            or args['backpressure'] is not None or args['workers']):
+        logging.info('--batch-size, --backpressure and --workers aren\'t '
+                     'supported with --async.')
+        sys.exit(1)
+    if args['use_async']:
+        filter: Filter = filter_type()
+        try:
+            asyncio.run(
+                AsyncUDPParser(filter, port, args['queue_size']).run())
+        except KeyboardInterrupt:
+            filter.cleanup()
+    else:
+        parser_args: Dict[str, Any] = {
+            'batch_size': (DEFAULT_BATCH_SIZE if args['batch_size'] is None
+                           else args['batch_size']),
+            'queue_size': args['queue_size'],
+            'policy': args['backpressure'] or BackpressurePolicy.BLOCK,
+        }
+        parser: Union[FileParser, UDPParser]
+        if args['workers'] > 0:
+            # Each worker creates (and cleans up) its own filters.
+            parser = ShardedUDPParser(filter_type, port, args['workers'],
+                                      **parser_args)
+        else:
+            filter = filter_type()
+            if args['input'] is not None:
+                parser = FileParser(filter, args['input'], args['speed'])
+            else:
+                parser = UDPParser(filter, port, **parser_args)
+        try:
+            parser.start()
+            while parser.is_running():
+                time.sleep(MAIN_THREAD_SLEEP_TIME_S)
+        except KeyboardInterrupt:
+            pass
         parser.stop()
-        filter.cleanup()
+        if args['workers'] == 0:
+            filter.cleanup()
@@ -0,0 +1,182 @@
+from ctypes import Array, sizeof, Structure, Union
+from typing import Any, Dict, Final, Optional
+import numpy as np
+from constants.constants import PacketId
+from custom_types.game import get_fields, get_struct_format
+from packets.packets import PACKET_TYPE
+from utilities.packet import get_packet_id
+
+"""This module contains NumPy views of packets, for vectorized processing.
+
+NumPy is an optional dependency: only import this module if it's installed.
+
+Packed structured dtypes are derived from the ctypes structures (using the
+same field offsets), so a packet's bytes can be viewed as a NumPy record
+without copying or decoding it. The per-car arrays of a packet then become
+structured arrays of GRID_SIZE records, e.g.:
+
+    cars = car_view(data)
+    cars['speed'].max()
+    cars['brakesTemperature'].max()
+
+Batches of packets of a single type can also be parsed into columns (see
+parse_columns), with one array per field spanning the whole batch.
+"""
+
+
+def create_dtype(ctype: Any) -> np.dtype:
+    """Creates a packed structured dtype with the layout of a ctypes type.
+
+    Args:
+        ctype: The ctypes structure, union, array or simple type.
+
+    Returns:
+        The equivalent little-endian NumPy dtype.
+    """
+
+    if isinstance(ctype, type) and issubclass(ctype, (Structure, Union)):
+        fields = get_fields(ctype)
+        return np.dtype({
+            'names': [name for name, _ in fields],
+            'formats': [create_dtype(field_type) for _, field_type in fields],
+            'offsets': [getattr(ctype, name).offset for name, _ in fields],
+            'itemsize': sizeof(ctype),
+        })
+    if isinstance(ctype, type) and issubclass(ctype, Array):
+        element = ctype._type_
+        if (not issubclass(element, (Structure, Union, Array))
+                and get_struct_format(element) == 'c'):
+            return np.dtype(f'S{ctype._length_}')
+        return np.dtype((create_dtype(element), (ctype._length_,)))
+    format = get_struct_format(ctype)
+    return np.dtype('S1' if format == 'c' else f'<{format}')
+
+
+PACKET_DTYPES: Final[Dict[int, np.dtype]] = {
+    id: create_dtype(packet_type) for id, packet_type in PACKET_TYPE.items()}
+"""Associates packet ids with the structured dtype of that packet type."""
+
+PER_CAR_FIELDS: Final[Dict[int, str]] = {
+    PacketId.MOTION.value: 'carMotionData',
+    PacketId.LAP_DATA.value: 'lapData',
+    PacketId.PARTICIPANTS.value: 'participants',
+    PacketId.CAR_SETUPS.value: 'carSetups',
+    PacketId.CAR_TELEMETRY.value: 'carTelemetryData',
+    PacketId.CAR_STATUS.value: 'carStatusData',
+    PacketId.FINAL_CLASSIFICATION.value: 'classificationData',
+    PacketId.LOBBY_INFO.value: 'lobbyPlayers',
+    PacketId.CAR_DAMAGE.value: 'carDamageData',
+}
+"""Associates packet ids with the name of the packet's per-car array."""
+
+
+def packet_view(data: Any) -> np.ndarray:
+    """Views a packet's bytes as a NumPy record without copying them.
+
+    Args:
+        data: The packet's bytes, or any object exposing them through the
+            buffer protocol (e.g., a memoryview or a ctypes packet).
+
+    Returns:
+        A 0-dimensional structured array. It's read-only if data is.
+    """
+
+    packet_id = get_packet_id(memoryview(data).cast('B'))
+    return np.frombuffer(data, PACKET_DTYPES[packet_id], count=1)[0, ...]
+
+
+def car_view(data: Any) -> np.ndarray:
+    """Views the per-car array of a packet without copying it.
+
+    Args:
+        data: The packet's bytes, or any object exposing them through the
+            buffer protocol. The packet must have a per-car array (see
+            PER_CAR_FIELDS).
+
+    Returns:
+        A structured array with a record for each grid position.
+    """
+
+    packet_id = get_packet_id(memoryview(data).cast('B'))
+    try:
+        name = PER_CAR_FIELDS[packet_id]
+    except KeyError:
+        raise ValueError(
+            f'Packet has no per-car data in car_view: {packet_id}') from None
+    return packet_view(data)[name]
+
+
+def records_view(data: Any, packet_id: Optional[int] = None) -> np.ndarray:
+    """Views a batch of packets of a single type as a structured array.
+
+    Args:
+        data: Either a sequence of packets' bytes, or a single buffer of
+            consecutive packets. A sequence is joined into one buffer first,
+            which is the only copy made.
+        packet_id: The packets' id. Defaults to the id of the first packet.
+
+    Returns:
+        A structured array with a record for each packet.
+
+    Raises:
+        ValueError: If the packets aren't all of the given type.
+    """
+
+    if not isinstance(data, (bytes, bytearray, memoryview)):
+        if len(set(map(len, data))) > 1:
+            raise ValueError('Packets of different sizes in records_view')
+        data = b''.join(data)
+    view = memoryview(data).cast('B')
+    if not len(view):
+        if packet_id is None:
+            raise ValueError('Empty batch without a packet id in '
+                             'records_view')
+        return np.empty(0, PACKET_DTYPES[packet_id])
+    if packet_id is None:
+        packet_id = get_packet_id(view)
+    dtype = PACKET_DTYPES[packet_id]
+    if len(view) % dtype.itemsize:
+        raise ValueError(
+            f'Invalid batch size in records_view: {len(view)} is not a '
+            f'multiple of {dtype.itemsize}')
+    records = np.frombuffer(view, dtype)
+    if not (records['packetId'] == packet_id).all():
+        raise ValueError(
+            f'Packets of different types in records_view: {packet_id}')
+    return records
+
+
+def parse_columns(data: Any,
+                  packet_id: Optional[int] = None) -> Dict[str, np.ndarray]:
+    """Parses a batch of packets of a single type into columns.
+
+    Every field becomes an array with a row per packet, named by its path
+    in the packet (e.g., 'sessionTime', 'carTelemetryData.speed'). Per-car
+    fields have a column per car, so they're shaped (N, GRID_SIZE), and
+    array fields add a dimension (e.g., 'carTelemetryData.tiresPressure'
+    is shaped (N, GRID_SIZE, TIRE_COUNT)).
+
+    The columns are views of the batch's records (see records_view), so no
+    field is copied or decoded individually.
+
+    Args:
+        data: Either a sequence of packets' bytes, or a single buffer of
+            consecutive packets.
+        packet_id: The packets' id. Defaults to the id of the first packet.
+
+    Returns:
+        The columns, by field path.
+    """
+
+    columns: Dict[str, np.ndarray] = {}
+    _add_columns(records_view(data, packet_id), '', columns)
+    return columns
+
+
+def _add_columns(array: np.ndarray, path: str,
+                 columns: Dict[str, np.ndarray]):
+    if array.dtype.names is None:
+        columns[path] = array
+        return
+    for name in array.dtype.names:
+        _add_columns(array[name], f'{path}.{name}' if path else name, columns)
@@ -1,4 +1,5 @@
-from ctypes import (c_float, c_int8, c_uint8, c_uint16, c_uint32, c_uint64)
+from ctypes import (
+    c_float, c_int8, c_uint8, c_uint16, c_uint32, c_uint64, sizeof)
 from typing import Dict, Final, Type
 from constants.constants import (
     GRID_SIZE, MAX_LAP_HISTORIES, MAX_WEATHER_SAMPLES, MAX_TYRE_STINTS,
@@ -190,3 +191,7 @@ PACKET_TYPE: Final[Dict[int, Type[Packet]]] = {
     PacketId.CAR_DAMAGE.value: CarDamagePacket,
     PacketId.SESSION_HISTORY.value: SessionHistoryPacket,
 }
+
+MAX_PACKET_SIZE: Final[int] = max(
+    sizeof(packet_type) for packet_type in PACKET_TYPE.values())
+"""The size of the largest packet type, in bytes."""
@@ -0,0 +1,174 @@
+from collections import namedtuple
+from ctypes import Array, sizeof, Structure, Union
+from struct import Struct
+from typing import Any, Callable, Dict, List, Tuple, Type
+from custom_types.game import get_fields, get_struct_format
+from packets.packets import Packet, PACKET_TYPE
+
+"""This module contains an alternative to decoding packets with ctypes.
+
+The layouts defined by the ctypes structures are compiled into a single
+struct.Struct per packet type, which unpacks every field in one call. The
+values are then assembled into lightweight records (named tuples) that
+mirror the ctypes structures: fields are accessed by the same names, arrays
+become tuples and character arrays become bytes.
+"""
+
+Builder = Callable[[Tuple[Any, ...], int], Any]
+"""Creates a record from the unpacked values, starting at the given index."""
+
+
+class _Compiler:
+    """Compiles ctypes structures into struct formats and record builders.
+
+    Builders are generated as Python source, so each one indexes the
+    unpacked values with constant offsets and creates its record in a
+    single call.
+    """
+
+    def __init__(self):
+        self.namespace: Dict[str, Any] = {}
+        self.names: Dict[Any, str] = {}
+        self.compiled: Dict[Any, Tuple[str, int]] = {}
+
+    def compile(self, ctype: Any) -> Tuple[str, int, Builder]:
+        """Compiles a structure.
+
+        Args:
+            ctype: The ctypes structure to compile.
+
+        Returns:
+            The structure's struct format (without a byte order prefix), the
+            number of values it unpacks to and its builder.
+        """
+
+        format, count = self._compile_structure(ctype)
+        return format, count, self.namespace[self.names[ctype]]
+
+    def _name(self, ctype: Any) -> str:
+        if ctype not in self.names:
+            self.names[ctype] = f'_build_{ctype.__name__}_{len(self.names)}'
+        return self.names[ctype]
+
+    def _compile_structure(self, ctype: Any) -> Tuple[str, int]:
+        if ctype in self.compiled:
+            return self.compiled[ctype]
+        fields = get_fields(ctype)
+        formats: List[str] = []
+        expressions: List[str] = []
+        count = 0
+        for name, field_type in fields:
+            format, field_count, expression = self._compile_field(
+                field_type, count)
+            formats.append(format)
+            expressions.append(expression)
+            count += field_count
+        record_name = f'_{ctype.__name__}Record'
+        self.namespace[record_name] = namedtuple(
+            f'{ctype.__name__}Record', [name for name, _ in fields])
+        source = (f'def {self._name(ctype)}(v, i):\n'
+                  f'    return {record_name}({", ".join(expressions)})\n')
+        exec(source, self.namespace)
+        self.compiled[ctype] = (''.join(formats), count)
+        return self.compiled[ctype]
+
+    def _compile_union(self, ctype: Any):
+        if ctype in self.compiled:
+            return
+        decoders: Dict[str, Tuple[Struct, Builder]] = {}
+        for name, member_type in get_fields(ctype):
+            format, _, builder = self.compile(member_type)
+            decoders[name] = (Struct(f'<{format}'), builder)
+        self.namespace[self._name(ctype)] = _create_union_record_type(
+            ctype.__name__, decoders)
+        self.compiled[ctype] = (f'{sizeof(ctype)}s', 1)
+
+    def _compile_field(self, ctype: Any, index: int) -> Tuple[str, int, str]:
+        # Returns the format, value count and builder expression of a field.
+        offset = f'i + {index}'
+        if isinstance(ctype, type) and issubclass(ctype, Structure):
+            format, count = self._compile_structure(ctype)
+            return format, count, f'{self._name(ctype)}(v, {offset})'
+        if isinstance(ctype, type) and issubclass(ctype, Union):
+            self._compile_union(ctype)
+            return (f'{sizeof(ctype)}s', 1,
+                    f'{self._name(ctype)}(v[{offset}])')
+        if isinstance(ctype, type) and issubclass(ctype, Array):
+            length = ctype._length_
+            element = ctype._type_
+            if issubclass(element, (Structure, Union)):
+                format, count, expression = self._compile_field(element, 0)
+                expression = expression.replace(
+                    'i + 0', f'i + {index} + {count} * k')
+                return (format * length, count * length,
+                        f'tuple([{expression} for k in range({length})])')
+            format = get_struct_format(element)
+            if format == 'c':
+                # Matches ctypes, which returns char arrays as bytes up to
+                # the first null character.
+                return (f'{length}s', 1,
+                        f'v[{offset}].split(b"\\0", 1)[0]')
+            return (f'{length}{format}', length,
+                    f'v[{offset}:{offset} + {length}]')
+        return get_struct_format(ctype), 1, f'v[{offset}]'
+
+
+def _create_union_record_type(
+        name: str, decoders: Dict[str, Tuple[Struct, Builder]]) -> type:
+    """Creates a record type for a union.
+
+    The union's raw bytes are kept and each member is decoded when it's
+    accessed, since only one of them is meaningful for a given packet.
+
+    Args:
+        name: The name of the ctypes union.
+        decoders: The struct and builder of each member, by name.
+    """
+
+    def create_property(struct: Struct, builder: Builder) -> property:
+        return property(lambda self: builder(struct.unpack_from(self._raw), 0))
+
+    attributes: Dict[str, Any] = {
+        '__slots__': ('_raw',),
+        '__init__': lambda self, raw: setattr(self, '_raw', raw),
+    }
+    for member_name, (struct, builder) in decoders.items():
+        attributes[member_name] = create_property(struct, builder)
+    return type(f'{name}Record', (), attributes)
+
+
+class StructDecoder:
+    """Decodes a single packet type with a precompiled struct.Struct."""
+
+    def __init__(self, packet_type: Type[Packet]):
+        """Initializes the StructDecoder instance.
+
+        Args:
+            packet_type: The ctypes packet the layout is compiled from.
+        """
+
+        format, _, builder = _Compiler().compile(packet_type)
+        self.packet_type = packet_type
+        self.struct = Struct(f'<{format}')
+        self._builder = builder
+        if self.struct.size != sizeof(packet_type):
+            raise ValueError(
+                f'Invalid struct size for {packet_type.__name__}: '
+                f'{self.struct.size} != {sizeof(packet_type)}')
+
+    def decode(self, data: bytes) -> Any:
+        """Decodes a packet.
+
+        Args:
+            data: The packet's bytes (or any buffer that contains them).
+
+        Returns:
+            A record with the same fields as the ctypes packet.
+        """
+
+        return self._builder(self.struct.unpack_from(data), 0)
+
+
+STRUCT_DECODERS: Dict[int, StructDecoder] = {
+    id: StructDecoder(packet_type) for id, packet_type in PACKET_TYPE.items()}
+"""Associates packet ids with the StructDecoder for that packet type."""
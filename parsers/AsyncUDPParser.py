@@ -0,0 +1,138 @@
+import asyncio
+import logging
+from typing import Final, Optional, Tuple
+from constants.constants import PACKET_HEADER_ID_INDEX
+from filters.Filter import Filter
+from parsers.ParserStats import ParserStats
+from utilities.packet import create_packet_id_mask
+from utilities.parse import parse_packet
+
+
+DEFAULT_QUEUE_SIZE: Final[int] = 768
+"""Default maximum number of queued datagrams."""
+
+
+class _DatagramProtocol(asyncio.DatagramProtocol):
+    """Forwards received datagrams to an AsyncUDPParser's queue.
+
+    Datagrams the filter doesn't consume are skipped immediately.
+    """
+
+    def __init__(self, parser: 'AsyncUDPParser',
+                 queue: 'asyncio.Queue[Optional[bytes]]'):
+        self.parser = parser
+        self.queue = queue
+        self.subscribed = create_packet_id_mask(
+            parser.filter.subscribed_packet_ids())
+
+    def datagram_received(self, data: bytes, addr: Tuple[str, int]):
+        if (len(data) <= PACKET_HEADER_ID_INDEX
+                or not self.subscribed[data[PACKET_HEADER_ID_INDEX]]):
+            self.parser.stats.skipped_packets += 1
+            return
+        try:
+            self.queue.put_nowait(data)
+        except asyncio.QueueFull:
+            self.parser.stats.record_drop(data[PACKET_HEADER_ID_INDEX])
+
+    def error_received(self, exc: Exception):
+        logging.error(f'AsyncUDPParser socket error: {exc}')
+
+
+class AsyncUDPParser:
+    """Defines an asyncio-based class for parsing packet data and
+    distributing it.
+
+    A single event loop receives the datagrams, parses them and awaits the
+    filter's filter_async method, so no threads are needed and filters can
+    share the loop with other asynchronous work.
+    """
+
+    def __init__(self, filter: Filter, port: int,
+                 queue_size: int = DEFAULT_QUEUE_SIZE):
+        """Initializes the AsyncUDPParser instance.
+
+        Args:
+            filter: That filter that will process the packets.
+            port: The UDP port to listen for packets on.
+            queue_size: The maximum number of datagrams waiting to be
+                filtered before new ones are dropped.
+        """
+
+        if queue_size < 1:
+            raise ValueError(
+                f'Invalid queue size in AsyncUDPParser: {queue_size}')
+        self.port: int = port
+        self.filter: Filter = filter
+        self.queue_size: int = queue_size
+        self.stats = ParserStats()
+        self.transport: Optional[asyncio.DatagramTransport] = None
+        self.data_queue: Optional['asyncio.Queue[Optional[bytes]]'] = None
+
+    def is_running(self) -> bool:
+        """Determines if the parser is actively listening for packets.
+
+        Returns:
+            True if the transport is still active.
+        """
+
+        return self.transport is not None
+
+    async def start(self):
+        """Opens the UDP endpoint on the running event loop."""
+
+        queue = asyncio.Queue[Optional[bytes]](self.queue_size)
+        self.data_queue = queue
+        loop = asyncio.get_running_loop()
+        self.transport, _ = await loop.create_datagram_endpoint(
+            lambda: _DatagramProtocol(self, queue),
+            local_addr=('127.0.0.1', self.port))
+        logging.info('AsyncUDPParser started successfully.')
+        logging.info(f'Using filter: {type(self.filter).__name__}')
+        logging.info(f'Listening on port {self.port}.\n')
+
+    def stop(self):
+        """Stops the parser.
+
+        The transport is closed and the run coroutine returns once it has
+        finished with the packet it's currently filtering.
+        """
+
+        if self.transport is not None:
+            self.transport.close()
+            self.transport = None
+            queue = self.data_queue
+            if queue is not None:
+                if queue.full():
+                    # Makes room for the sentinel, which run needs to see.
+                    data = queue.get_nowait()
+                    if data is not None:
+                        self.stats.record_drop(data[PACKET_HEADER_ID_INDEX])
+                queue.put_nowait(None)
+            logging.info(self.stats.summary())
+
+    async def run(self):
+        """Starts the parser and filters packets until it's stopped.
+
+        Every datagram that's waiting when the loop wakes up is filtered
+        before awaiting the next one.
+        """
+
+        await self.start()
+        queue = self.data_queue
+        assert queue is not None
+        filter = self.filter
+        try:
+            while self.transport is not None:
+                data = await queue.get()
+                count = 0
+                while data is not None:
+                    count += 1
+                    await filter.filter_async(parse_packet(data))
+                    if queue.empty():
+                        break
+                    data = queue.get_nowait()
+                if count:
+                    self.stats.record_batch(count)
+        finally:
+            self.stop()
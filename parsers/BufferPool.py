@@ -0,0 +1,76 @@
+from queue import Empty, Queue
+from typing import List, Optional
+
+
+class BufferPool:
+    """Defines a fixed set of preallocated, reusable receive buffers.
+
+    Each buffer (slot) is identified by its index. A slot is acquired by the
+    code that fills it, and released once nothing refers to its contents,
+    at which point it can be filled again.
+    """
+
+    def __init__(self, slot_count: int, slot_size: int):
+        """Initializes the BufferPool instance.
+
+        Args:
+            slot_count: The number of buffers to allocate.
+            slot_size: The size of each buffer, in bytes.
+        """
+
+        if slot_count < 1:
+            raise ValueError(
+                f'Invalid slot count in BufferPool: {slot_count}')
+        self.slot_size: int = slot_size
+        self.buffers: List[bytearray] = [
+            bytearray(slot_size) for _ in range(slot_count)]
+        self.views: List[memoryview] = [
+            memoryview(buffer) for buffer in self.buffers]
+        self._free = Queue[int]()
+        for index in range(slot_count):
+            self._free.put(index)
+
+    def available(self) -> int:
+        """Returns the number of slots that can currently be acquired."""
+
+        return self._free.qsize()
+
+    def acquire(self) -> int:
+        """Acquires a slot, blocking until one is available.
+
+        Returns:
+            The index of the acquired slot.
+        """
+
+        return self._free.get()
+
+    def try_acquire(self) -> Optional[int]:
+        """Acquires a slot if one is available without blocking.
+
+        Returns:
+            The index of the acquired slot, or None if the pool is empty.
+        """
+
+        try:
+            return self._free.get_nowait()
+        except Empty:
+            return None
+
+    def release(self, slot: int):
+        """Returns a slot to the pool so it can be reused.
+
+        Args:
+            slot: The index of the slot to release.
+        """
+
+        self._free.put(slot)
+
+    def view(self, slot: int, length: int) -> memoryview:
+        """Returns a writable view of the first length bytes of a slot.
+
+        Args:
+            slot: The index of the slot.
+            length: The number of bytes in the view.
+        """
+
+        return self.views[slot][:length]
@@ -0,0 +1,122 @@
+import logging
+from pathlib import Path
+from threading import Event, Thread
+import time
+from typing import Optional
+from capture.CaptureReader import CaptureReader
+from filters.Filter import Filter
+from parsers.ParserStats import ParserStats
+from utilities.packet import create_packet_id_mask
+from utilities.parse import parse_packet_in_place
+
+
+class FileParser:
+    """Defines a class for replaying a capture file through a filter.
+
+    It has the same interface as UDPParser, but its packets are read from a
+    capture file (see capture.CaptureWriter) instead of a socket. They're
+    filtered as fast as possible, or paced by their receive times.
+
+    Packets are parsed in place from the memory-mapped file, so as with
+    UDPParser, a filter must copy any values it needs after its filter
+    method returns.
+    """
+
+    def __init__(self, filter: Filter, path: Path, speed: float = 0):
+        """Initializes the FileParser instance.
+
+        Args:
+            filter: That filter that will process the packets.
+            path: The capture file to read the packets from.
+            speed: The replay speed relative to the capture's receive times
+                (e.g., 2 replays a session in half the time it was recorded
+                in). 0 replays the packets as fast as possible.
+        """
+
+        if speed < 0:
+            raise ValueError(f'Invalid speed in FileParser: {speed}')
+        self.path = path
+        self.filter = filter
+        self.speed = speed
+        self.stats = ParserStats()
+        self.subscribed = create_packet_id_mask(
+            filter.subscribed_packet_ids())
+        self.running = False
+        self._stop_event = Event()
+        self._thread: Optional[Thread] = None
+
+    def is_running(self) -> bool:
+        """Determines if the parser is still replaying packets.
+
+        Returns:
+            True until every packet has been filtered or the parser is
+            stopped.
+        """
+
+        return self.running
+
+    def start(self):
+        """Starts replaying the packets on a daemon thread."""
+
+        self.running = True
+        self._thread = Thread(target=self.run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stops the parser.
+
+        Returns once the filter has finished with the packet it's currently
+        filtering.
+        """
+
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def run(self):
+        """Replays the packets on the calling thread.
+
+        Returns once every packet has been filtered or the parser is
+        stopped.
+        """
+
+        self.running = True
+        try:
+            with CaptureReader(self.path) as reader:
+                logging.info('FileParser started successfully.')
+                logging.info(f'Using filter: {type(self.filter).__name__}')
+                logging.info(f'Replaying {len(reader)} packets from '
+                             f'{self.path}.\n')
+                self._replay(reader)
+        finally:
+            self.running = False
+
+    def _replay(self, reader: CaptureReader):
+        subscribed = self.subscribed
+        filter = self.filter
+        stats = self.stats
+        stop_event = self._stop_event
+        start_time = time.perf_counter()
+        first_receive_time: Optional[float] = None
+        for receive_time, packet_id, data in reader.views():
+            if stop_event.is_set():
+                break
+            stats.record_batch(1)
+            if first_receive_time is None:
+                first_receive_time = receive_time
+            if not subscribed[packet_id]:
+                stats.skipped_packets += 1
+                continue
+            if self.speed:
+                delay = (start_time
+                         + (receive_time - first_receive_time) / self.speed
+                         - time.perf_counter())
+                if delay > 0 and stop_event.wait(delay):
+                    break
+            filter.filter(parse_packet_in_place(data))
+        elapsed = time.perf_counter() - start_time
+        logging.info(self.stats.summary())
+        logging.info(
+            f'Replayed {stats.packets_received} packets in {elapsed:.3f} s '
+            f'({stats.packets_received / max(elapsed, 1e-9):.0f} packets/s).')
@@ -0,0 +1,208 @@
+from collections import deque
+from enum import Enum
+from threading import Condition, Lock
+from typing import (
+    Callable, Deque, Dict, Final, List, Optional, Sequence, Tuple)
+from constants.constants import PacketId
+
+
+QueueItem = Tuple[int, int, int]
+"""A queued datagram: its packet id, buffer slot and length in bytes."""
+
+
+class BackpressurePolicy(Enum):
+    """Defines what happens when a packet arrives at a full queue."""
+
+    BLOCK = 'block'
+    """Wait for the consumer to make room (the socket buffer fills up and
+    the operating system drops datagrams instead)."""
+
+    DROP_OLDEST = 'drop-oldest'
+    """Drop the packet that has been queued the longest."""
+
+    DROP_NEWEST = 'drop-newest'
+    """Drop the packet that has just arrived."""
+
+    DROP_BY_TYPE = 'drop-by-type'
+    """Drop the oldest queued packet of the least important type present,
+    according to the queue's drop priority."""
+
+
+DEFAULT_DROP_PRIORITY: Final[Tuple[PacketId, ...]] = (
+    PacketId.MOTION,
+    PacketId.CAR_TELEMETRY,
+    PacketId.LAP_DATA,
+    PacketId.CAR_STATUS,
+    PacketId.CAR_DAMAGE,
+    PacketId.SESSION_HISTORY,
+    PacketId.LOBBY_INFO,
+    PacketId.CAR_SETUPS,
+    PacketId.SESSION,
+    PacketId.PARTICIPANTS,
+    PacketId.EVENT,
+    PacketId.FINAL_CLASSIFICATION,
+)
+"""Packet types in the order they're shed by BackpressurePolicy.DROP_BY_TYPE.
+
+High frequency packets that are superseded by the next one come first,
+while one-off packets that can't be recovered come last.
+"""
+
+
+class PacketQueue:
+    """Defines a thread-safe FIFO queue of datagrams with an optional bound.
+
+    When the queue is full, new packets are handled according to its
+    BackpressurePolicy. Dropped items are passed to a callback so their
+    buffers can be reclaimed and the drop can be counted.
+    """
+
+    def __init__(
+            self, maxsize: int = 0,
+            policy: BackpressurePolicy = BackpressurePolicy.BLOCK,
+            drop_priority: Sequence[PacketId] = DEFAULT_DROP_PRIORITY,
+            on_drop: Optional[Callable[[QueueItem], None]] = None):
+        """Initializes the PacketQueue instance.
+
+        Args:
+            maxsize: The maximum number of queued packets (0 means
+                unbounded).
+            policy: How to handle packets that arrive when the queue is
+                full.
+            drop_priority: The packet types in the order they should be
+                dropped with BackpressurePolicy.DROP_BY_TYPE. Types that
+                aren't listed are dropped last.
+            on_drop: Called with every item that's dropped.
+        """
+
+        self.maxsize: int = maxsize
+        self.policy: BackpressurePolicy = policy
+        self.on_drop = on_drop
+        self._rank: Dict[int, int] = {
+            packet_id.value: rank
+            for rank, packet_id in enumerate(drop_priority)}
+        self._unranked: int = len(drop_priority)
+        self._counts: Dict[int, int] = {id.value: 0 for id in PacketId}
+        self._items: Deque[QueueItem] = deque()
+        self._closed = False
+        lock = Lock()
+        self._not_empty = Condition(lock)
+        self._not_full = Condition(lock)
+
+    def qsize(self) -> int:
+        """Returns the number of queued packets."""
+
+        with self._not_empty:
+            return len(self._items)
+
+    def put_many(self, items: List[QueueItem]):
+        """Queues packets, applying the queue's policy if it's full.
+
+        Args:
+            items: The packets to queue, oldest first.
+        """
+
+        dropped: List[QueueItem] = []
+        with self._not_full:
+            for item in items:
+                if self.maxsize and len(self._items) >= self.maxsize:
+                    if self.policy == BackpressurePolicy.BLOCK:
+                        while (len(self._items) >= self.maxsize
+                               and not self._closed):
+                            # The consumer may be waiting for the part of
+                            # the batch that's already been queued.
+                            self._not_empty.notify()
+                            self._not_full.wait()
+                    elif self.policy == BackpressurePolicy.DROP_NEWEST:
+                        dropped.append(item)
+                        continue
+                    elif self.policy == BackpressurePolicy.DROP_OLDEST:
+                        dropped.append(self._remove(0))
+                    else:
+                        index = self._find_victim(item[0])
+                        if index is None:
+                            dropped.append(item)
+                            continue
+                        dropped.append(self._remove(index))
+                    if self._closed:
+                        dropped.append(item)
+                        continue
+                self._items.append(item)
+                self._counts[item[0]] = self._counts.get(item[0], 0) + 1
+            self._not_empty.notify()
+        if self.on_drop is not None:
+            for item in dropped:
+                self.on_drop(item)
+
+    def get_many(self, max_count: int) -> List[QueueItem]:
+        """Removes packets from the front of the queue.
+
+        Blocks until at least one packet is available or the queue is
+        closed.
+
+        Args:
+            max_count: The maximum number of packets to return.
+
+        Returns:
+            The packets, oldest first, or an empty list if the queue was
+            closed.
+        """
+
+        with self._not_empty:
+            while not self._items and not self._closed:
+                self._not_empty.wait()
+            items: List[QueueItem] = []
+            while self._items and len(items) < max_count:
+                item = self._items.popleft()
+                self._counts[item[0]] -= 1
+                items.append(item)
+            self._not_full.notify()
+            return items
+
+    def clear(self) -> List[QueueItem]:
+        """Removes every queued packet.
+
+        Returns:
+            The removed packets, oldest first.
+        """
+
+        with self._not_full:
+            items = list(self._items)
+            self._items.clear()
+            for id in self._counts:
+                self._counts[id] = 0
+            self._not_full.notify_all()
+            return items
+
+    def close(self):
+        """Wakes up any waiting threads and stops blocking on the queue."""
+
+        with self._not_full:
+            self._closed = True
+            self._not_full.notify_all()
+            self._not_empty.notify_all()
+
+    def _remove(self, index: int) -> QueueItem:
+        item = self._items[index]
+        del self._items[index]
+        self._counts[item[0]] -= 1
+        return item
+
+    def _find_victim(self, incoming_id: int) -> Optional[int]:
+        # The least important type present in the queue is found using the
+        # per-type counts, then its oldest instance is located. Frequent
+        # (low priority) packets tend to be near the front of the queue.
+        rank = self._rank
+        unranked = self._unranked
+        victim_id = None
+        victim_rank = unranked + 1
+        for id, count in self._counts.items():
+            if count and rank.get(id, unranked) < victim_rank:
+                victim_id = id
+                victim_rank = rank.get(id, unranked)
+        if victim_id is None or rank.get(incoming_id, unranked) < victim_rank:
+            return None
+        for index, item in enumerate(self._items):
+            if item[0] == victim_id:
+                return index
+        return None
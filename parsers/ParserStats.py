@@ -0,0 +1,70 @@
+from typing import Dict
+
+
+class ParserStats:
+    """Defines counters that describe the work done by a parser.
+
+    The counters are updated by the parser's threads without locking:
+    they're intended for monitoring and may be momentarily inconsistent
+    with each other.
+    """
+
+    def __init__(self):
+        self.packets_received: int = 0
+        """Total number of datagrams read from the socket."""
+
+        self.batches_received: int = 0
+        """Number of batches the datagrams were read in."""
+
+        self.largest_batch: int = 0
+        """Size of the largest batch read in a single wakeup."""
+
+        self.skipped_packets: int = 0
+        """Number of packets skipped because the filter doesn't consume
+        them."""
+
+        self.dropped_packets: Dict[int, int] = {}
+        """Number of packets dropped by the queue's policy, by packet id."""
+
+    def record_batch(self, size: int):
+        """Records that a batch of datagrams was received.
+
+        Args:
+            size: The number of datagrams in the batch.
+        """
+
+        self.packets_received += size
+        self.batches_received += 1
+        if size > self.largest_batch:
+            self.largest_batch = size
+
+    def record_drop(self, packet_id: int):
+        """Records that a packet was dropped before it was filtered.
+
+        Args:
+            packet_id: The id of the dropped packet.
+        """
+
+        self.dropped_packets[packet_id] = (
+            self.dropped_packets.get(packet_id, 0) + 1)
+
+    def dropped_count(self) -> int:
+        """Returns the total number of dropped packets."""
+
+        return sum(self.dropped_packets.values())
+
+    def average_batch_size(self) -> float:
+        """Returns the mean number of datagrams read per wakeup."""
+
+        if self.batches_received == 0:
+            return 0
+        return self.packets_received / self.batches_received
+
+    def summary(self) -> str:
+        """Returns a human-readable summary of the counters."""
+
+        return (f'Received {self.packets_received} packets in '
+                f'{self.batches_received} batches (average: '
+                f'{self.average_batch_size():.2f}, largest: '
+                f'{self.largest_batch}), skipped '
+                f'{self.skipped_packets}, dropped {self.dropped_count()}.')
@@ -0,0 +1,190 @@
+from functools import partial
+import logging
+import multiprocessing
+from multiprocessing.process import BaseProcess
+from queue import Empty
+import signal
+import time
+from typing import Any, Callable, Dict, Final, List, Optional, Type
+from constants.constants import PACKET_HEADER_ID_INDEX, PacketId
+from filters.Filter import Filter
+from parsers.UDPParser import UDPParser
+from utilities.packet import get_session_uid
+from utilities.parse import (
+    get_parse_backend, parse_packet, ParseBackend, set_parse_backend)
+
+
+WORKER_JOIN_TIMEOUT_S: Final[float] = 10
+"""How long to wait for each worker to finish its queued packets."""
+
+DEFAULT_SESSION_TIMEOUT_S: Final[float] = 600
+"""Default time without packets after which a session's filter is cleaned
+up."""
+
+
+def _worker_main(filter_factory: Callable[[], Filter], data_queue: Any,
+                 parse_backend: ParseBackend, session_timeout: float):
+    """Parses and filters the packets sent to a single worker process.
+
+    Every session handled by the worker gets its own filter instance, so
+    sessions never share filter state even though they share a process.
+    A session's filter is cleaned up and discarded once it has handled the
+    final classification, or once the session stops sending packets.
+
+    Args:
+        filter_factory: Creates the filter for a newly seen session.
+        data_queue: The multiprocessing queue the packet batches arrive on.
+            None signals that the worker should clean up and exit.
+        parse_backend: The backend the packets are decoded with.
+        session_timeout: The time (in seconds) without packets after which
+            a session is considered finished.
+    """
+
+    # Ctrl+C is delivered to the whole process group: the main process
+    # decides when the workers stop, so they can flush their filters.
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    set_parse_backend(parse_backend)
+    final_classification_id = PacketId.FINAL_CLASSIFICATION.value
+    filters: Dict[int, Filter] = {}
+    last_packet_times: Dict[int, float] = {}
+    while True:
+        try:
+            batch = data_queue.get(timeout=session_timeout)
+        except Empty:
+            batch = []
+        if batch is None:
+            break
+        now = time.monotonic()
+        for data in batch:
+            session_uid = get_session_uid(data)
+            filter = filters.get(session_uid)
+            if filter is None:
+                filter = filters[session_uid] = filter_factory()
+            last_packet_times[session_uid] = now
+            filter.filter(parse_packet(data))
+            if data[PACKET_HEADER_ID_INDEX] == final_classification_id:
+                del last_packet_times[session_uid]
+                filters.pop(session_uid).cleanup()
+        for session_uid, last_packet_time in list(last_packet_times.items()):
+            if now - last_packet_time >= session_timeout:
+                logging.info(f'Session {session_uid} timed out.')
+                del last_packet_times[session_uid]
+                filters.pop(session_uid).cleanup()
+    for filter in filters.values():
+        filter.cleanup()
+
+
+def get_filter_type(filter_factory: Callable[[], Filter]) -> Type[Filter]:
+    """Determines the type of filter a factory creates, without calling it.
+
+    Args:
+        filter_factory: A Filter subclass, or a functools.partial of one.
+
+    Returns:
+        The Filter subclass.
+
+    Raises:
+        TypeError: If the factory isn't a Filter subclass or a partial of
+            one.
+    """
+
+    factory: Any = filter_factory
+    while isinstance(factory, partial):
+        factory = factory.func
+    if not isinstance(factory, type) or not issubclass(factory, Filter):
+        raise TypeError(
+            f'Invalid filter factory in ShardedUDPParser: {filter_factory}')
+    return factory
+
+
+class ShardedUDPParser(UDPParser):
+    """Defines a UDPParser that parses and filters in worker processes.
+
+    Datagrams are received as usual, then sharded by the sessionUID in their
+    header so that every packet of a session is handled, in order, by the
+    same worker. Parsing and filtering therefore scale with the number of
+    workers instead of being limited to the one core the GIL allows.
+    """
+
+    def __init__(self, filter_factory: Callable[[], Filter], port: int,
+                 worker_count: Optional[int] = None,
+                 session_timeout: float = DEFAULT_SESSION_TIMEOUT_S,
+                 **kwargs: Any):
+        """Initializes the ShardedUDPParser instance.
+
+        Args:
+            filter_factory: Creates a filter for each session: a Filter
+                subclass, or a functools.partial of one. It's sent to the
+                worker processes, so it must be picklable.
+            port: The UDP port to listen for packets on.
+            worker_count: The number of worker processes. Defaults to the
+                number of CPUs.
+            session_timeout: The time (in seconds) without packets after
+                which a session's filter is cleaned up and discarded.
+            kwargs: Any other UDPParser arguments.
+
+        Raises:
+            TypeError: If the factory isn't a Filter subclass or a partial
+                of one.
+        """
+
+        # Only the workers create filters: the main process just needs to
+        # know which packets they consume.
+        self._init_receiver(get_filter_type(filter_factory), port, **kwargs)
+        self.filter_factory = filter_factory
+        self.worker_count: int = worker_count or multiprocessing.cpu_count()
+        self.session_timeout = session_timeout
+        self.workers: List[BaseProcess] = []
+        self.worker_queues: List[Any] = []
+
+    def start(self):
+        """Starts the worker processes, then the parser."""
+
+        for _ in range(self.worker_count):
+            queue: Any = multiprocessing.Queue()
+            worker = multiprocessing.Process(
+                target=_worker_main,
+                args=(self.filter_factory, queue, get_parse_backend(),
+                      self.session_timeout),
+                daemon=True)
+            worker.start()
+            self.worker_queues.append(queue)
+            self.workers.append(worker)
+        logging.info(f'Started {self.worker_count} worker processes.')
+        super().start()
+
+    def stop(self):
+        """Stops the parser, then lets the workers finish and clean up."""
+
+        super().stop()
+        # The consumer may still be sending a batch: the workers must
+        # receive it before they're told to stop.
+        if self.consumer_thread is not None:
+            self.consumer_thread.join()
+            self.consumer_thread = None
+        for queue in self.worker_queues:
+            queue.put(None)
+        for worker in self.workers:
+            worker.join(WORKER_JOIN_TIMEOUT_S)
+            if worker.is_alive():
+                logging.info('Worker did not exit in time: terminating.')
+                worker.terminate()
+        self.workers.clear()
+        self.worker_queues.clear()
+
+    def _consumer(self):
+        pool = self.pool
+        buffers = pool.buffers
+        queues = self.worker_queues
+        count = len(queues)
+        while self.socket:
+            shards: List[List[bytes]] = [[] for _ in range(count)]
+            for _, slot, length in self.data_queue.get_many(self.batch_size):
+                try:
+                    shard = get_session_uid(buffers[slot]) % count
+                    shards[shard].append(pool.view(slot, length).tobytes())
+                finally:
+                    pool.release(slot)
+            for queue, shard in zip(queues, shards):
+                if shard:
+                    queue.put(shard)
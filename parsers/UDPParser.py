@@ -1,35 +1,64 @@
 import logging
-from queue import Queue
 import socket
 from threading import Thread
-from typing import cast, Final, Optional
+from typing import cast, Final, List, Optional, Type
+from constants.constants import PACKET_HEADER_ID_INDEX
 from filters.Filter import Filter
-from utilities.parse import parse_packet
+from packets.packets import MAX_PACKET_SIZE
+from parsers.BufferPool import BufferPool
+from parsers.PacketQueue import BackpressurePolicy, PacketQueue, QueueItem
+from parsers.ParserStats import ParserStats
+from utilities.packet import create_packet_id_mask
+from utilities.parse import parse_packet_in_place
 
 
 UDP_MAX_SIZE: Final[int] = 65507
 """Maximum UDP packet size, in bytes."""
 
+DEFAULT_BATCH_SIZE: Final[int] = 64
+"""Default maximum number of datagrams read from the socket per wakeup."""
+
+DEFAULT_QUEUE_SIZE: Final[int] = 768
+"""Default maximum number of packets waiting to be filtered."""
+
+MSG_DONTWAIT: Final[Optional[int]] = getattr(socket, 'MSG_DONTWAIT', None)
+"""Flag for a single non-blocking receive, if supported by the platform."""
+
 
 class UDPParser:
     """Defines a class for parsing packet data and distributing it.
 
-    Packet data is parsed then queued, where it's passed to the filter
-    as quickly as the filter can process it.
+    Packet data is received in batches into preallocated buffers then
+    queued, where it's parsed in place and passed to the filter as quickly
+    as the filter can process it. A buffer is reused as soon as the filter
+    has finished with its packet.
     """
 
-    def __init__(self, filter: Filter, port: int):
+    def __init__(self, filter: Filter, port: int,
+                 batch_size: int = DEFAULT_BATCH_SIZE,
+                 pool_size: Optional[int] = None,
+                 queue_size: int = DEFAULT_QUEUE_SIZE,
+                 policy: BackpressurePolicy = BackpressurePolicy.BLOCK):
         """Initializes the UDPParser instance.
 
         Args:
             filter: That filter that will process the packets.
             port: The UDP port to listen for packets on.
+            batch_size: The maximum number of datagrams drained from the
+                socket each time the producer wakes up. It can't exceed the
+                queue size.
+            pool_size: The number of preallocated receive buffers. Defaults
+                to just enough for the queue and two batches.
+            queue_size: The maximum number of packets waiting to be
+                filtered. Together with two batches (one being received and
+                one being filtered) it must fit in the pool.
+            policy: How to handle packets that arrive when the queue is
+                full.
         """
 
-        self.port: int = port
         self.filter: Filter = filter
-        self.socket: Optional[socket.socket] = None
-        self.data_queue = Queue[bytes]()
+        self._init_receiver(type(filter), port, batch_size, pool_size,
+                            queue_size, policy)
 
     def is_running(self) -> bool:
         """Determines if the parser is actively listening for packets.
@@ -50,7 +79,8 @@ class UDPParser:
 
         self.socket = socket.socket(family=socket.AF_INET,
                                     type=socket.SOCK_DGRAM)
-        Thread(target=self._consumer, daemon=True).start()
+        self.consumer_thread = Thread(target=self._consumer, daemon=True)
+        self.consumer_thread.start()
         Thread(target=self._producer, daemon=True).start()
 
     def stop(self):
@@ -60,23 +90,127 @@ class UDPParser:
         """
 
         if self.socket is not None:
-            self.socket.shutdown(socket.SHUT_RDWR)
+            sock = self.socket
+            self.socket = None
+            try:
+                sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                # Linux reports ENOTCONN for unconnected UDP sockets, but
+                # still wakes up the blocked receive.
+                pass
             # TODO: throws an OSError on Windows
             # socket.close()
-            self.socket = None
-            with self.data_queue.mutex:
-                self.data_queue.queue.clear()
+            for _, slot, _ in self.data_queue.clear():
+                self.pool.release(slot)
+            self.data_queue.close()
+            logging.info(self.stats.summary())
+
+    def _init_receiver(self, filter_type: Type[Filter], port: int,
+                       batch_size: int = DEFAULT_BATCH_SIZE,
+                       pool_size: Optional[int] = None,
+                       queue_size: int = DEFAULT_QUEUE_SIZE,
+                       policy: BackpressurePolicy = BackpressurePolicy.BLOCK):
+        # Sets up everything but the filter instance, so subclasses that
+        # filter in other processes don't have to create one.
+        if batch_size < 1 or batch_size > queue_size:
+            raise ValueError(
+                f'Invalid batch size in UDPParser: {batch_size}')
+        if pool_size is None:
+            pool_size = queue_size + 2 * batch_size
+        if queue_size < 1 or queue_size + 2 * batch_size > pool_size:
+            raise ValueError(
+                f'Invalid queue size in UDPParser: {queue_size}')
+        self.port: int = port
+        self.filter_type: Type[Filter] = filter_type
+        self.batch_size: int = batch_size
+        self.stats = ParserStats()
+        self.subscribed = create_packet_id_mask(
+            filter_type.subscribed_packet_ids())
+        self.socket: Optional[socket.socket] = None
+        self.consumer_thread: Optional[Thread] = None
+        self.pool = BufferPool(pool_size, MAX_PACKET_SIZE)
+        self.data_queue = PacketQueue(queue_size, policy,
+                                      on_drop=self._on_drop)
 
     def _consumer(self):
+        pool = self.pool
         while self.socket:
-            self.filter.filter(parse_packet(self.data_queue.get()))
+            for _, slot, length in self.data_queue.get_many(self.batch_size):
+                try:
+                    self.filter.filter(
+                        parse_packet_in_place(pool.view(slot, length)))
+                finally:
+                    pool.release(slot)
 
     def _producer(self):
         # TODO: accept host in constructor
-        cast(socket.socket, self.socket).bind(('127.0.0.1', self.port))
+        sock = cast(socket.socket, self.socket)
+        sock.bind(('127.0.0.1', self.port))
         logging.info('UDPParser started successfully.')
-        logging.info(f'Using filter: {type(self.filter).__name__}')
+        logging.info(f'Using filter: {self.filter_type.__name__}')
         logging.info(f'Listening on port {self.port}.\n')
         while self.socket:
-            data = self.socket.recvfrom(UDP_MAX_SIZE)[0]
-            self.data_queue.put(data)
+            try:
+                batch = self._receive_batch(sock)
+            except OSError:
+                if self.socket is None:
+                    break
+                raise
+            if self.socket is None:
+                for _, slot, _ in batch:
+                    self.pool.release(slot)
+                break
+            self.stats.record_batch(len(batch))
+            self.data_queue.put_many(self._skip_unsubscribed(batch))
+
+    def _skip_unsubscribed(self, batch: List[QueueItem]) -> List[QueueItem]:
+        subscribed = self.subscribed
+        kept = [item for item in batch if subscribed[item[0]]]
+        if len(kept) != len(batch):
+            for item in batch:
+                if not subscribed[item[0]]:
+                    self.pool.release(item[1])
+            self.stats.skipped_packets += len(batch) - len(kept)
+        return kept
+
+    def _on_drop(self, item: QueueItem):
+        self.stats.record_drop(item[0])
+        self.pool.release(item[1])
+
+    def _receive_batch(self, sock: socket.socket) -> List[QueueItem]:
+        # Python doesn't expose recvmmsg, so the closest equivalent is to
+        # block for the first datagram and then drain whatever else is
+        # already waiting in the socket buffer without blocking.
+        pool = self.pool
+        buffers = pool.buffers
+        slot = pool.acquire()
+        try:
+            length = sock.recv_into(pool.views[slot])
+        except OSError:
+            pool.release(slot)
+            raise
+        batch = [(buffers[slot][PACKET_HEADER_ID_INDEX], slot, length)]
+        if self.batch_size == 1:
+            return batch
+        if MSG_DONTWAIT is None:
+            sock.setblocking(False)
+        try:
+            while len(batch) < self.batch_size:
+                slot = pool.try_acquire()
+                if slot is None:
+                    break
+                try:
+                    if MSG_DONTWAIT is None:
+                        length = sock.recv_into(pool.views[slot])
+                    else:
+                        length = sock.recv_into(
+                            pool.views[slot], 0, MSG_DONTWAIT)
+                except BlockingIOError:
+                    pool.release(slot)
+                    break
+                batch.append(
+                    (buffers[slot][PACKET_HEADER_ID_INDEX], slot, length))
+        finally:
+            if MSG_DONTWAIT is None:
+                sock.setblocking(True)
+        return batch
@@ -0,0 +1,369 @@
+from array import array
+from itertools import count
+import json
+import os
+from pathlib import Path
+from struct import Struct
+import sys
+from typing import Any, Dict, Final, Iterator, List, Optional, Tuple
+from replay.Series import Series
+
+CHUNK_LOG_MAGIC: Final[bytes] = b'F122LOG\0'
+"""Identifies chunk log files."""
+
+CHUNK_LOG_VERSION: Final[int] = 1
+"""The version of the chunk log file format."""
+
+CHUNK_LOG_SUFFIX: Final[str] = '.f1log'
+"""The suffix of chunk log files."""
+
+FILE_HEADER: Final[Struct] = Struct('<8sI')
+"""The header of chunk log files: magic and format version."""
+
+RECORD_HEADER: Final[Struct] = Struct('<BIIII')
+"""The header of a record: record type, series index, sample count and the
+sizes of the timestamps and values that follow."""
+
+SERIES_CHUNK: Final[int] = 0
+"""The record type of a series chunk."""
+
+CHECKPOINT: Final[int] = 1
+"""The record type of a checkpoint: the JSON state of the session's other
+data, in place of the timestamps (see checkpoint)."""
+
+
+def find_series(data: Any) -> List[Series]:
+    """Lists the series of a session's data, in a stable order.
+
+    Args:
+        data: Dictionaries, lists and tuples of values and series.
+
+    Returns:
+        Every series, in the order they're found in (dictionaries in
+        insertion order), which is the same for data of the same layout.
+    """
+
+    return list(_iter_series(data))
+
+
+def get_memory_usage(series: List[Series]) -> int:
+    """Returns the number of bytes used by the samples of series.
+
+    Args:
+        series: The series.
+    """
+
+    return sum(len(x.times) * x.times.itemsize +
+               (0 if x.values is None else len(x.values) * x.values.itemsize)
+               for x in series)
+
+
+class ChunkLog:
+    """Appends chunks of a session's series to a file, to free their memory.
+
+    A session's series are spilled to the log when they use too much
+    memory: their samples are appended to the log as a chunk per series,
+    then cleared. The series objects and their arrays are kept (and cleared
+    in place), so recorders can keep appending to them. Once the session is
+    finished, the spilled chunks are attached to its data and read back a
+    series at a time as it's written (see attach), so the whole session is
+    never back in memory.
+
+    The log can also checkpoint a session: its series are spilled, followed
+    by the state of the rest of the session's data. Each checkpoint only
+    appends the samples recorded since the previous one, and a session can
+    be resumed from the last complete checkpoint after a crash (see
+    recover).
+
+    The log's format is a file header followed by records, each made of a
+    record header and either the raw little-endian arrays of a chunk or the
+    JSON state of a checkpoint.
+    """
+
+    def __init__(self, path: Path):
+        """Initializes the ChunkLog instance.
+
+        The file is only created when the first chunks are spilled.
+
+        Args:
+            path: The log's path.
+        """
+
+        self.path = path
+        self.chunk_count = 0
+        self._file: Optional[Any] = None
+        self._created = False
+        self._reader: Optional[Any] = None
+        self._chunks: Dict[int, List[Tuple[int, int, int]]] = {}
+
+    def spill(self, series: List[Series]):
+        """Appends the samples of series to the log, then clears them.
+
+        Args:
+            series: The session's series (see find_series). The same list
+                must be given every time, so the chunks can be matched with
+                their series.
+        """
+
+        self._open()
+        assert self._file is not None
+        for index, item in enumerate(series):
+            if not len(item) or item.values is None:
+                continue
+            times = _to_bytes(item.times)
+            values = _to_bytes(item.values)
+            self._file.write(RECORD_HEADER.pack(
+                SERIES_CHUNK, index, len(item), len(times), len(values)))
+            self._file.write(times)
+            self._file.write(values)
+            self.chunk_count += 1
+            # Cleared in place: recorders hold references to the arrays.
+            del item.times[:]
+            del item.values[:]
+        self._file.flush()
+
+    def checkpoint(self, series: List[Series], state: Any):
+        """Spills the samples of series, then appends a checkpoint.
+
+        The log is synced to disk, so the checkpoint survives a crash of the
+        process or the system.
+
+        Args:
+            series: The session's series, as given to spill.
+            state: The rest of the session's data, which must be JSON
+                serializable. It's returned by recover.
+        """
+
+        self.spill(series)
+        assert self._file is not None
+        encoded = json.dumps(state, separators=(',', ':')).encode('utf-8')
+        self._file.write(RECORD_HEADER.pack(
+            CHECKPOINT, 0, 0, len(encoded), 0))
+        self._file.write(encoded)
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def recover(self) -> Optional[Any]:
+        """Reopens an existing log, to resume its session.
+
+        The log is truncated after its last complete checkpoint, discarding
+        anything that was appended after it (e.g., a record cut short by a
+        crash). Further chunks are appended to the log, after those of the
+        checkpoint.
+
+        Returns:
+            The state of the last checkpoint, or None if the log doesn't
+            have any (in which case it's left as is).
+
+        Raises:
+            ValueError: If the file isn't a chunk log.
+        """
+
+        self.close()
+        state = None
+        end = chunk_count = chunks_read = 0
+        with self.path.open('rb') as file:
+            _check_file_header(file.read(FILE_HEADER.size), self.path)
+            for record_type, _, _, times_size, values_size in (
+                    _read_records(file)):
+                data = file.read(times_size + values_size)
+                if len(data) < times_size + values_size:
+                    break
+                if record_type == SERIES_CHUNK:
+                    chunks_read += 1
+                elif record_type == CHECKPOINT:
+                    try:
+                        state = json.loads(data)
+                    except ValueError:
+                        break
+                    end, chunk_count = file.tell(), chunks_read
+        if state is None:
+            return None
+        self._file = self.path.open('r+b')
+        self._file.truncate(end)
+        self._file.seek(end)
+        self._created = True
+        self.chunk_count = chunk_count
+        return state
+
+    def attach(self, data: Any) -> Any:
+        """Copies a session's data, attaching its spilled chunks to it.
+
+        Every series is replaced by a SpilledSeries, which reads its chunks
+        back when it's loaded (e.g., by the writers of replay files, one
+        series at a time). The log is then only read, and must be kept until
+        the copy has been written.
+
+        Args:
+            data: The session's data, in the layout given to spill (see
+                find_series).
+
+        Returns:
+            The copy.
+        """
+
+        self.close()
+        indexes = count()
+
+        def attach(value: Any) -> Any:
+            if isinstance(value, Series):
+                return SpilledSeries(self, next(indexes), value)
+            if isinstance(value, dict):
+                return {key: attach(x) for key, x in value.items()}
+            if isinstance(value, (list, tuple)):
+                return type(value)(attach(x) for x in value)
+            return value
+
+        return attach(data)
+
+    def read_series(self, index: int, tail: Series) -> Series:
+        """Reads a series' spilled chunks (see attach).
+
+        Args:
+            index: The series' index, in the order of find_series.
+            tail: The samples that were recorded after the last chunk.
+
+        Returns:
+            A new series, with the spilled samples followed by those of
+            tail, or tail itself if none were spilled.
+        """
+
+        if not self.chunk_count:
+            return tail
+        if self._reader is None:
+            self._index_chunks()
+        chunks = self._chunks.get(index)
+        if not chunks or tail.values is None:
+            return tail
+        reader = self._reader
+        assert reader is not None
+        series = Series(tail.typecode, tail.width, tail.time_scale,
+                        tail.value_scale)
+        assert series.values is not None
+        for offset, times_size, values_size in chunks:
+            reader.seek(offset)
+            _from_bytes(series.times, reader.read(times_size))
+            _from_bytes(series.values, reader.read(values_size))
+        series.times.extend(tail.times)
+        series.values.extend(tail.values)
+        return series
+
+    def close(self):
+        """Closes the log file."""
+
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        if self._reader is not None:
+            self._reader.close()
+            self._reader = None
+
+    def delete(self):
+        """Closes and deletes the log file."""
+
+        self.close()
+        self.path.unlink(missing_ok=True)
+        self.chunk_count = 0
+        self._created = False
+
+    def _index_chunks(self):
+        # Locates the chunks of every series, for read_series.
+        self.close()
+        self._chunks = {}
+        self._reader = reader = self.path.open('rb')
+        _check_file_header(reader.read(FILE_HEADER.size), self.path)
+        for record_type, index, _, times_size, values_size in (
+                _read_records(reader)):
+            if record_type == SERIES_CHUNK:
+                self._chunks.setdefault(index, []).append(
+                    (reader.tell(), times_size, values_size))
+            reader.seek(times_size + values_size, os.SEEK_CUR)
+
+    def _open(self):
+        if self._file is not None:
+            return
+        if self._created:
+            self._file = self.path.open('ab')
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = self.path.open('wb')
+        self._file.write(FILE_HEADER.pack(CHUNK_LOG_MAGIC, CHUNK_LOG_VERSION))
+        self._created = True
+
+
+class SpilledSeries:
+    """A series whose older samples were spilled to a chunk log.
+
+    Replay file writers load each of them only when they write it, so only
+    the series being written is entirely back in memory.
+    """
+
+    __slots__ = ('chunk_log', 'index', 'tail')
+
+    def __init__(self, chunk_log: ChunkLog, index: int, tail: Series):
+        """Initializes the SpilledSeries instance.
+
+        Args:
+            chunk_log: The log the chunks were spilled to.
+            index: The series' index, in the order of find_series.
+            tail: The samples that were recorded after the last chunk.
+        """
+
+        self.chunk_log = chunk_log
+        self.index = index
+        self.tail = tail
+
+    def load(self) -> Series:
+        """Reads the series' samples, as a new series."""
+
+        return self.chunk_log.read_series(self.index, self.tail)
+
+
+def _iter_series(value: Any) -> Iterator[Series]:
+    if isinstance(value, Series):
+        yield value
+    elif isinstance(value, dict):
+        for item in value.values():
+            yield from _iter_series(item)
+    elif isinstance(value, (list, tuple)):
+        for item in value:
+            yield from _iter_series(item)
+
+
+def _check_file_header(header: bytes, path: Path):
+    if len(header) != FILE_HEADER.size:
+        raise ValueError(f'Truncated chunk log file header: {path}')
+    magic, version = FILE_HEADER.unpack(header)
+    if magic != CHUNK_LOG_MAGIC:
+        raise ValueError(f'Not a chunk log file: {path}')
+    if version != CHUNK_LOG_VERSION:
+        raise ValueError(
+            f'Unsupported chunk log format version in {path}: {version}')
+
+
+def _read_records(file: Any) -> Iterator[Any]:
+    # Yields the headers of the records, with the file positioned at their
+    # data. A truncated final record header is ignored.
+    while True:
+        header = file.read(RECORD_HEADER.size)
+        if len(header) < RECORD_HEADER.size:
+            return
+        yield RECORD_HEADER.unpack(header)
+
+
+def _to_bytes(numbers: array) -> bytes:
+    if sys.byteorder == 'little':
+        return numbers.tobytes()
+    swapped = array(numbers.typecode, numbers)
+    swapped.byteswap()
+    return swapped.tobytes()
+
+
+def _from_bytes(numbers: array, data: bytes):
+    if sys.byteorder == 'little':
+        numbers.frombytes(data)
+        return
+    chunk = array(numbers.typecode)
+    chunk.frombytes(data)
+    chunk.byteswap()
+    numbers.extend(chunk)
@@ -0,0 +1,341 @@
+from ctypes import Array, sizeof, Structure
+from enum import Enum
+import math
+from typing import (
+    Any, Callable, Dict, Final, List, NamedTuple, Optional, Tuple, Type)
+from constants.constants import GRID_SIZE
+from custom_types.game import get_fields, get_struct_format
+from packets.packets import Packet
+from replay.Series import Series
+
+
+TIME_SCALE: Final[int] = 1000
+"""The scale of recorded timestamps, which are stored in milliseconds."""
+
+
+class DataStorePolicy(Enum):
+    """Defines the policy used to determine when to store data."""
+
+    ALL = 0,
+    """Store all data."""
+
+    FIRST = 1,
+    """Store the first instance of the data but ignore everything else."""
+
+    ON_CHANGE = 2,
+    """Store instances of data that are different from the data
+    immediately before it.
+    """
+
+
+class Field(NamedTuple):
+    """Declares how a packet field is recorded."""
+
+    name: str
+    """The field's name, in the packet and in the recorded data."""
+
+    policy: DataStorePolicy
+    """When the field's values are stored."""
+
+    precision: Optional[int] = None
+    """The number of decimals float values are rounded to, if any. Rounded
+    values are quantized: stored as integers, in units of 10 ** -precision.
+    """
+
+    expression: Optional[str] = None
+    """A Python expression that computes the value from the structure
+    ({} is replaced by the structure). Defaults to the field's value (as a
+    tuple for arrays)."""
+
+    typecode: Optional[str] = None
+    """The array typecode of the values. Defaults to the field's type."""
+
+    width: Optional[int] = None
+    """The number of values per sample (0 for scalars). Defaults to the
+    field's type."""
+
+
+class PacketSchema(NamedTuple):
+    """Declares the fields recorded from a packet type."""
+
+    packet_type: Type[Packet]
+    """The packet type."""
+
+    fields: List[Field]
+    """The recorded fields, in the order they're stored in."""
+
+    per_car_field: Optional[str] = None
+    """The name of the packet's per-car array, if the fields are those of
+    its elements (and are recorded for each car)."""
+
+
+_INT64_MIN: Final[int] = -2 ** 63
+_INT64_MAX: Final[int] = 2 ** 63 - 1
+
+_UNSET = object()
+"""The last value of a field that hasn't been stored yet."""
+
+
+class PacketRecorder:
+    """Records packets into series, as declared by a PacketSchema.
+
+    The schema is compiled into a function specialized for the packet type
+    (see _compile), so recording a packet only evaluates each field and
+    appends the values that its policy keeps.
+
+    Timestamps and rounded values are quantized (see Series): they're
+    rounded to integers with round(), instead of being formatted to and
+    parsed from strings, and only converted back when they're serialized.
+
+    If every per-car field is stored ON_CHANGE or FIRST, each car's data is
+    first compared as a whole with the previous packet's: a car whose raw
+    bytes (or decoded record, with the struct decoder) are unchanged can't
+    have a changed field, so its fields aren't evaluated at all.
+    """
+
+    def __init__(self, schema: PacketSchema):
+        """Initializes the PacketRecorder instance.
+
+        Args:
+            schema: The recorded fields.
+        """
+
+        self.schema = schema
+        self._types = [_get_field_type(schema, field)
+                       for field in schema.fields]
+        self._record = _compile(schema, self._types)
+        self._times: Any = []
+        self._values: Any = []
+        self._last_values: Any = []
+        self._previous_cars: List[Any] = []
+        self.reset()
+
+    def reset(self) -> Any:
+        """Starts recording into new, empty series.
+
+        Returns:
+            The series by field name: a dictionary, or a list with a
+            dictionary for each car if the schema has a per-car field.
+        """
+
+        if self.schema.per_car_field is None:
+            series, times, values, last_values = self._create_series()
+        else:
+            cars = [self._create_series() for _ in range(GRID_SIZE)]
+            series, times, values, last_values = (
+                [car[index] for car in cars] for index in range(4))
+        self._times = times
+        self._values = values
+        self._last_values = last_values
+        self._previous_cars = [None] * GRID_SIZE
+        return series
+
+    def record(self, packet: Packet):
+        """Records a packet's fields into the current series.
+
+        Args:
+            packet: A packet of the schema's packet type.
+        """
+
+        self._record(packet, self._times, self._values, self._last_values,
+                     self._previous_cars)
+
+    def last_value(self, name: str, car: Optional[int] = None) -> Any:
+        """Returns the last value stored for a field.
+
+        Unlike the series' samples, the last values are never spilled (see
+        replay.ChunkLog), so they're always available. They're only kept for
+        FIRST and ON_CHANGE fields.
+
+        Args:
+            name: The field's name.
+            car: The car's index, if the schema has a per-car field.
+
+        Returns:
+            The value, as it's stored (i.e., quantized if it's rounded).
+
+        Raises:
+            LookupError: If no value has been stored for the field (or it's
+                an ALL field).
+        """
+
+        index = [field.name for field in self.schema.fields].index(name)
+        values = self._last_values if car is None else self._last_values[car]
+        if values[index] is _UNSET:
+            raise LookupError(f'No value stored for field: {name}')
+        return values[index]
+
+    def get_last_values(self) -> Any:
+        """Returns the last values stored for the fields (e.g., to checkpoint
+        a session).
+
+        Returns:
+            A JSON-serializable list of the values by field, with None for
+            fields without one, or a list of such lists by car if the schema
+            has a per-car field.
+        """
+
+        def convert(values: List[Any]) -> List[Any]:
+            return [None if x is _UNSET else x for x in values]
+
+        if self.schema.per_car_field is None:
+            return convert(self._last_values)
+        return [convert(x) for x in self._last_values]
+
+    def set_last_values(self, last_values: Any):
+        """Restores the last values stored for the fields (e.g., to resume a
+        session from a checkpoint), so unchanged values aren't stored again.
+
+        Args:
+            last_values: Values returned by get_last_values, possibly loaded
+                from JSON (with tuples as lists).
+        """
+
+        def convert(values: List[Any]) -> List[Any]:
+            return [_UNSET if x is None else
+                    tuple(x) if isinstance(x, list) else x for x in values]
+
+        if self.schema.per_car_field is None:
+            self._last_values = convert(last_values)
+        else:
+            self._last_values = [convert(x) for x in last_values]
+        self._previous_cars = [None] * GRID_SIZE
+
+    def _create_series(self) -> Tuple[Dict[str, Series], List[Any],
+                                      List[Any], List[Any]]:
+        series = {field.name: Series(typecode, width, TIME_SCALE, scale)
+                  for field, (typecode, width, scale) in zip(
+                      self.schema.fields, self._types)}
+        return (series, [x.times for x in series.values()],
+                [x.values for x in series.values()],
+                [_UNSET] * len(series))
+
+
+def _get_field_type(schema: PacketSchema,
+                    field: Field) -> Tuple[str, int, Optional[int]]:
+    # Returns the typecode, width and value scale of a field's series.
+    scale = None if field.precision is None else 10 ** field.precision
+    typecode, width = field.typecode, field.width
+    if typecode is None or width is None:
+        if field.expression is not None:
+            raise ValueError(
+                f'Computed field without a type in PacketRecorder: '
+                f'{field.name}')
+        structure: Any = schema.packet_type
+        if schema.per_car_field is not None:
+            structure = dict(get_fields(structure))[
+                schema.per_car_field]._type_
+        ctype = dict(get_fields(structure))[field.name]
+        field_width = 0
+        if isinstance(ctype, type) and issubclass(ctype, Array):
+            field_width = ctype._length_
+            ctype = ctype._type_
+        format = get_struct_format(ctype)
+        if scale is not None:
+            # Quantized values are integers.
+            format = 'q'
+        typecode = format if typecode is None else typecode
+        width = field_width if width is None else width
+    return typecode, width, scale
+
+
+def _compile(schema: PacketSchema,
+             types: List[Tuple[str, int, Optional[int]]]
+             ) -> Callable[[Packet, Any, Any, Any, Any], None]:
+    """Compiles a schema into a function that records a packet.
+
+    The function takes the packet, the series' time arrays, value arrays
+    and last stored values (lists by field, or lists of such lists by car),
+    and the previous packet's car data, and appends to the arrays directly.
+    """
+
+    namespace: Dict[str, Any] = {'UNSET': _UNSET, 'Structure': Structure,
+                                 'quantize': _quantize}
+    time = _get_quantized_expression('packet.sessionTime', TIME_SCALE)
+    lines = ['def record(packet, T, V, L, P):', f'    t = {time}']
+    indent = '    '
+    cars = f'packet.{schema.per_car_field}'
+    if schema.per_car_field is None:
+        lines.append('    item = packet')
+    elif all(field.policy != DataStorePolicy.ALL for field in schema.fields):
+        cars_type = dict(get_fields(schema.packet_type))[
+            schema.per_car_field]
+        offset = getattr(schema.packet_type, schema.per_car_field).offset
+        car_size = sizeof(cars_type._type_)
+        namespace['OFFSETS'] = [offset + index * car_size
+                                for index in range(cars_type._length_)]
+        lines.extend([
+            '    if isinstance(packet, Structure):',
+            '        raw = bytes(packet)',
+            f'        K = [raw[x:x + {car_size}] for x in OFFSETS]',
+            '    else:',
+            f'        K = {cars}',
+            f'    for item, k, p, T, V, L in zip({cars}, K, P, T, V, L):',
+            '        if k == p:',
+            '            continue'])
+        indent += '    '
+    else:
+        lines.append(f'    for item, T, V, L in zip({cars}, T, V, L):')
+        indent += '    '
+    for index, (field, (_, width, _)) in enumerate(
+            zip(schema.fields, types)):
+        value = _get_value_expression(field, width)
+        store = [f'L[{index}] = v',
+                 f'T[{index}].append(t)',
+                 f'V[{index}].{"extend" if width else "append"}(v)']
+        if field.policy == DataStorePolicy.ALL:
+            statements = [f'v = {value}'] + store[1:]
+        elif field.policy == DataStorePolicy.FIRST:
+            statements = [f'if L[{index}] is UNSET:',
+                          f'    v = {value}'] + [f'    {x}' for x in store]
+        elif field.policy == DataStorePolicy.ON_CHANGE:
+            statements = [f'v = {value}',
+                          f'if v != L[{index}]:'] + [f'    {x}' for x in store]
+        else:
+            raise ValueError('No matching DataStorePolicy.')
+        lines.extend(indent + statement for statement in statements)
+    if 'OFFSETS' in namespace:
+        lines.append('    P[:] = K')
+    exec('\n'.join(lines) + '\n', namespace)
+    return namespace['record']
+
+
+def _get_value_expression(field: Field, width: int) -> str:
+    if field.expression is not None:
+        value = field.expression.format('item')
+    elif width:
+        value = f'tuple(item.{field.name})'
+    else:
+        value = f'item.{field.name}'
+    if field.precision is not None:
+        if width:
+            raise ValueError(
+                f'Rounded tuple field in PacketRecorder: {field.name}')
+        value = _get_quantized_expression(value, 10 ** field.precision)
+    return value
+
+
+def _get_quantized_expression(value: str, scale: int) -> str:
+    # Float32 values times a power of 10 (up to 10 ** 8) are exact in a
+    # double, so this rounds like formatting to precision decimals. Values
+    # that round can't convert, or that don't fit in an int64 array, are
+    # left to quantize (NaN fails both comparisons).
+    bound = float(2 ** 62 // scale)
+    return (f'round(x * {scale}) if {-bound!r} < (x := ({value})) < '
+            f'{bound!r} else quantize(x, {scale})')
+
+
+def _quantize(value: float, scale: int) -> int:
+    """Quantizes a value that's out of the range of int64 arrays, or isn't
+    finite.
+
+    Such values are clamped to the range (with infinities becoming its
+    bounds) and NaN is stored as 0, so a corrupt value can't stop a session
+    from being recorded.
+    """
+
+    if math.isnan(value):
+        return 0
+    if math.isinf(value):
+        return _INT64_MAX if value > 0 else _INT64_MIN
+    return min(max(round(value * scale), _INT64_MIN), _INT64_MAX)
@@ -0,0 +1,198 @@
+import json
+import mmap
+from pathlib import Path
+from typing import (
+    Any, Callable, Dict, Iterator, List, Mapping, Optional, Sequence)
+from replay.binary_format import decode_series, read_metadata, SERIES_KEY
+from replay.compression import get_compression, open_file
+from replay.formats import get_format, ReplayFormat
+from replay.Series import Series
+
+
+class ReplayReader:
+    """Reads a replay file of any format (see replay.formats).
+
+    The session's data is accessed like the data ReplayFilter writes, e.g.
+    reader.data['car_telemetry'][0]['throttle'], with every series as a
+    Series (which can be sliced by time, see Series.slice). In JSON files,
+    a series without samples can't be told apart from other empty lists,
+    so it's read as an empty list.
+
+    Binary files are read lazily: the file is memory-mapped (unless it's
+    compressed, in which case it's decompressed into memory) and each series
+    is decoded the first time it's accessed, so only the series that are
+    used are ever decoded. The dictionaries and lists that contain series
+    are then read-only LazyDict and LazyList instances. JSON files are
+    loaded and converted up front.
+    """
+
+    def __init__(self, path: Path):
+        """Initializes the ReplayReader instance.
+
+        Args:
+            path: The replay file's path.
+
+        Raises:
+            ValueError: If the file isn't a supported replay file.
+        """
+
+        self.path = path
+        self.format = get_format(path)
+        self._map: Optional[mmap.mmap] = None
+        self.data: Mapping[str, Any]
+        if self.format == ReplayFormat.JSON:
+            with open_file(path, 'rt', encoding='utf-8') as file:
+                self.data = _convert_json(json.load(file))
+            return
+        buffer: Any
+        if get_compression(path) is None:
+            with path.open('rb') as file:
+                self._map = mmap.mmap(file.fileno(), 0,
+                                      access=mmap.ACCESS_READ)
+            buffer = self._map
+        else:
+            with open_file(path, 'rb') as file:
+                buffer = file.read()
+        try:
+            tree, blocks = read_metadata(buffer)
+        except BaseException:
+            self.close()
+            raise
+        self.data = _create_lazy(
+            tree, lambda index: decode_series(buffer, blocks[index]))
+
+    def __enter__(self) -> 'ReplayReader':
+        return self
+
+    def __exit__(self, *exc_info: Any):
+        self.close()
+
+    def close(self):
+        """Unmaps the replay file, if it's memory-mapped.
+
+        Series that were decoded remain usable (they're copied out of the
+        file), but the others can no longer be accessed.
+
+        Raises:
+            BufferError: If views of the mapped file are still in use.
+        """
+
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+
+
+class LazyDict(Mapping[str, Any]):
+    """A read-only dictionary whose series are decoded on first access."""
+
+    def __init__(self, items: Dict[str, Any],
+                 decode: Callable[[int], Series]):
+        """Initializes the LazyDict instance.
+
+        Args:
+            items: The items, with series references (see
+                replay.binary_format) in place of the series.
+            decode: Decodes a series, given its block index.
+        """
+
+        self._items = items
+        self._decode = decode
+
+    def __getitem__(self, key: str) -> Any:
+        value = self._items[key]
+        if isinstance(value, _SeriesReference):
+            value = self._items[key] = self._decode(value.index)
+        return value
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._items)
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+
+class LazyList(Sequence[Any]):
+    """A read-only list whose series are decoded on first access."""
+
+    def __init__(self, items: List[Any], decode: Callable[[int], Series]):
+        """Initializes the LazyList instance.
+
+        Args:
+            items: The items, with series references (see
+                replay.binary_format) in place of the series.
+            decode: Decodes a series, given its block index.
+        """
+
+        self._items = items
+        self._decode = decode
+
+    def __getitem__(self, index: Any) -> Any:
+        if isinstance(index, slice):
+            return [self[x] for x in range(len(self._items))[index]]
+        value = self._items[index]
+        if isinstance(value, _SeriesReference):
+            value = self._items[index] = self._decode(value.index)
+        return value
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+
+class _SeriesReference:
+    # Stands in for a series that hasn't been decoded yet.
+    __slots__ = ('index',)
+
+    def __init__(self, index: int):
+        self.index = index
+
+
+_LAZY_TYPES = (LazyDict, LazyList, _SeriesReference)
+
+
+def _create_lazy(value: Any, decode: Callable[[int], Series]) -> Any:
+    # Wraps the dictionaries and lists of the metadata's data that contain
+    # series. The others are returned as they are.
+    if isinstance(value, dict):
+        if len(value) == 1 and SERIES_KEY in value:
+            return _SeriesReference(value[SERIES_KEY])
+        items = {key: _create_lazy(x, decode) for key, x in value.items()}
+        if any(isinstance(x, _LAZY_TYPES) for x in items.values()):
+            return LazyDict(items, decode)
+        return items
+    if isinstance(value, list):
+        elements = [_create_lazy(x, decode) for x in value]
+        if any(isinstance(x, _LAZY_TYPES) for x in elements):
+            return LazyList(elements, decode)
+        return elements
+    return value
+
+
+def _convert_json(value: Any) -> Any:
+    # Converts the lists of (timestamp, value) pairs of JSON data to series.
+    if isinstance(value, dict):
+        return {key: _convert_json(x) for key, x in value.items()}
+    if isinstance(value, list):
+        if _is_series(value):
+            return Series.from_list(value)
+        return [_convert_json(x) for x in value]
+    return value
+
+
+def _is_series(value: List[Any]) -> bool:
+    # Only lists of (timestamp, value) pairs are series: an empty list could
+    # be anything (e.g., an event list), so it's left as it is.
+    if not value:
+        return False
+    for sample in value:
+        if not (isinstance(sample, list) and len(sample) == 2
+                and isinstance(sample[0], (int, float))):
+            return False
+        sample_value = sample[1]
+        if isinstance(sample_value, list):
+            if not all(isinstance(x, (int, float)) and
+                       not isinstance(x, bool) for x in sample_value):
+                return False
+        elif (not isinstance(sample_value, (int, float))
+              or isinstance(sample_value, bool)):
+            return False
+    return True
@@ -0,0 +1,230 @@
+from array import array
+from bisect import bisect_left
+from itertools import chain
+from typing import Any, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+
+class Series:
+    """Defines a compact time series of values.
+
+    Timestamps and values are stored in separate typed arrays instead of a
+    list of (timestamp, value) tuples, so a sample costs a few bytes rather
+    than a tuple and its boxed values. Fixed-width tuple values (e.g., a
+    value per tire) are stored flattened, width values per sample.
+
+    Timestamps and values can also be quantized: stored as integers, in
+    units of 1 / scale (e.g., milliseconds for a time scale of 1000). The
+    arrays then hold the integers, which are only converted back when
+    samples are read (e.g., to be serialized).
+
+    For compatibility with lists of (timestamp, value) tuples, samples can
+    be indexed and iterated over as such tuples.
+    """
+
+    __slots__ = ('times', 'values', 'typecode', 'width', 'time_scale',
+                 'value_scale')
+
+    def __init__(self, typecode: Optional[str] = None,
+                 width: Optional[int] = None,
+                 time_scale: Optional[int] = None,
+                 value_scale: Optional[int] = None):
+        """Initializes the Series instance.
+
+        Args:
+            typecode: The array typecode of the values. Defaults to one
+                inferred from the first value: 'd' for floats, otherwise
+                'q' (or 'Q' for integers too large for it).
+            width: The number of values per sample, with 0 meaning scalar
+                values. Defaults to the length of the first value if it's a
+                tuple, otherwise 0.
+            time_scale: The scale of quantized timestamps, which are then
+                stored in a 'q' array. Defaults to unquantized timestamps,
+                stored in a 'd' array.
+            value_scale: The scale of quantized values, which requires an
+                integer typecode. Defaults to unquantized values.
+        """
+
+        self.times = array('d' if time_scale is None else 'q')
+        self.values: Optional[array] = (
+            None if typecode is None else array(typecode))
+        self.typecode = typecode
+        self.width = width
+        self.time_scale = time_scale
+        self.value_scale = value_scale
+
+    @classmethod
+    def from_list(cls, samples: Sequence[Sequence[Any]]) -> 'Series':
+        """Creates a series from (timestamp, value) pairs.
+
+        The values' type is inferred from all of the values, e.g. as loaded
+        from a JSON replay file: 'd' if any of them is a float, otherwise
+        'q' (or 'Q' for integers too large for it).
+
+        Args:
+            samples: The samples, as (timestamp, value) pairs, with values
+                that are either all numbers or all lists of numbers.
+        """
+
+        series = cls()
+        if not samples:
+            return series
+        first = samples[0][1]
+        series.width = len(first) if isinstance(first, (list, tuple)) else 0
+        values: Iterable[Any] = (x[1] for x in samples)
+        if series.width:
+            values = chain.from_iterable(values)
+        flattened = list(values)
+        if any(isinstance(x, float) for x in flattened):
+            series.typecode = 'd'
+        elif any(x > 0x7FFFFFFFFFFFFFFF for x in flattened):
+            series.typecode = 'Q'
+        else:
+            series.typecode = 'q'
+        series.times = array('d', [x[0] for x in samples])
+        series.values = array(series.typecode, flattened)
+        return series
+
+    def __len__(self) -> int:
+        return len(self.times)
+
+    def __getitem__(self, index: int) -> Tuple[float, Any]:
+        if index < 0:
+            index += len(self.times)
+        value = self._value(index)
+        if self.time_scale is None:
+            return self.times[index], value
+        return self.times[index] / self.time_scale, value
+
+    def __iter__(self) -> Iterator[Tuple[float, Any]]:
+        for index in range(len(self.times)):
+            yield self[index]
+
+    def append(self, time: float, value: Any):
+        """Appends a sample.
+
+        Args:
+            time: The sample's timestamp, in seconds (quantized if the
+                series' timestamps are).
+            value: The sample's value: a number, or a tuple of width
+                numbers (quantized if the series' values are).
+        """
+
+        if self.time_scale is not None:
+            time = round(time * self.time_scale)
+        if self.value_scale is not None:
+            value = (tuple(round(x * self.value_scale) for x in value)
+                     if self.width else round(value * self.value_scale))
+        if self.values is None:
+            self._infer_type(value)
+        assert self.values is not None
+        if self.width:
+            self.values.extend(value)
+        else:
+            self.values.append(value)
+        self.times.append(time)
+
+    def last(self) -> Any:
+        """Returns the most recent value.
+
+        Raises:
+            IndexError: If the series is empty.
+        """
+
+        return self._value(len(self.times) - 1)
+
+    def slice(self, start_time: float, end_time: float) -> 'Series':
+        """Returns the samples in a time range, as a new series.
+
+        The samples are located by binary search, so the timestamps must be
+        in increasing order.
+
+        Args:
+            start_time: The timestamp of the range's start (included).
+            end_time: The timestamp of the range's end (excluded).
+        """
+
+        if self.time_scale is not None:
+            start_time *= self.time_scale
+            end_time *= self.time_scale
+        start = bisect_left(self.times, start_time)
+        stop = bisect_left(self.times, end_time, start)
+        series = Series(self.typecode, self.width, self.time_scale,
+                        self.value_scale)
+        series.times = self.times[start:stop]
+        if self.values is not None:
+            width = max(self.width or 0, 1)
+            series.values = self.values[start * width:stop * width]
+        return series
+
+    def to_list(self, start: int = 0, stop: Optional[int] = None
+                ) -> List[Tuple[float, Any]]:
+        """Returns samples as a list of (timestamp, value) tuples.
+
+        Args:
+            start: The index of the first sample.
+            stop: The index after the last sample. Defaults to the end of
+                the series.
+        """
+
+        if self.values is None:
+            return []
+        times: Sequence[Any] = self.times[start:stop]
+        if self.time_scale is not None:
+            time_scale = self.time_scale
+            times = [x / time_scale for x in times]
+        width = max(self.width or 0, 1)
+        values: Sequence[Any] = self.values[
+            start * width:None if stop is None else stop * width]
+        if self.value_scale is not None:
+            value_scale = self.value_scale
+            values = [x / value_scale for x in values]
+        if not self.width:
+            return list(zip(times, values))
+        return [(time, tuple(values[index:index + width]))
+                for time, index in zip(times, range(0, len(values), width))]
+
+    def _value(self, index: int) -> Any:
+        if not 0 <= index < len(self.times):
+            raise IndexError('Series index out of range')
+        assert self.values is not None
+        if self.width:
+            start = index * self.width
+            values = self.values[start:start + self.width]
+            if self.value_scale is None:
+                return tuple(values)
+            return tuple(x / self.value_scale for x in values)
+        if self.value_scale is None:
+            return self.values[index]
+        return self.values[index] / self.value_scale
+
+    def _infer_type(self, value: Any):
+        if self.width is None:
+            self.width = len(value) if isinstance(value, tuple) else 0
+        if self.typecode is None:
+            items: Sequence[Any] = value if self.width else (value,)
+            if any(isinstance(x, float) for x in items):
+                self.typecode = 'd'
+            elif any(x > 0x7FFFFFFFFFFFFFFF for x in items):
+                self.typecode = 'Q'
+            else:
+                self.typecode = 'q'
+        self.values = array(self.typecode)
+
+
+def to_json(value: Any) -> Any:
+    """Converts series to JSON-serializable lists (for json.dump's default).
+
+    Args:
+        value: An object json can't serialize by itself.
+
+    Returns:
+        The series' samples, as a list of (timestamp, value) tuples.
+
+    Raises:
+        TypeError: If the object isn't a Series.
+    """
+
+    if isinstance(value, Series):
+        return value.to_list()
+    raise TypeError(
+        f'Object of type {type(value).__name__} is not JSON serializable')
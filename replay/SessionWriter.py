@@ -0,0 +1,100 @@
+import logging
+from pathlib import Path
+from queue import Queue
+from threading import Thread
+import time
+from typing import Any, Callable, Final, Optional, Tuple
+from replay.json_writer import save_json
+
+
+DEFAULT_MAX_PENDING_SESSIONS: Final[int] = 2
+"""Default number of sessions that can wait to be written."""
+
+SaveFunction = Callable[[Any, Path], None]
+"""Writes a session's data to a file."""
+
+_Job = Tuple[Path, Any, Optional[Callable[[], None]]]
+
+
+class SessionWriter:
+    """Writes finished sessions to files on a background thread.
+
+    Filters hand a session's data off to the writer and carry on with the
+    next session immediately. The number of sessions waiting to be written
+    is bounded: once it's reached, submitting another session blocks until
+    one of them has been written.
+    """
+
+    def __init__(self, save: SaveFunction = save_json,
+                 max_pending: int = DEFAULT_MAX_PENDING_SESSIONS):
+        """Initializes the SessionWriter instance.
+
+        Args:
+            save: Writes a session's data to a file.
+            max_pending: The maximum number of sessions waiting to be
+                written.
+        """
+
+        if max_pending < 1:
+            raise ValueError(
+                f'Invalid pending session count in SessionWriter: '
+                f'{max_pending}')
+        self.save = save
+        self._queue: 'Queue[Optional[_Job]]' = Queue(max_pending)
+        self._thread: Optional[Thread] = None
+
+    def submit(self, path: Path, data: Any,
+               finish: Optional[Callable[[], None]] = None):
+        """Queues a session to be written.
+
+        The data must not be modified once it's been submitted.
+
+        Args:
+            path: The file to write the session to.
+            data: The session's data.
+            finish: Called on the writer thread once the session has been
+                written successfully (e.g., to delete its checkpoints).
+        """
+
+        if self._thread is None:
+            self._thread = Thread(target=self._run, daemon=True)
+            self._thread.start()
+        self._queue.put((path, data, finish))
+
+    def wait(self):
+        """Blocks until every submitted session has been written."""
+
+        self._queue.join()
+
+    def close(self):
+        """Writes the submitted sessions, then stops the writer thread.
+
+        The writer can still be used afterwards: submitting a session starts
+        a new thread.
+        """
+
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join()
+            self._thread = None
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            try:
+                if item is None:
+                    return
+                path, data, finish = item
+                start_time = time.perf_counter()
+                try:
+                    self.save(data, path)
+                    if finish is not None:
+                        finish()
+                except Exception:
+                    logging.exception(f'Failed to write file: {path}')
+                    continue
+                logging.info(f'Finished writing file: {path.name}')
+                logging.debug(
+                    f'File write time: {time.perf_counter() - start_time}')
+            finally:
+                self._queue.task_done()
@@ -0,0 +1,330 @@
+from array import array
+from itertools import accumulate, chain, repeat
+import json
+from pathlib import Path
+from struct import Struct
+import sys
+from typing import (
+    Any, BinaryIO, Callable, Dict, Final, List, NamedTuple, Optional, Tuple)
+from replay.ChunkLog import SpilledSeries
+from replay.compression import open_file
+from replay.Series import Series
+
+"""This module defines the binary format of replay files.
+
+A binary replay file starts with a file header, followed by a block for
+every series of the session, the session's metadata and a footer locating
+the metadata.
+
+Each block holds a series' timestamps and values:
+
+    - Integer values are stored as the varint-encoded differences between
+      consecutive values (of the same tuple element, for tuple values).
+    - Quantized timestamps and values (see Series), such as the millisecond
+      timestamps ReplayFilter records, are integers and are stored the
+      same way, along with their scale.
+    - Unquantized timestamps and float values that are exact at 3 decimals
+      are quantized to thousandths, then stored the same way.
+    - Any other float values are stored as raw little-endian floats.
+
+Differences are zigzag-encoded, so the small negative differences also take
+a single byte.
+
+The metadata is JSON: the session's data, with every series replaced by a
+reference to its block ({"$series": index}), and the description of every
+block (a list of the fields of SeriesBlock). A reader can then decode each
+series on its own.
+"""
+
+REPLAY_MAGIC: Final[bytes] = b'F122RPL\0'
+"""Identifies binary replay files."""
+
+BINARY_FORMAT_VERSION: Final[int] = 2
+"""The version of the binary replay file format (1 is the JSON format)."""
+
+FILE_HEADER: Final[Struct] = Struct('<8sI')
+"""The header of binary replay files: magic and format version."""
+
+FILE_FOOTER: Final[Struct] = Struct('<QQ')
+"""The footer of binary replay files: metadata offset and length."""
+
+SERIES_KEY: Final[str] = '$series'
+"""The key of a series reference in the metadata."""
+
+FIXED_POINT_SCALE: Final[int] = 1000
+"""The scale of fixed-point timestamps and float values (3 decimals)."""
+
+
+class SeriesBlock(NamedTuple):
+    """Describes the block of a series."""
+
+    offset: int
+    """The offset of the block in the file."""
+
+    count: int
+    """The number of samples."""
+
+    typecode: Optional[str]
+    """The array typecode of the values (None if the series is empty)."""
+
+    width: Optional[int]
+    """The number of values per sample (0 for scalars)."""
+
+    times_size: int
+    """The size of the encoded timestamps, which start the block."""
+
+    values_size: int
+    """The size of the encoded values, which follow the timestamps."""
+
+    time_scale: int
+    """The scale of the (quantized) timestamps, or 0 if they're raw
+    doubles."""
+
+    value_scale: Optional[int]
+    """The scale of the values if they're quantized, 0 if they're raw
+    floats and None if they're integers."""
+
+
+def write_binary(data: Any, file: BinaryIO):
+    """Writes replay data to a file in the binary format.
+
+    Args:
+        data: Dictionaries, lists and tuples of JSON-serializable values and
+            series.
+        file: The binary file to write to.
+    """
+
+    file.write(FILE_HEADER.pack(REPLAY_MAGIC, BINARY_FORMAT_VERSION))
+    offset = FILE_HEADER.size
+    blocks: List[SeriesBlock] = []
+
+    def write_block(series: Series) -> Dict[str, int]:
+        nonlocal offset
+        times, time_scale = _encode_numbers(
+            series.times, 0, series.time_scale)
+        values, value_scale = b'', series.value_scale
+        if series.values is not None:
+            values, value_scale = _encode_numbers(
+                series.values, series.width or 0, series.value_scale)
+        blocks.append(SeriesBlock(
+            offset, len(series), series.typecode, series.width, len(times),
+            len(values), time_scale, value_scale))
+        file.write(times)
+        file.write(values)
+        offset += len(times) + len(values)
+        return {SERIES_KEY: len(blocks) - 1}
+
+    tree = _map_series(data, write_block)
+    metadata = json.dumps(
+        {'data': tree, 'series': blocks},
+        ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    file.write(metadata)
+    file.write(FILE_FOOTER.pack(offset, len(metadata)))
+
+
+def save_binary(data: Any, path: Path, level: Optional[int] = None):
+    """Writes replay data to a binary replay file.
+
+    The file is compressed if its suffix is that of a codec (see
+    replay.compression).
+
+    Args:
+        data: Dictionaries, lists and tuples of JSON-serializable values and
+            series.
+        path: The file to write. Its directory is created if needed.
+        level: The compression level. Defaults to the codec's default.
+    """
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open_file(path, 'wb', level) as file:
+        write_binary(data, file)
+
+
+def read_metadata(buffer: Any) -> Tuple[Any, List[SeriesBlock]]:
+    """Reads the metadata of a binary replay file.
+
+    Args:
+        buffer: The file's contents (any object supporting the buffer
+            protocol).
+
+    Returns:
+        The session's data, with series references in place of the series,
+        and the description of every block.
+
+    Raises:
+        ValueError: If the file is invalid or of an unsupported version.
+    """
+
+    # The views are released explicitly, even when the file is invalid, so
+    # a memory-mapped buffer can be closed as soon as this returns.
+    with memoryview(buffer) as raw, raw.cast('B') as view:
+        if len(view) < FILE_HEADER.size + FILE_FOOTER.size:
+            raise ValueError('Truncated binary replay file')
+        magic, version = FILE_HEADER.unpack_from(view)
+        if magic != REPLAY_MAGIC:
+            raise ValueError('Not a binary replay file')
+        if version != BINARY_FORMAT_VERSION:
+            raise ValueError(
+                f'Unsupported binary replay format version: {version}')
+        offset, length = FILE_FOOTER.unpack_from(view, len(view) -
+                                                 FILE_FOOTER.size)
+        metadata = json.loads(bytes(view[offset:offset + length]))
+    return metadata['data'], [SeriesBlock(*x) for x in metadata['series']]
+
+
+def decode_series(buffer: Any, block: SeriesBlock) -> Series:
+    """Decodes a series from its block.
+
+    Args:
+        buffer: The file's contents (any object supporting the buffer
+            protocol).
+        block: The series' block.
+
+    Returns:
+        The series.
+    """
+
+    typecode = 'q' if block.value_scale else block.typecode
+    series = Series(typecode, block.width, block.time_scale or None,
+                    block.value_scale or None)
+    start = block.offset
+    with memoryview(buffer) as raw, raw.cast('B') as view:
+        with view[start:start + block.times_size] as times:
+            series.times = _decode_numbers(
+                times, block.count, 0, 'd', block.time_scale)
+        if typecode is not None:
+            start += block.times_size
+            with view[start:start + block.values_size] as values:
+                series.values = _decode_numbers(
+                    values, block.count * max(block.width or 0, 1),
+                    block.width or 0, typecode, block.value_scale)
+    return series
+
+
+def map_references(value: Any, function: Callable[[int], Any]) -> Any:
+    """Copies the metadata's data, replacing its series references.
+
+    Args:
+        value: The metadata's data (see read_metadata).
+        function: Returns the replacement of a series reference, given the
+            index of the series' block.
+
+    Returns:
+        The copy.
+    """
+
+    if isinstance(value, dict):
+        if len(value) == 1 and SERIES_KEY in value:
+            return function(value[SERIES_KEY])
+        return {key: map_references(x, function) for key, x in value.items()}
+    if isinstance(value, list):
+        return [map_references(x, function) for x in value]
+    return value
+
+
+def load_binary(path: Path) -> Any:
+    """Reads a binary replay file, decoding every series.
+
+    Args:
+        path: The file's path. It's decompressed if its suffix is that of a
+            codec (see replay.compression).
+
+    Returns:
+        The session's data, with series in the place they were written.
+    """
+
+    with open_file(path, 'rb') as file:
+        buffer = file.read()
+    tree, blocks = read_metadata(buffer)
+    return map_references(
+        tree, lambda index: decode_series(buffer, blocks[index]))
+
+
+def _map_series(value: Any, function: Callable[[Series], Any]) -> Any:
+    # Copies nested dictionaries and lists (tuples become lists), replacing
+    # their series. Spilled series are loaded one at a time.
+    if isinstance(value, SpilledSeries):
+        value = value.load()
+    if isinstance(value, Series):
+        return function(value)
+    if isinstance(value, dict):
+        return {key: _map_series(x, function) for key, x in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_map_series(x, function) for x in value]
+    return value
+
+
+def _encode_numbers(numbers: array, width: int, scale: Optional[int]
+                    ) -> Tuple[bytes, Optional[int]]:
+    # Returns the encoded numbers and their scale.
+    if numbers.typecode in ('d', 'f'):
+        try:
+            scaled = [round(x * FIXED_POINT_SCALE) for x in numbers]
+        except (OverflowError, ValueError):
+            # Infinite or NaN values.
+            scaled = None
+        if (scaled is None or [x / FIXED_POINT_SCALE for x in scaled]
+                != numbers.tolist()):
+            if sys.byteorder == 'little':
+                return numbers.tobytes(), 0
+            raw = array(numbers.typecode, numbers)
+            raw.byteswap()
+            return raw.tobytes(), 0
+        numbers, scale = array('q', scaled), FIXED_POINT_SCALE
+    stride = max(width, 1)
+    zigzags = [(x << 1) if x >= 0 else ((-x << 1) - 1) for x in (
+        a - b for a, b in zip(numbers, chain(repeat(0, stride), numbers)))]
+    return _encode_varints(zigzags), scale
+
+
+def _decode_numbers(data: memoryview, count: int, width: int,
+                    typecode: str, scale: Optional[int]) -> array:
+    if scale == 0:
+        raw = array(typecode)
+        raw.frombytes(data)
+        if sys.byteorder != 'little':
+            raw.byteswap()
+        return raw
+    differences = [(x >> 1) ^ -(x & 1) for x in _decode_varints(data, count)]
+    stride = max(width, 1)
+    if stride == 1:
+        return array('q' if scale else typecode, accumulate(differences))
+    numbers = [0] * count
+    for column in range(stride):
+        numbers[column::stride] = list(
+            accumulate(differences[column::stride]))
+    return array('q' if scale else typecode, numbers)
+
+
+def _encode_varints(numbers: List[int]) -> bytes:
+    if not numbers or max(numbers) < 0x80:
+        return bytes(numbers)
+    encoded = bytearray()
+    for number in numbers:
+        while number >= 0x80:
+            encoded.append((number & 0x7F) | 0x80)
+            number >>= 7
+        encoded.append(number)
+    return bytes(encoded)
+
+
+def _decode_varints(data: memoryview, count: int) -> List[int]:
+    if len(data) == count:
+        # Every number fits in a single byte.
+        numbers = data.tolist()
+    else:
+        numbers = []
+        append = numbers.append
+        number = shift = 0
+        for byte in data.tobytes():
+            if byte < 0x80:
+                append(number | (byte << shift))
+                number = shift = 0
+            else:
+                number |= (byte & 0x7F) << shift
+                shift += 7
+    if len(numbers) != count:
+        raise ValueError(
+            f'Invalid series block in binary replay file: {len(numbers)} '
+            f'values instead of {count}')
+    return numbers
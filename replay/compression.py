@@ -0,0 +1,118 @@
+import bz2
+from enum import Enum
+import gzip
+import lzma
+from pathlib import Path
+from typing import Any, Callable, Dict, Final, IO, Optional, Tuple
+
+"""This module contains the compression of replay files.
+
+Files are compressed with a standard library codec, selected by their
+suffix (e.g., session.json.gz), so the same file name is all that's needed
+to read a file back.
+"""
+
+
+class Compression(Enum):
+    """Defines the codecs available for compressing replay files."""
+
+    GZIP = 'gzip'
+    """Fast, with a moderate compression ratio."""
+
+    BZ2 = 'bz2'
+    """Slower than gzip, with a better ratio."""
+
+    LZMA = 'lzma'
+    """The slowest, with the best ratio."""
+
+
+COMPRESSION_SUFFIXES: Final[Dict[Compression, str]] = {
+    Compression.GZIP: '.gz',
+    Compression.BZ2: '.bz2',
+    Compression.LZMA: '.xz',
+}
+"""Associates codecs with the suffix of the files they compress."""
+
+COMPRESSION_LEVELS: Final[Dict[Compression, Tuple[int, int]]] = {
+    Compression.GZIP: (1, 9),
+    Compression.BZ2: (1, 9),
+    Compression.LZMA: (0, 9),
+}
+"""Associates codecs with their lowest and highest compression levels."""
+
+_OPENERS: Final[Dict[Compression, Callable[..., IO[Any]]]] = {
+    Compression.GZIP: gzip.open,
+    Compression.BZ2: bz2.open,
+    Compression.LZMA: lzma.open,
+}
+
+_LEVEL_ARGUMENTS: Final[Dict[Compression, str]] = {
+    Compression.GZIP: 'compresslevel',
+    Compression.BZ2: 'compresslevel',
+    Compression.LZMA: 'preset',
+}
+
+
+def get_compression(path: Path) -> Optional[Compression]:
+    """Returns the codec a file is compressed with, by its suffix.
+
+    Args:
+        path: The file's path.
+
+    Returns:
+        The codec, or None if the file isn't compressed.
+    """
+
+    for compression, suffix in COMPRESSION_SUFFIXES.items():
+        if path.suffix == suffix:
+            return compression
+    return None
+
+
+def check_compression_level(compression: Optional[Compression],
+                            level: Optional[int]):
+    """Checks that a compression level is valid for a codec.
+
+    Args:
+        compression: The codec, or None for no compression.
+        level: The compression level, or None for the codec's default.
+
+    Raises:
+        ValueError: If the level is out of the codec's range, or given
+            without a codec.
+    """
+
+    if level is None:
+        return
+    if compression is None:
+        raise ValueError(
+            f'Compression level given without compression: {level}')
+    lowest, highest = COMPRESSION_LEVELS[compression]
+    if not lowest <= level <= highest:
+        raise ValueError(
+            f'Invalid {compression.value} compression level: {level} '
+            f'(expected {lowest}-{highest})')
+
+
+def open_file(path: Path, mode: str = 'rb', level: Optional[int] = None,
+              encoding: Optional[str] = None) -> IO[Any]:
+    """Opens a replay file, compressed or not depending on its suffix.
+
+    Args:
+        path: The file's path.
+        mode: The mode to open the file in, as with open.
+        level: The compression level, when writing. Defaults to the codec's
+            default level (gzip and bz2: 9, lzma: 6).
+        encoding: The text encoding, in text mode.
+
+    Returns:
+        A file object that compresses or decompresses transparently.
+    """
+
+    compression = get_compression(path)
+    if compression is None:
+        return path.open(mode, encoding=encoding)
+    kwargs: Dict[str, Any] = {'encoding': encoding}
+    if level is not None and 'r' not in mode:
+        kwargs[_LEVEL_ARGUMENTS[compression]] = level
+    return _OPENERS[compression](path, mode, **kwargs)
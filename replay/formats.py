@@ -0,0 +1,80 @@
+from enum import Enum
+import json
+from pathlib import Path
+from typing import Any, Callable, Dict, Final, Optional
+from replay.binary_format import (
+    BINARY_FORMAT_VERSION, load_binary, save_binary)
+from replay.compression import get_compression, open_file
+from replay.json_writer import JSON_FORMAT_VERSION, save_json
+
+"""This module associates the replay file formats with their files.
+
+A replay file's format is identified by its suffix (before the compression
+suffix, if any), e.g. session.json.gz or session.f1rpl.
+"""
+
+
+class ReplayFormat(Enum):
+    """Defines the formats replay files can be written in."""
+
+    JSON = 'json'
+    """Compact JSON, with series as lists of [timestamp, value] pairs."""
+
+    BINARY = 'binary'
+    """The binary format (see replay.binary_format)."""
+
+
+FORMAT_VERSIONS: Final[Dict[ReplayFormat, int]] = {
+    ReplayFormat.JSON: JSON_FORMAT_VERSION,
+    ReplayFormat.BINARY: BINARY_FORMAT_VERSION,
+}
+"""Associates formats with their version."""
+
+FORMAT_SUFFIXES: Final[Dict[ReplayFormat, str]] = {
+    ReplayFormat.JSON: '.json',
+    ReplayFormat.BINARY: '.f1rpl',
+}
+"""Associates formats with the suffix of their files."""
+
+SAVE_FUNCTIONS: Final[Dict[ReplayFormat,
+                           Callable[[Any, Path, Optional[int]], None]]] = {
+    ReplayFormat.JSON: save_json,
+    ReplayFormat.BINARY: save_binary,
+}
+"""Associates formats with the function that writes their files, given the
+data, path and compression level."""
+
+
+def get_format(path: Path) -> ReplayFormat:
+    """Returns the format of a replay file, by its suffix.
+
+    Args:
+        path: The file's path.
+
+    Raises:
+        ValueError: If the suffix isn't that of a format.
+    """
+
+    if get_compression(path) is not None:
+        path = path.with_suffix('')
+    for format, suffix in FORMAT_SUFFIXES.items():
+        if path.suffix == suffix:
+            return format
+    raise ValueError(f'Unknown replay file format: {path}')
+
+
+def load_replay(path: Path) -> Any:
+    """Reads a replay file of any format, compressed or not.
+
+    Args:
+        path: The file's path.
+
+    Returns:
+        The session's data. Series are lists of [timestamp, value] pairs in
+        JSON files, and Series in binary files.
+    """
+
+    if get_format(path) == ReplayFormat.BINARY:
+        return load_binary(path)
+    with open_file(path, 'rt', encoding='utf-8') as file:
+        return json.load(file)
@@ -0,0 +1,104 @@
+import json
+from pathlib import Path
+from typing import Any, Final, Iterator, Optional, TextIO
+from replay.ChunkLog import SpilledSeries
+from replay.compression import open_file
+from replay.Series import Series
+
+"""This module contains a streaming JSON encoder for replay data.
+
+The output is identical to json.dump with compact separators (and
+ensure_ascii disabled), but series are encoded a chunk of samples at a
+time, so encoding a session never holds more than a chunk of converted
+samples in memory. Series are encoded as lists of [timestamp, value]
+pairs. Spilled series (see replay.ChunkLog) are loaded one at a time, as
+they're encoded.
+"""
+
+JSON_FORMAT_VERSION: Final[int] = 1
+"""The version of the JSON replay file format."""
+
+DEFAULT_CHUNK_SIZE: Final[int] = 4096
+"""Default number of samples encoded at a time."""
+
+_encoder = json.JSONEncoder(ensure_ascii=False, separators=(',', ':'))
+
+
+def encode_json(data: Any, chunk_size: int = DEFAULT_CHUNK_SIZE
+                ) -> Iterator[str]:
+    """Encodes replay data as JSON, in pieces.
+
+    Args:
+        data: Dictionaries, lists and tuples of JSON-serializable values and
+            series.
+        chunk_size: The maximum number of samples encoded at a time.
+
+    Returns:
+        An iterator over the pieces of the JSON text.
+    """
+
+    if isinstance(data, SpilledSeries):
+        data = data.load()
+    if isinstance(data, Series):
+        yield '['
+        for start in range(0, len(data), chunk_size):
+            if start:
+                yield ','
+            # Strips the brackets of the chunk's list.
+            yield _encoder.encode(
+                data.to_list(start, start + chunk_size))[1:-1]
+        yield ']'
+    elif isinstance(data, dict):
+        yield '{'
+        for index, (key, value) in enumerate(data.items()):
+            if index:
+                yield ','
+            yield _encoder.encode(str(key))
+            yield ':'
+            yield from encode_json(value, chunk_size)
+        yield '}'
+    elif isinstance(data, (list, tuple)) and any(
+            isinstance(x, (dict, list, tuple, Series, SpilledSeries))
+            for x in data):
+        yield '['
+        for index, value in enumerate(data):
+            if index:
+                yield ','
+            yield from encode_json(value, chunk_size)
+        yield ']'
+    else:
+        yield _encoder.encode(data)
+
+
+def write_json(data: Any, file: TextIO,
+               chunk_size: int = DEFAULT_CHUNK_SIZE):
+    """Writes replay data to a file as JSON.
+
+    Args:
+        data: Dictionaries, lists and tuples of JSON-serializable values and
+            series.
+        file: The text file to write to.
+        chunk_size: The maximum number of samples encoded at a time.
+    """
+
+    write = file.write
+    for piece in encode_json(data, chunk_size):
+        write(piece)
+
+
+def save_json(data: Any, path: Path, level: Optional[int] = None):
+    """Writes replay data to a JSON file.
+
+    The file is compressed if its suffix is that of a codec (see
+    replay.compression), e.g. session.json.gz.
+
+    Args:
+        data: Dictionaries, lists and tuples of JSON-serializable values and
+            series.
+        path: The file to write. Its directory is created if needed.
+        level: The compression level. Defaults to the codec's default.
+    """
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open_file(path, 'wt', level, 'utf-8') as file:
+        write_json(data, file)
@@ -1,7 +1,8 @@
-from struct import pack
+from struct import pack, pack_into
 from constants.constants import (
     EventStringCode, EVENT_PACKET_LENGTH, GRID_SIZE, MAX_LAP_HISTORIES,
     MAX_MARSHAL_ZONES, MAX_TYRE_STINTS, MAX_WEATHER_SAMPLES, NAME_SIZE,
+    PACKET_HEADER_FRAME_IDENTIFIER_INDEX, PACKET_HEADER_SESSION_UID_INDEX,
     PacketId, TIRE_COUNT)
 
 
@@ -20,6 +21,13 @@ def create_packet_header_data(id: PacketId) -> bytes:
     return data
 
 
+def create_packet(data: bytes, session_uid: int, frame: int) -> bytes:
+    packet = bytearray(data)
+    pack_into('<Q', packet, PACKET_HEADER_SESSION_UID_INDEX, session_uid)
+    pack_into('<I', packet, PACKET_HEADER_FRAME_IDENTIFIER_INDEX, frame)
+    return bytes(packet)
+
+
 def create_event_code_data(code: str) -> bytes:
     byte_code = bytes()
     for c in code:
@@ -0,0 +1,58 @@
+import asyncio
+from typing import List
+from unittest import IsolatedAsyncioTestCase
+from filters.Filter import Filter
+from packets.packets import Packet
+from parsers.AsyncUDPParser import AsyncUDPParser
+import tests.packet_utilities as pu
+from tests.test_udp_parser import get_free_port, send_packets
+
+
+WAIT_TIMEOUT_S = 2
+
+
+class AsyncCollectingFilter(Filter):
+    def __init__(self, expected_count: int):
+        self.packet_ids: List[int] = []
+        self.expected_count = expected_count
+        self.done = asyncio.Event()
+
+    async def filter_async(self, packet: Packet):
+        await asyncio.sleep(0)
+        self.packet_ids.append(packet.packetId)
+        if len(self.packet_ids) >= self.expected_count:
+            self.done.set()
+
+
+class TestAsyncUDPParser(IsolatedAsyncioTestCase):
+    async def test_packets_are_filtered_in_order(self):
+        packets = [pu.create_motion_data(), pu.create_session_data(),
+                   pu.create_car_status_data()] * 10
+        filter = AsyncCollectingFilter(len(packets))
+        parser = AsyncUDPParser(filter, get_free_port())
+        task = asyncio.create_task(parser.run())
+        while not parser.is_running():
+            await asyncio.sleep(0.001)
+        send_packets(parser.port, packets)
+        await asyncio.wait_for(filter.done.wait(), WAIT_TIMEOUT_S)
+        parser.stop()
+        await asyncio.wait_for(task, WAIT_TIMEOUT_S)
+        self.assertEqual(filter.packet_ids, [0, 1, 7] * 10)
+        self.assertEqual(parser.stats.packets_received, len(packets))
+
+    async def test_stop_with_full_queue(self):
+        parser = AsyncUDPParser(AsyncCollectingFilter(0), get_free_port(), 2)
+        await parser.start()
+        queue = parser.data_queue
+        assert queue is not None
+        queue.put_nowait(pu.create_motion_data())
+        queue.put_nowait(pu.create_session_data())
+        parser.stop()
+        # The oldest datagram makes room for the sentinel.
+        self.assertEqual(queue.get_nowait(), pu.create_session_data())
+        self.assertIsNone(queue.get_nowait())
+        self.assertEqual(parser.stats.dropped_packets, {0: 1})
+
+    def test_invalid_queue_size(self):
+        with self.assertRaises(ValueError):
+            AsyncUDPParser(AsyncCollectingFilter(0), 0, 0)
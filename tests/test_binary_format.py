@@ -0,0 +1,102 @@
+import io
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from unittest import TestCase
+from replay.binary_format import (
+    BINARY_FORMAT_VERSION, FILE_HEADER, load_binary, read_metadata,
+    REPLAY_MAGIC, write_binary)
+from replay.formats import (
+    get_format, load_replay, ReplayFormat, SAVE_FUNCTIONS)
+from replay.json_writer import encode_json, save_json
+from replay.Series import Series
+
+
+def create_data():
+    speeds = Series('H', 0)
+    wear = Series('f', 4)
+    throttle = Series('d', 0)
+    positions = Series('d', 0)
+    uids = Series('Q', 0)
+    for index in range(300):
+        time = float('%.3f' % (index * 0.0167 + 1000))
+        speeds.append(time, (index * 37) % 350)
+        wear.append(time, (index * 0.1, 0, 3.5, index ** 2))
+        throttle.append(time, float('%.3f' % ((index % 7) / 7)))
+        positions.append(time, index / 3)
+        uids.append(time, 0xFFFFFFFFFFFFFFFF - index)
+    flashback = Series('b', 0)
+    flashback.append(10.5, -3)
+    flashback.append(2.25, 100)
+    return {
+        'car_telemetry': [{'speed': speeds, 'throttle': throttle}],
+        'car_damage': [{'tyresWear': wear}, {'tyresWear': Series('f', 4)}],
+        'motion': {'worldPositionX': positions, 'uids': uids},
+        'session': {'flashback': flashback, 'empty': Series()},
+        'event': {'SSTA': (1.5, 'SSTA'), 'PENA': [(2.0, 'PENA', 3)]},
+        'participants': {'name': 'Pérez', 'numActiveCars': None},
+    }
+
+
+class TestBinaryFormat(TestCase):
+    def setUp(self):
+        self.directory = TemporaryDirectory()
+        self.path = Path(self.directory.name)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_round_trip(self):
+        data = create_data()
+        path = self.path / 'session.f1rpl'
+        with path.open('wb') as file:
+            write_binary(data, file)
+        loaded = load_binary(path)
+        self.assertEqual(''.join(encode_json(loaded)),
+                         ''.join(encode_json(data)))
+        speeds = loaded['car_telemetry'][0]['speed']
+        self.assertIsInstance(speeds, Series)
+        self.assertEqual(speeds.typecode, 'H')
+        self.assertEqual(loaded['session']['flashback'].to_list(),
+                         [(10.5, -3), (2.25, 100)])
+
+    def test_smaller_than_json(self):
+        data = create_data()
+        json_path = self.path / 'session.json'
+        binary_path = self.path / 'session.f1rpl'
+        save_json(data, json_path)
+        with binary_path.open('wb') as file:
+            write_binary(data, file)
+        self.assertLess(binary_path.stat().st_size,
+                        json_path.stat().st_size / 2)
+
+    def test_compressed_files_loaded(self):
+        data = create_data()
+        for name in ('session.f1rpl.gz', 'session.json.xz'):
+            path = self.path / name
+            SAVE_FUNCTIONS[get_format(path)](data, path, None)
+            loaded = load_replay(path)
+            self.assertEqual(''.join(encode_json(loaded)),
+                             ''.join(encode_json(data)))
+
+    def test_invalid_file(self):
+        with self.assertRaises(ValueError):
+            read_metadata(b'')
+        file = io.BytesIO()
+        write_binary({}, file)
+        data = file.getvalue()
+        self.assertEqual(read_metadata(data), ({}, []))
+        with self.assertRaises(ValueError):
+            read_metadata(b'F122CAP\0' + data[8:])
+        with self.assertRaises(ValueError):
+            read_metadata(FILE_HEADER.pack(
+                REPLAY_MAGIC, BINARY_FORMAT_VERSION + 1)
+                + data[FILE_HEADER.size:])
+
+    def test_format_selected_by_suffix(self):
+        self.assertEqual(get_format(Path('a.json')), ReplayFormat.JSON)
+        self.assertEqual(get_format(Path('a.json.bz2')), ReplayFormat.JSON)
+        self.assertEqual(get_format(Path('a.f1rpl')), ReplayFormat.BINARY)
+        self.assertEqual(get_format(Path('a.f1rpl.gz')),
+                         ReplayFormat.BINARY)
+        with self.assertRaises(ValueError):
+            get_format(Path('a.f1cap'))
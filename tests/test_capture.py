@@ -0,0 +1,119 @@
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from unittest import TestCase
+from capture.CaptureReader import CaptureReader
+from capture.CaptureWriter import CaptureWriter
+from capture.format import FILE_HEADER, get_index_path, INDEX_ENTRY
+from constants.constants import PacketId
+from filters.CaptureFilter import CaptureFilter
+import tests.packet_utilities as pu
+from utilities.parse import parse_packet, parse_packet_in_place
+
+
+def create_packets():
+    return [
+        pu.create_packet(pu.create_lap_data(), 1, 0),
+        pu.create_packet(pu.create_car_telemetry_data(), 1, 0),
+        pu.create_packet(pu.create_lap_data(), 2, 0),
+        pu.create_packet(pu.create_lap_data(), 1, 1),
+        pu.create_packet(pu.create_car_telemetry_data(), 1, 2),
+        pu.create_packet(pu.create_session_data(), 2, 5),
+    ]
+
+
+class TestCapture(TestCase):
+    def setUp(self):
+        self.directory = TemporaryDirectory()
+        self.path = Path(self.directory.name) / 'test.f1cap'
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def write_packets(self, index_interval: int = 2):
+        packets = create_packets()
+        with CaptureWriter(self.path, index_interval) as writer:
+            for time, data in enumerate(packets):
+                writer.write(data, float(time))
+        return packets
+
+    def test_round_trip(self):
+        packets = self.write_packets()
+        with CaptureReader(self.path) as reader:
+            self.assertEqual(len(reader), len(packets))
+            records = list(reader.records())
+        self.assertEqual([record.data for record in records], packets)
+        self.assertEqual([record.receive_time for record in records],
+                         [float(time) for time in range(len(packets))])
+        self.assertEqual(records[5].packet_id, PacketId.SESSION.value)
+
+    def test_find(self):
+        packets = self.write_packets()
+        with CaptureReader(self.path) as reader:
+            self.assertEqual(reader.session_uids(), [1, 2])
+            self.assertEqual(reader.find(1, 1), 3)
+            self.assertEqual(
+                reader.find(1, 1, PacketId.CAR_TELEMETRY.value), 4)
+            self.assertEqual(reader.find(2, 1), 5)
+            self.assertIsNone(reader.find(3))
+            self.assertEqual(reader.read(4).data, packets[4])
+            self.assertEqual(
+                [record.data for record in reader.records(4)], packets[4:])
+
+    def test_recovers_incomplete_index(self):
+        packets = self.write_packets()
+        index_path = get_index_path(self.path)
+        index = index_path.read_bytes()
+        index_path.write_bytes(index[:FILE_HEADER.size
+                                     + 2 * INDEX_ENTRY.size + 3])
+        with self.path.open('ab') as f:
+            f.write(b'\1\2\3')
+        with CaptureReader(self.path) as reader:
+            self.assertEqual(len(reader), len(packets))
+            self.assertEqual(reader.find(2, 1), 5)
+            self.assertEqual([record.data for record in reader.records()],
+                             packets)
+
+    def test_rejects_other_files(self):
+        self.path.write_bytes(b'not a capture file')
+        with self.assertRaises(ValueError):
+            CaptureReader(self.path)
+
+    def test_capture_filter(self):
+        packets = create_packets()
+        filter = CaptureFilter(self.path)
+        for data in packets:
+            filter.filter(parse_packet(data))
+        filter.cleanup()
+        with CaptureReader(self.path) as reader:
+            self.assertEqual([record.data for record in reader.records()],
+                             packets)
+
+    def test_views_are_zero_copy(self):
+        packets = self.write_packets()
+        contents = self.path.read_bytes()
+        with CaptureReader(self.path) as reader:
+            views = list(reader.views())
+            self.assertEqual([view.data.tobytes() for view in views],
+                             packets)
+            self.assertEqual(reader.view(4).data.tobytes(), packets[4])
+            self.assertEqual(len(list(reader.views(4))), 2)
+            packet = parse_packet_in_place(views[1].data)
+            self.assertEqual(packet.packetId, PacketId.CAR_TELEMETRY.value)
+            # Views are writable, but the file is never changed.
+            packet.carTelemetryData[0].speed = 123
+            self.assertEqual(
+                parse_packet_in_place(reader.view(1).data)
+                .carTelemetryData[0].speed, 123)
+        self.assertEqual(self.path.read_bytes(), contents)
+
+    def test_close_with_live_views(self):
+        packets = self.write_packets()
+        reader = CaptureReader(self.path)
+        self.assertEqual(len(reader._unindexed), 0)
+        view = reader.view(2).data
+        reader.close()
+        self.assertIsNone(reader._map)
+        self.assertIsNone(reader._index_map)
+        # The mapping is closed once the last view is released.
+        self.assertEqual(view.tobytes(), packets[2])
+        view.release()
@@ -0,0 +1,138 @@
+from collections import deque
+from pathlib import Path
+from tempfile import TemporaryDirectory
+import tracemalloc
+from unittest import TestCase
+from replay.binary_format import load_binary, save_binary
+from replay.ChunkLog import ChunkLog, find_series, get_memory_usage
+from replay.json_writer import encode_json
+from replay.Series import Series
+
+
+def create_data():
+    speed = Series('H', 0, 1000)
+    temperatures = Series('q', 2, 1000, 10)
+    return {'session': {'speed': speed, 'count': 3},
+            'cars': [{'temperatures': temperatures}, {'empty': Series()}]}
+
+
+class TestChunkLog(TestCase):
+    def test_find_series(self):
+        data = create_data()
+        series = find_series(data)
+        self.assertEqual(len(series), 3)
+        self.assertIs(series[0], data['session']['speed'])
+        self.assertIs(series[2], data['cars'][1]['empty'])
+        self.assertEqual(get_memory_usage(series), 0)
+        series[0].append(0.5, 1)
+        self.assertEqual(get_memory_usage(series), 10)
+
+    def test_spill_and_attach(self):
+        data = create_data()
+        series = find_series(data)
+        speed, temperatures = series[0], series[1]
+        times, values = speed.times, speed.values
+        with TemporaryDirectory() as directory:
+            log = ChunkLog(Path(directory) / 'logs' / '1.f1log')
+            log.spill(series)
+            self.assertEqual(log.chunk_count, 0)
+            for index in range(6):
+                speed.append(index * 0.5, index)
+                temperatures.append(index * 0.5, (index + 0.25, -index))
+                if index % 2:
+                    log.spill(series)
+            self.assertEqual(log.chunk_count, 6)
+            # The arrays are cleared in place, for the recorders.
+            self.assertEqual(len(speed), 0)
+            self.assertIs(speed.times, times)
+            self.assertIs(speed.values, values)
+            speed.append(3.0, 6)
+            # Spilling after the log was closed appends to it.
+            log.close()
+            temperatures.append(3.0, (6.25, -6))
+            log.spill(series)
+            attached = log.attach(data)
+            self.assertEqual(attached['session']['count'], 3)
+            self.assertEqual(attached['session']['speed'].load().to_list(),
+                             [(x * 0.5, x) for x in range(7)])
+            self.assertEqual(
+                attached['cars'][0]['temperatures'].load().to_list(),
+                [(x * 0.5, (x + 0.2, -x)) for x in range(7)])
+            empty = attached['cars'][1]['empty']
+            self.assertIs(empty.load(), data['cars'][1]['empty'])
+            log.delete()
+            self.assertFalse(log.path.exists())
+
+    def test_invalid_file(self):
+        with TemporaryDirectory() as directory:
+            path = Path(directory) / '1.f1log'
+            path.write_bytes(b'not a log file')
+            log = ChunkLog(path)
+            log.chunk_count = 1
+            with self.assertRaises(ValueError):
+                log.read_series(0, Series('q'))
+
+    def test_checkpoint_and_recover(self):
+        data = create_data()
+        series = find_series(data)
+        speed = series[0]
+        with TemporaryDirectory() as directory:
+            path = Path(directory) / '1.f1log'
+            log = ChunkLog(path)
+            speed.append(0.5, 1)
+            log.checkpoint(series, {'count': 1})
+            speed.append(1.0, 2)
+            log.checkpoint(series, {'count': 2})
+            speed.append(1.5, 3)
+            log.spill(series)
+            log.close()
+            # A record cut short by a crash.
+            with path.open('ab') as file:
+                file.write(b'\0\1')
+            recovered = ChunkLog(path)
+            self.assertEqual(recovered.recover(), {'count': 2})
+            self.assertEqual(recovered.chunk_count, 2)
+            data = create_data()
+            series = find_series(data)
+            series[0].append(2.0, 4)
+            recovered.spill(series)
+            attached = recovered.attach(data)
+            self.assertEqual(attached['session']['speed'].load().to_list(),
+                             [(0.5, 1), (1.0, 2), (2.0, 4)])
+            recovered.close()
+
+    def test_recover_without_checkpoint(self):
+        data = create_data()
+        series = find_series(data)
+        with TemporaryDirectory() as directory:
+            log = ChunkLog(Path(directory) / '1.f1log')
+            series[0].append(0.5, 1)
+            log.spill(series)
+            log.close()
+            self.assertIsNone(ChunkLog(log.path).recover())
+
+    def test_save_reads_one_series_at_a_time(self):
+        data = {'cars': [{'speed': Series('q', 0, 1000)} for _ in range(20)]}
+        series = find_series(data)
+        with TemporaryDirectory() as directory:
+            log = ChunkLog(Path(directory) / '1.f1log')
+            for chunk in range(4):
+                for item in series:
+                    for index in range(500):
+                        item.append(chunk * 2.5 + index * 0.001, index)
+                log.spill(series)
+            # The samples' arrays, were they all back in memory.
+            total_size = 20 * 2000 * 16
+            path = Path(directory) / '1.f1rpl'
+            for save in (lambda x: deque(encode_json(x, 256), 0),
+                         lambda x: save_binary(x, path)):
+                tracemalloc.start()
+                try:
+                    save(log.attach(data))
+                    _, peak = tracemalloc.get_traced_memory()
+                finally:
+                    tracemalloc.stop()
+                self.assertLess(peak, total_size / 4)
+            loaded = load_binary(path)
+            self.assertEqual(len(loaded['cars'][19]['speed']), 2000)
+            log.close()
@@ -0,0 +1,56 @@
+import json
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from unittest import TestCase
+from replay.compression import (
+    check_compression_level, Compression, COMPRESSION_LEVELS,
+    COMPRESSION_SUFFIXES, get_compression, open_file)
+from replay.json_writer import save_json
+
+
+class TestCompression(TestCase):
+    def setUp(self):
+        self.directory = TemporaryDirectory()
+        self.path = Path(self.directory.name)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_compression_selected_by_suffix(self):
+        self.assertIsNone(get_compression(Path('session.json')))
+        self.assertEqual(get_compression(Path('session.json.gz')),
+                         Compression.GZIP)
+        self.assertEqual(get_compression(Path('session.json.bz2')),
+                         Compression.BZ2)
+        self.assertEqual(get_compression(Path('session.json.xz')),
+                         Compression.LZMA)
+
+    def test_json_round_trip(self):
+        data = {'speed': [[1.5, 200], [1.6, 201]] * 100, 'name': 'Pérez'}
+        uncompressed = self.path / 'session.json'
+        save_json(data, uncompressed)
+        for compression, suffix in COMPRESSION_SUFFIXES.items():
+            path = self.path / f'session.json{suffix}'
+            save_json(data, path, 1)
+            with open_file(path, 'rt', encoding='utf-8') as file:
+                self.assertEqual(json.load(file), data)
+            self.assertLess(path.stat().st_size,
+                            uncompressed.stat().st_size)
+            with path.open('rb') as file:
+                # Not plain JSON text.
+                self.assertNotEqual(file.read(1), b'{')
+
+    def test_compression_levels_checked(self):
+        check_compression_level(None, None)
+        for compression, (lowest, highest) in COMPRESSION_LEVELS.items():
+            check_compression_level(compression, None)
+            check_compression_level(compression, lowest)
+            check_compression_level(compression, highest)
+            # Every valid level is accepted by the codec.
+            suffix = COMPRESSION_SUFFIXES[compression]
+            save_json({}, self.path / f'session.json{suffix}', lowest)
+            for level in (lowest - 1, highest + 1):
+                with self.assertRaises(ValueError):
+                    check_compression_level(compression, level)
+        with self.assertRaises(ValueError):
+            check_compression_level(None, 5)
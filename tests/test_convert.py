@@ -0,0 +1,53 @@
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from unittest import TestCase
+from capture.CaptureWriter import CaptureWriter
+from constants.constants import EventStringCode
+from convert import convert, find_sessions
+import tests.packet_utilities as pu
+
+
+def create_session(session_uid: int):
+    return [
+        pu.create_packet(pu.create_lap_data(), session_uid, 0),
+        pu.create_packet(pu.create_generic_event_data(
+            EventStringCode.SESSION_START.value), session_uid, 1),
+        pu.create_packet(pu.create_session_data(), session_uid, 2),
+        pu.create_packet(pu.create_participants_data(), session_uid, 3),
+        pu.create_packet(pu.create_car_telemetry_data(), session_uid, 4),
+        pu.create_packet(
+            pu.create_final_classification_data(), session_uid, 5),
+    ]
+
+
+class TestConvert(TestCase):
+    def setUp(self):
+        self.directory = TemporaryDirectory()
+        self.path = Path(self.directory.name)
+        # Two interleaved sessions in one file and a third in another.
+        with CaptureWriter(self.path / 'a.f1cap') as writer:
+            for first, second in zip(create_session(1), create_session(2)):
+                writer.write(first)
+                writer.write(second)
+        with CaptureWriter(self.path / 'b.f1cap') as writer:
+            for data in create_session(3):
+                writer.write(data)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_find_sessions(self):
+        self.assertEqual(find_sessions([self.path]), [
+            (self.path / 'a.f1cap', 1), (self.path / 'a.f1cap', 2),
+            (self.path / 'b.f1cap', 3)])
+
+    def test_converts_every_session(self):
+        output = self.path / 'output'
+        results = convert([self.path], output, 2)
+        self.assertEqual(sorted(result.session_uid for result in results),
+                         [1, 2, 3])
+        for result in results:
+            self.assertEqual(result.packet_count, 6)
+            self.assertEqual(len(result.saved_files), 1)
+            self.assertTrue(result.saved_files[0].exists())
+            self.assertEqual(result.saved_files[0].parent, output)
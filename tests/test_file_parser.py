@@ -0,0 +1,88 @@
+from pathlib import Path
+from tempfile import TemporaryDirectory
+import time
+from typing import List
+from unittest import TestCase
+from capture.CaptureWriter import CaptureWriter
+from constants.constants import PacketId
+from filters.Filter import Filter
+from packets.packets import LapDataPacket, Packet
+from parsers.FileParser import FileParser
+import tests.packet_utilities as pu
+
+
+WAIT_TIMEOUT_S = 2
+
+
+class CollectingFilter(Filter):
+    def __init__(self):
+        self.packet_ids: List[int] = []
+
+    def filter(self, packet: Packet):
+        self.packet_ids.append(packet.packetId)
+
+
+class LapDataFilter(Filter):
+    def __init__(self):
+        self.count = 0
+
+    def filter_lap_data(self, packet: LapDataPacket):
+        self.count += 1
+
+
+class TestFileParser(TestCase):
+    def setUp(self):
+        self.directory = TemporaryDirectory()
+        self.path = Path(self.directory.name) / 'test.f1cap'
+        self.packets = [
+            pu.create_lap_data(),
+            pu.create_car_telemetry_data(),
+            pu.create_session_data(),
+            pu.create_lap_data(),
+        ]
+        with CaptureWriter(self.path) as writer:
+            for index, data in enumerate(self.packets):
+                writer.write(data, 100 + index * 0.1)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_replays_in_order(self):
+        filter = CollectingFilter()
+        FileParser(filter, self.path).run()
+        self.assertEqual(filter.packet_ids, [
+            PacketId.LAP_DATA.value, PacketId.CAR_TELEMETRY.value,
+            PacketId.SESSION.value, PacketId.LAP_DATA.value])
+
+    def test_skips_unsubscribed_packets(self):
+        filter = LapDataFilter()
+        parser = FileParser(filter, self.path)
+        parser.run()
+        self.assertEqual(filter.count, 2)
+        self.assertEqual(parser.stats.packets_received, 4)
+        self.assertEqual(parser.stats.skipped_packets, 2)
+
+    def test_paces_by_receive_time(self):
+        filter = CollectingFilter()
+        parser = FileParser(filter, self.path, speed=2)
+        start = time.perf_counter()
+        parser.start()
+        deadline = start + WAIT_TIMEOUT_S
+        while parser.is_running() and time.perf_counter() < deadline:
+            time.sleep(0.01)
+        # The last packet was received 0.3 s after the first one.
+        self.assertGreaterEqual(time.perf_counter() - start, 0.15)
+        self.assertFalse(parser.is_running())
+        self.assertEqual(len(filter.packet_ids), 4)
+
+    def test_stop(self):
+        filter = CollectingFilter()
+        parser = FileParser(filter, self.path, speed=0.01)
+        parser.start()
+        parser.stop()
+        self.assertFalse(parser.is_running())
+        self.assertLess(len(filter.packet_ids), 4)
+
+    def test_invalid_speed(self):
+        with self.assertRaises(ValueError):
+            FileParser(CollectingFilter(), self.path, speed=-1)
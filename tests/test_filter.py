@@ -0,0 +1,115 @@
+from unittest import TestCase
+from constants.constants import EventStringCode, PacketId
+from filters.DebugFilter import DebugFilter
+from filters.Filter import Filter
+from filters.LogFilter import LogFilter
+from filters.NullFilter import NullFilter
+from packets.packets import CarTelemetryPacket
+import tests.packet_utilities as pu
+from utilities.parse import parse_packet
+
+
+class TelemetryFilter(Filter):
+    def filter_car_telemetry(self, packet: CarTelemetryPacket):
+        pass
+
+
+class DeclaredFilter(TelemetryFilter):
+    packet_ids = frozenset((PacketId.MOTION, PacketId.CAR_TELEMETRY))
+
+
+class TestFilterSubscriptions(TestCase):
+    def test_inferred_from_overridden_methods(self):
+        self.assertEqual(TelemetryFilter.subscribed_packet_ids(),
+                         {PacketId.CAR_TELEMETRY.value})
+        self.assertEqual(LogFilter.subscribed_packet_ids(), {
+            PacketId.SESSION.value, PacketId.EVENT.value,
+            PacketId.PARTICIPANTS.value})
+
+    def test_overridden_filter_consumes_everything(self):
+        all_ids = {id.value for id in PacketId}
+        self.assertEqual(DebugFilter.subscribed_packet_ids(), all_ids)
+        self.assertEqual(NullFilter.subscribed_packet_ids(), all_ids)
+
+    def test_declared_packet_ids(self):
+        self.assertEqual(DeclaredFilter.subscribed_packet_ids(), {
+            PacketId.MOTION.value, PacketId.CAR_TELEMETRY.value})
+
+
+class AllPacketsFilter(Filter):
+    def __init__(self):
+        self.count = 0
+
+    def filter_motion(self, packet):
+        self.count += 1
+
+    def filter_session(self, packet):
+        self.count += 1
+
+    def filter_lap_data(self, packet):
+        self.count += 1
+
+    def filter_event(self, packet):
+        self.count += 1
+
+    def filter_participants(self, packet):
+        self.count += 1
+
+    def filter_car_setups(self, packet):
+        self.count += 1
+
+    def filter_car_telemetry(self, packet):
+        self.count += 1
+
+    def filter_car_status(self, packet):
+        self.count += 1
+
+    def filter_final_classification(self, packet):
+        self.count += 1
+
+    def filter_lobby_info(self, packet):
+        self.count += 1
+
+    def filter_car_damage(self, packet):
+        self.count += 1
+
+    def filter_session_history(self, packet):
+        self.count += 1
+
+
+PACKET_DATA = {
+    PacketId.MOTION: pu.create_motion_data,
+    PacketId.SESSION: pu.create_session_data,
+    PacketId.LAP_DATA: pu.create_lap_data,
+    PacketId.EVENT: lambda: pu.create_generic_event_data(
+        EventStringCode.SESSION_START.value),
+    PacketId.PARTICIPANTS: pu.create_participants_data,
+    PacketId.CAR_SETUPS: pu.create_car_setups_data,
+    PacketId.CAR_TELEMETRY: pu.create_car_telemetry_data,
+    PacketId.CAR_STATUS: pu.create_car_status_data,
+    PacketId.FINAL_CLASSIFICATION: pu.create_final_classification_data,
+    PacketId.LOBBY_INFO: pu.create_lobby_info_data,
+    PacketId.CAR_DAMAGE: pu.create_car_damage_data,
+    PacketId.SESSION_HISTORY: pu.create_session_history_data,
+}
+
+
+class TestFilterDispatch(TestCase):
+    def test_every_packet_type_is_dispatched(self):
+        filter = AllPacketsFilter()
+        for create_data in PACKET_DATA.values():
+            filter.filter(parse_packet(create_data()))
+        self.assertEqual(filter.count, len(PacketId))
+
+    def test_no_op_methods_are_not_in_table(self):
+        table = TelemetryFilter._dispatch_table
+        self.assertEqual(
+            [id for id, handler in enumerate(table) if handler is not None],
+            [PacketId.CAR_TELEMETRY.value])
+
+    def test_invalid_packet_id(self):
+        packet = parse_packet(pu.create_motion_data())
+        packet.packetId = len(PacketId)
+        with self.assertRaises(ValueError):
+            AllPacketsFilter().filter(packet)
+
@@ -0,0 +1,37 @@
+import io
+import json
+from unittest import TestCase
+from replay.json_writer import encode_json, write_json
+from replay.Series import Series
+
+
+class TestJsonWriter(TestCase):
+    def test_matches_json_dump(self):
+        scalars = Series('d', 0)
+        tuples = Series('H', 2)
+        for index in range(10):
+            scalars.append(index * 0.5, index / 3)
+            tuples.append(index * 0.5, (index, index + 1))
+        data = {
+            'series': [{'a': scalars, 'b': tuples, 'empty': Series('B')}],
+            'event': {'SSTA': (1.5, 'SSTA'), 'PENA': [(2.0, 'PENA', 3)]},
+            'participants': {'name': 'Pérez', 'numActiveCars': None},
+        }
+        expected = json.dumps({
+            'series': [{'a': scalars.to_list(), 'b': tuples.to_list(),
+                        'empty': []}],
+            'event': data['event'],
+            'participants': data['participants'],
+        }, ensure_ascii=False, separators=(',', ':'))
+        for chunk_size in (1, 3, 10, 100):
+            file = io.StringIO()
+            write_json(data, file, chunk_size)
+            self.assertEqual(file.getvalue(), expected)
+
+    def test_series_are_encoded_in_chunks(self):
+        series = Series('B', 0)
+        for index in range(5):
+            series.append(float(index), index)
+        pieces = list(encode_json(series, 2))
+        self.assertEqual(pieces, ['[', '[0.0,0],[1.0,1]', ',',
+                                  '[2.0,2],[3.0,3]', ',', '[4.0,4]', ']'])
@@ -0,0 +1,100 @@
+from ctypes import sizeof
+from unittest import skipIf, TestCase
+from constants.constants import PacketId
+from packets.packets import PACKET_TYPE
+import tests.packet_utilities as pu
+from utilities.parse import parse_packet
+
+try:
+    import numpy
+    from packets.numpy_views import (
+        car_view, packet_view, PACKET_DTYPES, parse_columns)
+except ImportError:
+    numpy = None
+
+
+@skipIf(numpy is None, 'NumPy is not installed')
+class TestNumpyViews(TestCase):
+    def test_dtype_sizes_match_ctypes(self):
+        for id, packet_type in PACKET_TYPE.items():
+            self.assertEqual(PACKET_DTYPES[id].itemsize, sizeof(packet_type))
+
+    def test_packet_view_matches_ctypes(self):
+        data = pu.create_car_telemetry_data()
+        packet = parse_packet(data)
+        view = packet_view(data)
+        # Inherited fields (e.g., the header's) are flattened, as with
+        # ctypes.
+        self.assertEqual(view['sessionUID'], packet.sessionUID)
+        self.assertEqual(view['suggestedGear'], packet.suggestedGear)
+        self.assertEqual(
+            list(view['carTelemetryData'][0]['tiresPressure']),
+            list(packet.carTelemetryData[0].tiresPressure))
+
+    def test_car_view_is_vectorized(self):
+        data = bytearray(pu.create_car_telemetry_data())
+        packet = PACKET_TYPE[PacketId.CAR_TELEMETRY.value].from_buffer(data)
+        packet.carTelemetryData[5].brakesTemperature[2] = 900
+        cars = car_view(data)
+        self.assertEqual(len(cars), len(packet.carTelemetryData))
+        self.assertEqual(cars['brakesTemperature'].max(), 900)
+        self.assertEqual(cars['brakesTemperature'].max(axis=1).argmax(), 5)
+        # The view shares memory with the packet.
+        packet.carTelemetryData[3].speed = 250
+        self.assertEqual(cars['speed'][3], 250)
+
+    def test_car_view_of_ctypes_packet(self):
+        packet = parse_packet(pu.create_motion_data())
+        cars = car_view(packet)
+        self.assertEqual(cars['worldPositionX'][0],
+                         packet.carMotionData[0].worldPositionX)
+
+    def test_union_and_char_fields(self):
+        view = packet_view(pu.create_fastest_lap_data())
+        packet = parse_packet(pu.create_fastest_lap_data())
+        self.assertEqual(view['eventStringCode'].tobytes(),
+                         bytes(packet.eventStringCode))
+        self.assertAlmostEqual(view['eventDetails']['FastestLap']['lapTime'],
+                               packet.eventDetails.FastestLap.lapTime)
+        names = car_view(pu.create_participants_data())['name']
+        self.assertEqual(names[0].split(b'\0', 1)[0],
+                         parse_packet(pu.create_participants_data())
+                         .participants[0].name)
+
+    def test_car_view_requires_per_car_data(self):
+        with self.assertRaises(ValueError):
+            car_view(pu.create_session_data())
+
+
+@skipIf(numpy is None, 'NumPy is not installed')
+class TestParseColumns(TestCase):
+    def test_columns_span_batch(self):
+        packets = []
+        for frame in range(3):
+            data = bytearray(pu.create_car_telemetry_data())
+            packet = PACKET_TYPE[PacketId.CAR_TELEMETRY.value].from_buffer(
+                data)
+            packet.frameIdentifier = frame
+            packet.carTelemetryData[1].speed = 100 + frame
+            packets.append(bytes(data))
+        columns = parse_columns(packets)
+        self.assertEqual(list(columns['frameIdentifier']), [0, 1, 2])
+        self.assertEqual(columns['carTelemetryData.speed'].shape, (3, 22))
+        self.assertEqual(list(columns['carTelemetryData.speed'][:, 1]),
+                         [100, 101, 102])
+        self.assertEqual(
+            columns['carTelemetryData.brakesTemperature'].shape, (3, 22, 4))
+
+    def test_single_buffer(self):
+        data = pu.create_lap_data() * 4
+        columns = parse_columns(memoryview(data))
+        self.assertEqual(columns['lapData.carPosition'].shape, (4, 22))
+
+    def test_rejects_mixed_batches(self):
+        with self.assertRaises(ValueError):
+            parse_columns([pu.create_lap_data(), pu.create_motion_data()])
+        with self.assertRaises(ValueError):
+            parse_columns([pu.create_lap_data()],
+                          PacketId.CAR_STATUS.value)
+        with self.assertRaises(ValueError):
+            parse_columns(pu.create_lap_data()[:-1])
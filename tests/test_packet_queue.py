@@ -0,0 +1,72 @@
+from threading import Thread
+from typing import List
+from unittest import TestCase
+from constants.constants import PacketId
+from parsers.PacketQueue import BackpressurePolicy, PacketQueue, QueueItem
+
+
+MOTION = PacketId.MOTION.value
+EVENT = PacketId.EVENT.value
+FINAL_CLASSIFICATION = PacketId.FINAL_CLASSIFICATION.value
+
+
+def create_queue(policy: BackpressurePolicy, dropped: List[QueueItem]):
+    return PacketQueue(3, policy, on_drop=dropped.append)
+
+
+class TestPacketQueue(TestCase):
+    def test_get_many_preserves_order(self):
+        queue = PacketQueue()
+        queue.put_many([(MOTION, 0, 1), (EVENT, 1, 1), (MOTION, 2, 1)])
+        self.assertEqual(queue.get_many(2), [(MOTION, 0, 1), (EVENT, 1, 1)])
+        self.assertEqual(queue.get_many(2), [(MOTION, 2, 1)])
+
+    def test_drop_newest(self):
+        dropped: List[QueueItem] = []
+        queue = create_queue(BackpressurePolicy.DROP_NEWEST, dropped)
+        queue.put_many([(MOTION, slot, 1) for slot in range(5)])
+        self.assertEqual([x[1] for x in queue.get_many(5)], [0, 1, 2])
+        self.assertEqual([x[1] for x in dropped], [3, 4])
+
+    def test_drop_oldest(self):
+        dropped: List[QueueItem] = []
+        queue = create_queue(BackpressurePolicy.DROP_OLDEST, dropped)
+        queue.put_many([(MOTION, slot, 1) for slot in range(5)])
+        self.assertEqual([x[1] for x in queue.get_many(5)], [2, 3, 4])
+        self.assertEqual([x[1] for x in dropped], [0, 1])
+
+    def test_drop_by_type_sheds_motion_first(self):
+        dropped: List[QueueItem] = []
+        queue = create_queue(BackpressurePolicy.DROP_BY_TYPE, dropped)
+        queue.put_many([(EVENT, 0, 1), (MOTION, 1, 1), (MOTION, 2, 1),
+                        (FINAL_CLASSIFICATION, 3, 1), (EVENT, 4, 1)])
+        self.assertEqual([x[1] for x in queue.get_many(5)], [0, 3, 4])
+        self.assertEqual([x[1] for x in dropped], [1, 2])
+
+    def test_drop_by_type_drops_incoming_low_priority_packet(self):
+        dropped: List[QueueItem] = []
+        queue = create_queue(BackpressurePolicy.DROP_BY_TYPE, dropped)
+        queue.put_many([(EVENT, 0, 1), (EVENT, 1, 1), (EVENT, 2, 1),
+                        (MOTION, 3, 1)])
+        self.assertEqual([x[1] for x in queue.get_many(5)], [0, 1, 2])
+        self.assertEqual(dropped, [(MOTION, 3, 1)])
+
+    def test_close_wakes_consumer(self):
+        queue = PacketQueue()
+        queue.close()
+        self.assertEqual(queue.get_many(1), [])
+
+    def test_block_with_batch_larger_than_queue(self):
+        queue = PacketQueue(4, BackpressurePolicy.BLOCK)
+        received: List[QueueItem] = []
+
+        def consume():
+            while len(received) < 10:
+                received.extend(queue.get_many(10))
+
+        consumer = Thread(target=consume, daemon=True)
+        consumer.start()
+        queue.put_many([(MOTION, slot, 1) for slot in range(10)])
+        consumer.join(5)
+        self.assertFalse(consumer.is_alive())
+        self.assertEqual([x[1] for x in received], list(range(10)))
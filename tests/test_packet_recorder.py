@@ -0,0 +1,149 @@
+import json
+from unittest import TestCase
+from packets.packets import CarTelemetryPacket, MotionPacket, SessionPacket
+from replay.PacketRecorder import (
+    DataStorePolicy, Field, PacketRecorder, PacketSchema)
+import tests.packet_utilities as pu
+from utilities.parse import parse_packet, ParseBackend, set_parse_backend
+
+
+TELEMETRY_SCHEMA = PacketSchema(CarTelemetryPacket, [
+    Field('speed', DataStorePolicy.ON_CHANGE),
+    Field('throttle', DataStorePolicy.ALL, 1),
+    Field('gear', DataStorePolicy.FIRST),
+    Field('brakesTemperature', DataStorePolicy.ON_CHANGE),
+], 'carTelemetryData')
+
+
+class TestPacketRecorder(TestCase):
+    def tearDown(self):
+        set_parse_backend(ParseBackend.CTYPES)
+
+    def test_per_car_fields(self):
+        recorder = PacketRecorder(TELEMETRY_SCHEMA)
+        data = recorder.reset()
+        self.assertEqual(len(data), 22)
+        packet = parse_packet(pu.create_car_telemetry_data())
+        recorder.record(packet)
+        packet.sessionTime = 7.25
+        packet.carTelemetryData[0].gear = 3
+        packet.carTelemetryData[1].speed = 200
+        packet.carTelemetryData[1].brakesTemperature[0] = 900
+        recorder.record(packet)
+        self.assertEqual(data[0]['speed'].to_list(), [(6.5, 1)])
+        self.assertEqual(data[1]['speed'].to_list(), [(6.5, 1), (7.25, 200)])
+        self.assertEqual(data[0]['throttle'].to_list(),
+                         [(6.5, 2.5), (7.25, 2.5)])
+        self.assertEqual(data[0]['gear'].to_list(), [(6.5, 6)])
+        self.assertEqual(data[1]['brakesTemperature'][-1],
+                         (7.25, (900, 1, 2, 3)))
+        self.assertEqual(data[0]['speed'].typecode, 'H')
+        self.assertEqual(data[0]['brakesTemperature'].width, 4)
+
+    def test_rounded_values_quantized(self):
+        recorder = PacketRecorder(PacketSchema(CarTelemetryPacket, [
+            Field('throttle', DataStorePolicy.ALL, 3),
+        ], 'carTelemetryData'))
+        data = recorder.reset()
+        packet = parse_packet(pu.create_car_telemetry_data())
+        expected = []
+        for index in range(1000):
+            packet.sessionTime = index * 0.0105
+            packet.carTelemetryData[0].throttle = index * 0.0015
+            recorder.record(packet)
+            # Rounding to 3 decimals by formatting, before quantization.
+            expected.append((
+                float('%.3f' % packet.sessionTime),
+                float('%.3f' % packet.carTelemetryData[0].throttle)))
+        throttle = data[0]['throttle']
+        self.assertEqual((throttle.typecode, throttle.time_scale,
+                          throttle.value_scale), ('q', 1000, 1000))
+        self.assertEqual(throttle.values[100], 150)
+        self.assertEqual(throttle.to_list(), expected)
+
+    def test_invalid_rounded_values_clamped(self):
+        recorder = PacketRecorder(PacketSchema(MotionPacket, [
+            Field('worldPositionX', DataStorePolicy.ALL, 3),
+        ], 'carMotionData'))
+        data = recorder.reset()
+        packet = parse_packet(pu.create_motion_data())
+        for value in (float('nan'), float('inf'), float('-inf'), 3e38,
+                      1.5):
+            packet.carMotionData[0].worldPositionX = value
+            recorder.record(packet)
+        self.assertEqual(list(data[0]['worldPositionX'].values),
+                         [0, 2**63 - 1, -2**63, 2**63 - 1, 1500])
+
+    def test_last_value(self):
+        recorder = PacketRecorder(TELEMETRY_SCHEMA)
+        data = recorder.reset()
+        with self.assertRaises(LookupError):
+            recorder.last_value('gear', 0)
+        recorder.record(parse_packet(pu.create_car_telemetry_data()))
+        del data[0]['gear'].times[:]
+        del data[0]['gear'].values[:]
+        self.assertEqual(recorder.last_value('gear', 0), 6)
+        self.assertEqual(recorder.last_value('speed', 1), 1)
+        with self.assertRaises(LookupError):
+            recorder.last_value('throttle', 0)
+
+    def test_last_values_restored(self):
+        recorder = PacketRecorder(TELEMETRY_SCHEMA)
+        recorder.reset()
+        recorder.record(parse_packet(pu.create_car_telemetry_data()))
+        last_values = json.loads(json.dumps(recorder.get_last_values()))
+        self.assertEqual(last_values[0], [1, None, 6, [0, 1, 2, 3]])
+        data = recorder.reset()
+        recorder.set_last_values(last_values)
+        recorder.record(parse_packet(pu.create_car_telemetry_data()))
+        self.assertEqual(len(data[0]['speed']), 0)
+        self.assertEqual(len(data[0]['gear']), 0)
+        self.assertEqual(len(data[0]['brakesTemperature']), 0)
+        self.assertEqual(len(data[0]['throttle']), 1)
+
+    def test_reset_starts_new_series(self):
+        recorder = PacketRecorder(TELEMETRY_SCHEMA)
+        first = recorder.reset()
+        recorder.record(parse_packet(pu.create_car_telemetry_data()))
+        second = recorder.reset()
+        recorder.record(parse_packet(pu.create_car_telemetry_data()))
+        self.assertEqual(len(first[0]['speed']), 1)
+        self.assertEqual(len(second[0]['speed']), 1)
+
+    def test_packet_fields_and_expressions(self):
+        recorder = PacketRecorder(PacketSchema(SessionPacket, [
+            Field('weather', DataStorePolicy.ON_CHANGE),
+            Field('zoneFlags', DataStorePolicy.ALL,
+                  expression='tuple([x.zoneFlag for x in {}.marshalZones])',
+                  typecode='b', width=21),
+        ]))
+        data = recorder.reset()
+        packet = parse_packet(pu.create_session_data())
+        recorder.record(packet)
+        self.assertEqual(data['weather'].last(), packet.weather)
+        self.assertEqual(data['zoneFlags'].last(),
+                         tuple(x.zoneFlag for x in packet.marshalZones))
+
+    def test_computed_field_requires_type(self):
+        with self.assertRaises(ValueError):
+            PacketRecorder(PacketSchema(SessionPacket, [
+                Field('x', DataStorePolicy.ALL, expression='{}.weather')]))
+
+    def test_unchanged_cars_are_skipped(self):
+        recorder = PacketRecorder(PacketSchema(CarTelemetryPacket, [
+            Field('speed', DataStorePolicy.ON_CHANGE),
+            Field('gear', DataStorePolicy.FIRST),
+        ], 'carTelemetryData'))
+        for backend in ParseBackend:
+            set_parse_backend(backend)
+            data = recorder.reset()
+            raw = bytearray(pu.create_car_telemetry_data())
+            recorder.record(parse_packet(raw))
+            packet = CarTelemetryPacket.from_buffer(raw)
+            packet.sessionTime = 7.25
+            packet.carTelemetryData[2].speed = 200
+            recorder.record(parse_packet(raw))
+            self.assertEqual(data[0]['speed'].to_list(), [(6.5, 1)])
+            self.assertEqual(data[2]['speed'].to_list(),
+                             [(6.5, 1), (7.25, 200)])
+            self.assertEqual(data[2]['gear'].to_list(), [(6.5, 6)])
@@ -1,9 +1,17 @@
+from pathlib import Path
+from tempfile import TemporaryDirectory
 from unittest import TestCase
+from unittest.mock import patch
 from constants.constants import EventStringCode
 from filters.ReplayFilter import ReplayFilter
+from replay.compression import Compression
+from replay.json_writer import save_json
+from replay.SessionWriter import SessionWriter
 from utilities.parse import parse_packet
 from tests.packet_utilities import (
-    create_generic_event_data, create_car_telemetry_data)
+    create_car_telemetry_data, create_final_classification_data,
+    create_generic_event_data, create_participants_data,
+    create_session_data)
 
 
 # TODO: expand when ReplayFilter implementation is updated.
@@ -39,3 +47,68 @@ class TestReplayFilter(TestCase):
         filter.filter(parse_packet(create_generic_event_data(
             EventStringCode.SESSION_START.value)))
         self.assertEqual(len(filter.data['car_telemetry'][0]['speed']), 0)
+
+    def test_samples_spilled_past_memory_budget(self):
+        with TemporaryDirectory() as directory, patch(
+                'filters.ReplayFilter.MEMORY_CHECK_INTERVAL', 1):
+            filter = ReplayFilter(Path(directory), memory_budget=0)
+            filter.filter(parse_packet(create_generic_event_data(
+                EventStringCode.SESSION_START.value)))
+            filter.filter(parse_packet(create_car_telemetry_data()))
+            speed = filter.data['car_telemetry'][0]['speed']
+            self.assertEqual(len(speed), 0)
+            chunk_log = filter.chunk_log
+            self.assertIsNotNone(chunk_log)
+            self.assertTrue(chunk_log.path.exists())
+            spilled = chunk_log.attach(filter.data)['car_telemetry'][0]
+            self.assertEqual(spilled['speed'].load().to_list(), [(6.5, 1)])
+            filter.filter(parse_packet(create_generic_event_data(
+                EventStringCode.SESSION_START.value)))
+            self.assertIsNone(filter.chunk_log)
+            self.assertFalse(chunk_log.path.exists())
+
+    def test_session_resumed_from_checkpoint(self):
+        with TemporaryDirectory() as directory:
+            filter = ReplayFilter(Path(directory), checkpoint_interval=60)
+            filter.filter(parse_packet(create_generic_event_data(
+                EventStringCode.SESSION_START.value)))
+            filter.filter(parse_packet(create_car_telemetry_data()))
+            filter.cleanup()
+            path = Path(directory) / f'{filter.session_uid}.f1log'
+            self.assertTrue(path.exists())
+            filter = ReplayFilter(Path(directory), checkpoint_interval=60)
+            filter.filter(parse_packet(create_car_telemetry_data()))
+            self.assertEqual(filter.is_session_started, True)
+            self.assertEqual(
+                filter.data['event'][EventStringCode.SESSION_START.value][1],
+                EventStringCode.SESSION_START.value)
+            # The unchanged speed isn't stored again.
+            speed = filter.data['car_telemetry'][0]['speed']
+            self.assertEqual(len(speed), 0)
+            spilled = filter.chunk_log.attach(filter.data)['car_telemetry'][0]
+            self.assertEqual(spilled['speed'].load().to_list(), [(6.5, 1)])
+            filter.chunk_log.close()
+
+    def test_invalid_compression_level(self):
+        with self.assertRaises(ValueError):
+            ReplayFilter(compression=Compression.GZIP, compression_level=12)
+        with self.assertRaises(ValueError):
+            ReplayFilter(compression_level=5)
+
+    def test_only_written_sessions_are_saved_files(self):
+        def fail(data, path):
+            raise OSError('disk full')
+
+        with TemporaryDirectory() as directory:
+            for save, expected_count in ((fail, 0), (save_json, 1)):
+                filter = ReplayFilter(Path(directory))
+                filter.writer = SessionWriter(save)
+                for data in (create_generic_event_data(
+                                 EventStringCode.SESSION_START.value),
+                             create_session_data(),
+                             create_participants_data(),
+                             create_final_classification_data()):
+                    filter.filter(parse_packet(data))
+                with self.assertLogs(level='INFO'):
+                    filter.cleanup()
+                self.assertEqual(len(filter.saved_files), expected_count)
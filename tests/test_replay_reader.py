@@ -0,0 +1,88 @@
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from unittest import TestCase
+from replay.formats import ReplayFormat, SAVE_FUNCTIONS
+from replay.ReplayReader import LazyDict, ReplayReader
+from replay.Series import Series
+
+
+def create_data():
+    throttle = Series('d', 0)
+    wear = Series('f', 4)
+    for index in range(100):
+        throttle.append(index * 0.5, float('%.3f' % (index / 99)))
+        wear.append(index * 0.5, (index, index, 0.5, 0.25))
+    return {
+        'car_telemetry': [{'throttle': throttle, 'speed': Series('H', 0)}],
+        'car_damage': [{'tyresWear': wear}],
+        'event': {'SSTA': (1.5, 'SSTA'), 'DRSE': [(2.0, 'DRSE')],
+                  'FTLP': [(3.0, 'FTLP', 1, 90.5)], 'RTMT': []},
+        'participants': {'numActiveCars': 20, 'participants': [
+            {'name': 'Pérez', 'driverId': 1}]},
+    }
+
+
+class TestReplayReader(TestCase):
+    def setUp(self):
+        self.directory = TemporaryDirectory()
+        self.path = Path(self.directory.name)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def create_file(self, name: str) -> Path:
+        path = self.path / name
+        format = (ReplayFormat.JSON if '.json' in name
+                  else ReplayFormat.BINARY)
+        SAVE_FUNCTIONS[format](create_data(), path, None)
+        return path
+
+    def test_series_read(self):
+        expected = create_data()
+        for name in ('session.json', 'session.json.gz', 'session.f1rpl',
+                     'session.f1rpl.xz'):
+            with ReplayReader(self.create_file(name)) as reader:
+                data = reader.data
+                throttle = data['car_telemetry'][0]['throttle']
+                self.assertIsInstance(throttle, Series)
+                self.assertEqual(
+                    throttle.to_list(),
+                    expected['car_telemetry'][0]['throttle'].to_list())
+                self.assertEqual(
+                    data['car_damage'][0]['tyresWear'].slice(10, 11)
+                    .to_list(), [(10.0, (20.0, 20.0, 0.5, 0.25)),
+                                 (10.5, (21.0, 21.0, 0.5, 0.25))])
+                self.assertEqual(len(data['car_telemetry'][0]['speed']), 0)
+                self.assertEqual(data['event']['SSTA'], [1.5, 'SSTA'])
+                self.assertEqual(data['event']['DRSE'], [[2.0, 'DRSE']])
+                self.assertEqual(data['event']['FTLP'],
+                                 [[3.0, 'FTLP', 1, 90.5]])
+                self.assertIs(type(data['event']['RTMT']), list)
+                self.assertEqual(
+                    data['participants']['participants'][0]['name'],
+                    'Pérez')
+
+    def test_binary_series_decoded_on_access(self):
+        with ReplayReader(self.create_file('session.f1rpl')) as reader:
+            car = reader.data['car_telemetry'][0]
+            self.assertIsInstance(car, LazyDict)
+            self.assertNotIsInstance(car._items['throttle'], Series)
+            throttle = car['throttle']
+            self.assertIs(car._items['throttle'], throttle)
+            self.assertIs(car['throttle'], throttle)
+            self.assertNotIsInstance(car._items['speed'], Series)
+
+    def test_close_unmaps_file(self):
+        reader = ReplayReader(self.create_file('session.f1rpl'))
+        throttle = reader.data['car_telemetry'][0]['throttle']
+        reader.close()
+        self.assertIsNone(reader._map)
+        self.assertEqual(len(throttle), 100)
+        with self.assertRaises(ValueError):
+            reader.data['car_damage'][0]['tyresWear']
+
+    def test_invalid_file(self):
+        path = self.path / 'session.f1rpl'
+        path.write_bytes(b'F122CAP\0' + bytes(100))
+        with self.assertRaises(ValueError):
+            ReplayReader(path)
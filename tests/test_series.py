@@ -0,0 +1,90 @@
+import json
+from unittest import TestCase
+from replay.Series import Series, to_json
+
+
+class TestSeries(TestCase):
+    def test_scalar_values(self):
+        series = Series()
+        self.assertEqual(len(series), 0)
+        series.append(1.5, 3)
+        series.append(2.5, 4)
+        self.assertEqual(series.typecode, 'q')
+        self.assertEqual(len(series), 2)
+        self.assertEqual(series[0], (1.5, 3))
+        self.assertEqual(series[-1], (2.5, 4))
+        self.assertEqual(series.last(), 4)
+        self.assertEqual(series.to_list(), [(1.5, 3), (2.5, 4)])
+
+    def test_tuple_values(self):
+        series = Series()
+        series.append(0.0, (1.5, 2.5, 3.5, 4.5))
+        series.append(1.0, (5.5, 6.5, 7.5, 8.5))
+        self.assertEqual((series.typecode, series.width), ('d', 4))
+        self.assertEqual(len(series.values), 8)
+        self.assertEqual(series.last(), (5.5, 6.5, 7.5, 8.5))
+        self.assertEqual(list(series)[0], (0.0, (1.5, 2.5, 3.5, 4.5)))
+        self.assertEqual(series.to_list(1), [(1.0, (5.5, 6.5, 7.5, 8.5))])
+        self.assertEqual(series.to_list(0, 1), [(0.0, (1.5, 2.5, 3.5, 4.5))])
+
+    def test_explicit_type(self):
+        series = Series('B')
+        series.append(0.0, 255)
+        with self.assertRaises(OverflowError):
+            series.append(1.0, 256)
+        self.assertEqual(Series('f', 0).width, 0)
+
+    def test_large_integers(self):
+        series = Series()
+        series.append(0.0, 2**64 - 1)
+        self.assertEqual(series.last(), 2**64 - 1)
+
+    def test_empty_series(self):
+        with self.assertRaises(IndexError):
+            Series().last()
+        self.assertEqual(Series().to_list(), [])
+
+    def test_json_matches_tuple_lists(self):
+        series = Series()
+        series.append(0.25, (1, 2))
+        series.append(0.5, (3, 4))
+        self.assertEqual(
+            json.dumps({'a': series}, default=to_json),
+            json.dumps({'a': [(0.25, (1, 2)), (0.5, (3, 4))]}))
+        with self.assertRaises(TypeError):
+            json.dumps(object(), default=to_json)
+
+    def test_from_list(self):
+        series = Series.from_list([[0.5, 1], [1.0, 2.5]])
+        self.assertEqual((series.typecode, series.width), ('d', 0))
+        self.assertEqual(series.to_list(), [(0.5, 1.0), (1.0, 2.5)])
+        series = Series.from_list([[0.5, [1, 2]], [1.0, [2**64 - 1, 0]]])
+        self.assertEqual((series.typecode, series.width), ('Q', 2))
+        self.assertEqual(series.last(), (2**64 - 1, 0))
+        self.assertEqual(len(Series.from_list([])), 0)
+
+    def test_slice(self):
+        series = Series('H', 2)
+        for index in range(10):
+            series.append(index * 0.5, (index, index * 2))
+        self.assertEqual(series.slice(1.0, 2.0).to_list(),
+                         [(1.0, (2, 4)), (1.5, (3, 6))])
+        self.assertEqual(series.slice(1.1, 1.6).to_list(), [(1.5, (3, 6))])
+        self.assertEqual(series.slice(-1, 100).to_list(), series.to_list())
+        self.assertEqual(len(series.slice(2.0, 1.0)), 0)
+        self.assertEqual(len(series.slice(10, 20)), 0)
+        self.assertEqual(len(Series().slice(0, 1)), 0)
+
+    def test_quantized_series(self):
+        series = Series('q', 0, 1000, 1000)
+        series.append(1.5, 0.25)
+        series.append(2.0004, 0.1239)
+        self.assertEqual(list(series.times), [1500, 2000])
+        self.assertEqual(list(series.values), [250, 124])
+        self.assertEqual(series[1], (2.0, 0.124))
+        self.assertEqual(series.last(), 0.124)
+        self.assertEqual(series.to_list(), [(1.5, 0.25), (2.0, 0.124)])
+        self.assertEqual(series.slice(1.75, 3).to_list(), [(2.0, 0.124)])
+        tuples = Series('q', 2, 1000, 10)
+        tuples.append(0.5, (1.25, 2))
+        self.assertEqual(tuples.to_list(), [(0.5, (1.2, 2.0))])
@@ -0,0 +1,83 @@
+import json
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from threading import Event
+from typing import Any, List
+from unittest import TestCase
+from replay.Series import Series
+from replay.SessionWriter import SessionWriter
+
+
+class TestSessionWriter(TestCase):
+    def setUp(self):
+        self.directory = TemporaryDirectory()
+        self.path = Path(self.directory.name)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_sessions_written(self):
+        writer = SessionWriter()
+        series = Series('H')
+        series.append(1.5, 200)
+        writer.submit(self.path / 'a' / 'first.json', {'speed': series})
+        writer.submit(self.path / 'second.json', {'numCars': 20})
+        writer.close()
+        with (self.path / 'a' / 'first.json').open() as file:
+            self.assertEqual(json.load(file), {'speed': [[1.5, 200]]})
+        with (self.path / 'second.json').open() as file:
+            self.assertEqual(json.load(file), {'numCars': 20})
+
+    def test_writer_restarts_after_close(self):
+        writer = SessionWriter()
+        writer.close()
+        writer.submit(self.path / 'session.json', {})
+        writer.close()
+        self.assertTrue((self.path / 'session.json').exists())
+
+    def test_pending_sessions_bounded(self):
+        release = Event()
+        saved: List[Any] = []
+
+        def save(data: Any, path: Path):
+            release.wait()
+            saved.append(data)
+
+        writer = SessionWriter(save, max_pending=1)
+        writer.submit(self.path, 0)
+        writer.submit(self.path, 1)
+        # The first session is being written and the second is pending.
+        self.assertTrue(writer._queue.full())
+        release.set()
+        writer.submit(self.path, 2)
+        writer.wait()
+        self.assertEqual(saved, [0, 1, 2])
+        writer.close()
+
+    def test_failed_write_logged(self):
+        def save(data: Any, path: Path):
+            raise OSError('disk full')
+
+        writer = SessionWriter(save)
+        with self.assertLogs(level='ERROR'):
+            writer.submit(self.path, {})
+            writer.close()
+
+    def test_finish_called_after_successful_write(self):
+        calls: List[str] = []
+
+        def save(data: Any, path: Path):
+            calls.append('save')
+            if data is None:
+                raise OSError('disk full')
+
+        writer = SessionWriter(save)
+        writer.submit(self.path, {}, lambda: calls.append('finish'))
+        with self.assertLogs(level='ERROR'):
+            writer.submit(self.path, None, lambda: calls.append('finish'))
+            writer.close()
+        self.assertEqual(calls, ['save', 'finish', 'save'])
+
+    def test_invalid_pending_count(self):
+        with self.assertRaises(ValueError):
+            SessionWriter(max_pending=0)
@@ -0,0 +1,82 @@
+from ctypes import Array, sizeof, Structure, Union
+from typing import Any, Callable, List
+from unittest import TestCase
+from constants.constants import EventStringCode
+from packets.packets import PACKET_TYPE
+from packets.struct_decoder import STRUCT_DECODERS
+import tests.packet_utilities as pu
+from utilities.packet import get_packet_id
+from utilities.parse import (
+    parse_packet, parse_packet_in_place, ParseBackend, set_parse_backend)
+
+
+PACKET_DATA: List[Callable[[], bytes]] = [
+    pu.create_motion_data,
+    pu.create_session_data,
+    pu.create_lap_data,
+    pu.create_fastest_lap_data,
+    pu.create_retirement_data,
+    pu.create_team_mate_in_pits_data,
+    pu.create_race_winner_data,
+    pu.create_penalty_data,
+    pu.create_speed_trap_data,
+    pu.create_start_lights_data,
+    pu.create_drive_through_data,
+    pu.create_stop_go_data,
+    pu.create_button_data,
+    lambda: pu.create_generic_event_data(EventStringCode.FLASHBACK.value),
+    pu.create_participants_data,
+    pu.create_car_setups_data,
+    pu.create_car_telemetry_data,
+    pu.create_car_status_data,
+    pu.create_final_classification_data,
+    pu.create_lobby_info_data,
+    pu.create_car_damage_data,
+    pu.create_session_history_data,
+]
+
+
+def assert_same_values(case: TestCase, expected: Any, actual: Any,
+                       path: str):
+    if isinstance(expected, (Structure, Union)):
+        for cls in type(expected).__mro__:
+            for name, _ in cls.__dict__.get('_fields_', []):
+                assert_same_values(case, getattr(expected, name),
+                                   getattr(actual, name), f'{path}.{name}')
+    elif isinstance(expected, Array):
+        case.assertEqual(len(expected), len(actual), path)
+        for index, value in enumerate(expected):
+            assert_same_values(case, value, actual[index],
+                               f'{path}[{index}]')
+    else:
+        case.assertEqual(expected, actual, path)
+
+
+class TestStructDecoder(TestCase):
+    def tearDown(self):
+        set_parse_backend(ParseBackend.CTYPES)
+
+    def test_sizes_match_ctypes(self):
+        for id, decoder in STRUCT_DECODERS.items():
+            self.assertEqual(decoder.packet_type, PACKET_TYPE[id])
+            self.assertEqual(decoder.struct.size, sizeof(PACKET_TYPE[id]),
+                             PACKET_TYPE[id].__name__)
+
+    def test_matches_ctypes_parser(self):
+        for create_data in PACKET_DATA:
+            data = create_data()
+            expected = parse_packet(data)
+            actual = STRUCT_DECODERS[get_packet_id(data)].decode(data)
+            assert_same_values(self, expected, actual,
+                               type(expected).__name__)
+
+    def test_backend_is_selectable(self):
+        data = pu.create_car_telemetry_data()
+        set_parse_backend(ParseBackend.STRUCT)
+        packet = parse_packet(data)
+        self.assertNotIsInstance(packet, Structure)
+        self.assertEqual(packet.carTelemetryData[0].speed, 1)
+        packet = parse_packet_in_place(memoryview(bytearray(data)))
+        self.assertNotIsInstance(packet, Structure)
+        set_parse_backend(ParseBackend.CTYPES)
+        self.assertIsInstance(parse_packet(data), Structure)
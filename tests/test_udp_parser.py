@@ -0,0 +1,220 @@
+from functools import partial
+import multiprocessing
+import os
+import socket
+from threading import Event
+import time
+from typing import Any, List
+from unittest import TestCase
+from constants.constants import PacketId
+from filters.Filter import Filter
+from packets.packets import LapDataPacket, Packet
+from parsers.ShardedUDPParser import ShardedUDPParser
+from parsers.UDPParser import UDPParser
+import tests.packet_utilities as pu
+
+
+WAIT_TIMEOUT_S = 2
+
+def get_free_port() -> int:
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+class CollectingFilter(Filter):
+    def __init__(self, expected_count: int):
+        self.packet_ids: List[int] = []
+        self.expected_count = expected_count
+        self.done = Event()
+
+    def filter(self, packet: Packet):
+        self.packet_ids.append(packet.packetId)
+        if len(self.packet_ids) >= self.expected_count:
+            self.done.set()
+
+
+class LapDataFilter(Filter):
+    def __init__(self, expected_count: int):
+        self.packet_ids: List[int] = []
+        self.expected_count = expected_count
+        self.done = Event()
+
+    def filter_lap_data(self, packet: LapDataPacket):
+        self.packet_ids.append(packet.packetId)
+        if len(self.packet_ids) >= self.expected_count:
+            self.done.set()
+
+
+def start_parser(parser: UDPParser):
+    parser.start()
+    # The socket is bound on the producer thread.
+    deadline = time.time() + WAIT_TIMEOUT_S
+    while time.time() < deadline:
+        try:
+            if parser.socket is not None and \
+                    parser.socket.getsockname()[1] == parser.port:
+                return
+        except OSError:
+            pass
+        time.sleep(0.001)
+
+
+def send_packets(port: int, packets: List[bytes]):
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as s:
+        for data in packets:
+            s.sendto(data, ('127.0.0.1', port))
+
+
+class TestUDPParser(TestCase):
+    def test_packets_are_filtered_in_order(self):
+        packets = [pu.create_motion_data(), pu.create_lap_data(),
+                   pu.create_car_telemetry_data()] * 10
+        filter = CollectingFilter(len(packets))
+        parser = UDPParser(filter, get_free_port(), batch_size=8)
+        start_parser(parser)
+        try:
+            send_packets(parser.port, packets)
+            self.assertTrue(filter.done.wait(WAIT_TIMEOUT_S))
+        finally:
+            parser.stop()
+        self.assertEqual(filter.packet_ids, [0, 2, 6] * 10)
+        self.assertEqual(parser.stats.packets_received, len(packets))
+        self.assertLessEqual(parser.stats.largest_batch, 8)
+        self.assertGreaterEqual(parser.stats.batches_received,
+                                len(packets) // 8)
+
+    def test_unsubscribed_packets_are_skipped(self):
+        packets = [pu.create_motion_data(), pu.create_lap_data(),
+                   pu.create_car_telemetry_data()] * 10
+        filter = LapDataFilter(10)
+        parser = UDPParser(filter, get_free_port(), batch_size=8)
+        start_parser(parser)
+        try:
+            send_packets(parser.port, packets)
+            self.assertTrue(filter.done.wait(WAIT_TIMEOUT_S))
+            deadline = time.time() + WAIT_TIMEOUT_S
+            while (parser.stats.packets_received < len(packets)
+                   and time.time() < deadline):
+                time.sleep(0.001)
+        finally:
+            parser.stop()
+        self.assertEqual(filter.packet_ids, [2] * 10)
+        self.assertEqual(parser.stats.packets_received, len(packets))
+        self.assertEqual(parser.stats.skipped_packets, 20)
+
+    def test_invalid_batch_size(self):
+        with self.assertRaises(ValueError):
+            UDPParser(CollectingFilter(0), 0, batch_size=0)
+        with self.assertRaises(ValueError):
+            UDPParser(CollectingFilter(0), 0, batch_size=64, queue_size=16)
+
+    def test_invalid_queue_size(self):
+        with self.assertRaises(ValueError):
+            UDPParser(CollectingFilter(0), 0, batch_size=4, pool_size=16,
+                      queue_size=9)
+
+    def test_buffers_are_returned_to_pool(self):
+        packets = [pu.create_car_telemetry_data()] * 50
+        filter = CollectingFilter(len(packets))
+        parser = UDPParser(filter, get_free_port(), batch_size=4,
+                           pool_size=16, queue_size=8)
+        start_parser(parser)
+        try:
+            send_packets(parser.port, packets)
+            self.assertTrue(filter.done.wait(WAIT_TIMEOUT_S))
+        finally:
+            parser.stop()
+        self.assertEqual(len(filter.packet_ids), len(packets))
+        deadline = time.time() + WAIT_TIMEOUT_S
+        while parser.pool.available() < 16 and time.time() < deadline:
+            time.sleep(0.001)
+        self.assertEqual(parser.pool.available(), 16)
+
+
+class RecordingFilter(Filter):
+    def __init__(self, results: Any):
+        self.results = results
+
+    def filter(self, packet: Packet):
+        self.results.put(
+            (os.getpid(), packet.sessionUID, packet.frameIdentifier))
+
+
+class CleanupFilter(Filter):
+    def __init__(self, results: Any):
+        self.results = results
+        self.session_uid = None
+
+    def filter(self, packet: Packet):
+        self.session_uid = packet.sessionUID
+        self.results.put(('packet', packet.sessionUID))
+
+    def cleanup(self):
+        self.results.put(('cleanup', self.session_uid))
+
+
+class UncreatableFilter(Filter):
+    def __init__(self):
+        raise AssertionError('Filters are only created by the workers.')
+
+    def filter_lap_data(self, packet: LapDataPacket):
+        pass
+
+
+class TestShardedUDPParser(TestCase):
+    def test_filter_not_created_in_main_process(self):
+        parser = ShardedUDPParser(partial(UncreatableFilter), 0)
+        self.assertIs(parser.filter_type, UncreatableFilter)
+        self.assertEqual(
+            [id for id, subscribed in enumerate(parser.subscribed)
+             if subscribed], [PacketId.LAP_DATA.value])
+
+    def test_invalid_filter_factory(self):
+        with self.assertRaises(TypeError):
+            ShardedUDPParser(lambda: UncreatableFilter(), 0)
+
+    def test_sessions_are_sharded_in_order(self):
+        results = multiprocessing.Queue()
+        session_uids = [11, 12, 13, 14]
+        frame_count = 20
+        packets = [pu.create_packet(pu.create_lap_data(), uid, frame)
+                   for frame in range(frame_count) for uid in session_uids]
+        parser = ShardedUDPParser(partial(RecordingFilter, results),
+                                  get_free_port(), worker_count=2,
+                                  batch_size=8)
+        start_parser(parser)
+        try:
+            send_packets(parser.port, packets)
+            received = [results.get(timeout=WAIT_TIMEOUT_S)
+                        for _ in packets]
+        finally:
+            parser.stop()
+        for uid in session_uids:
+            session = [x for x in received if x[1] == uid]
+            self.assertEqual(len({x[0] for x in session}), 1)
+            self.assertEqual([x[2] for x in session],
+                             list(range(frame_count)))
+
+    def test_finished_sessions_are_cleaned_up(self):
+        results = multiprocessing.Queue()
+        parser = ShardedUDPParser(partial(CleanupFilter, results),
+                                  get_free_port(), worker_count=1,
+                                  session_timeout=0.2)
+        start_parser(parser)
+        try:
+            send_packets(parser.port, [
+                pu.create_packet(pu.create_lap_data(), 1, 0),
+                pu.create_packet(pu.create_final_classification_data(), 1, 1),
+            ])
+            self.assertEqual(
+                [results.get(timeout=WAIT_TIMEOUT_S) for _ in range(3)],
+                [('packet', 1), ('packet', 1), ('cleanup', 1)])
+            send_packets(parser.port, [
+                pu.create_packet(pu.create_lap_data(), 2, 0)])
+            self.assertEqual(
+                [results.get(timeout=WAIT_TIMEOUT_S) for _ in range(2)],
+                [('packet', 2), ('cleanup', 2)])
+        finally:
+            parser.stop()
+        self.assertTrue(results.empty())
@@ -1,5 +1,8 @@
-from struct import unpack
-from constants.constants import PACKET_HEADER_ID_INDEX
+from struct import unpack, unpack_from
+from typing import Iterable, Tuple
+from constants.constants import (
+    PACKET_HEADER_FRAME_IDENTIFIER_INDEX, PACKET_HEADER_ID_INDEX,
+    PACKET_HEADER_SESSION_UID_INDEX)
 
 
 def get_packet_id(packet_data: bytes) -> int:
@@ -15,3 +18,46 @@ def get_packet_id(packet_data: bytes) -> int:
     return unpack(
         '<B',
         packet_data[PACKET_HEADER_ID_INDEX:PACKET_HEADER_ID_INDEX + 1])[0]
+
+
+def get_session_uid(packet_data: bytes) -> int:
+    """Returns the session UID of a packet from the given packet data.
+
+    Args:
+        packet_data: The raw bytes of the packet.
+
+    Returns:
+        The session UID.
+    """
+
+    return unpack_from(
+        '<Q', packet_data, PACKET_HEADER_SESSION_UID_INDEX)[0]
+
+
+def get_frame_identifier(packet_data: bytes) -> int:
+    """Returns the frame identifier of a packet from the given packet data.
+
+    Args:
+        packet_data: The raw bytes of the packet.
+
+    Returns:
+        The frame identifier.
+    """
+
+    return unpack_from(
+        '<I', packet_data, PACKET_HEADER_FRAME_IDENTIFIER_INDEX)[0]
+
+
+def create_packet_id_mask(packet_ids: Iterable[int]) -> Tuple[bool, ...]:
+    """Creates a lookup table of the given packet ids.
+
+    Args:
+        packet_ids: The packet ids to include.
+
+    Returns:
+        A tuple, indexable by any packet id byte, that's True for the
+        included ids.
+    """
+
+    ids = set(packet_ids)
+    return tuple(id in ids for id in range(256))
@@ -1,7 +1,60 @@
+from enum import Enum
+from typing import Any, Callable, Dict
 from packets.packets import Packet, PACKET_TYPE
 from utilities.packet import get_packet_id
 
 
+class ParseBackend(Enum):
+    """Defines the implementations available for decoding packets."""
+
+    CTYPES = 'ctypes'
+    """Packets are ctypes structures whose fields are read on access."""
+
+    STRUCT = 'struct'
+    """Packets are decoded up front by a precompiled struct.Struct into
+    lightweight records (see packets.struct_decoder)."""
+
+
+_parse_backend = ParseBackend.CTYPES
+
+_copy_decoders: Dict[int, Callable[[Any], Packet]] = {
+    id: packet_type.from_buffer_copy
+    for id, packet_type in PACKET_TYPE.items()}
+
+_in_place_decoders: Dict[int, Callable[[Any], Packet]] = {
+    id: packet_type.from_buffer for id, packet_type in PACKET_TYPE.items()}
+
+
+def get_parse_backend() -> ParseBackend:
+    """Returns the backend used to decode packets."""
+
+    return _parse_backend
+
+
+def set_parse_backend(backend: ParseBackend):
+    """Selects the backend used to decode packets.
+
+    Args:
+        backend: The backend used by parse_packet and parse_packet_in_place
+            from now on.
+    """
+
+    global _parse_backend
+    if backend == ParseBackend.STRUCT:
+        # Compiling the decoders has a small cost, so it's only done when
+        # they're actually used.
+        from packets.struct_decoder import STRUCT_DECODERS
+        decoders = {id: decoder.decode
+                    for id, decoder in STRUCT_DECODERS.items()}
+        _copy_decoders.update(decoders)
+        _in_place_decoders.update(decoders)
+    else:
+        for id, packet_type in PACKET_TYPE.items():
+            _copy_decoders[id] = packet_type.from_buffer_copy
+            _in_place_decoders[id] = packet_type.from_buffer
+    _parse_backend = backend
+
+
 def parse_packet(data: bytes) -> Packet:
     """Parses a Packet from the given bytes.
 
@@ -9,7 +62,26 @@ def parse_packet(data: bytes) -> Packet:
         data: The bytes to parse the packet from.
 
     Returns:
-        An instance of a Packet subclass, determined by the packet's id.
+        An instance of a Packet subclass, determined by the packet's id (or
+        an equivalent record, depending on the parse backend).
+    """
+
+    return _copy_decoders[get_packet_id(data)](data)
+
+
+def parse_packet_in_place(data: memoryview) -> Packet:
+    """Parses a Packet that shares memory with the given buffer.
+
+    Unlike parse_packet, no copy of the data is made, so the packet is only
+    valid for as long as the buffer's contents are left unchanged.
+
+    Args:
+        data: A writable buffer (e.g., a view of a bytearray) to parse the
+            packet from.
+
+    Returns:
+        An instance of a Packet subclass, determined by the packet's id (or
+        an equivalent record, depending on the parse backend).
     """
 
-    return PACKET_TYPE[get_packet_id(data)].from_buffer_copy(data)
+    return _in_place_decoders[get_packet_id(data)](data)